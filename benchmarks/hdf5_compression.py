@@ -0,0 +1,174 @@
+"""
+Compares the write throughput and file size of HDF5 dataset options on a
+synthetic session: raw ZMax EEG, its timestamps and sleep stage
+probabilities.
+
+Usage:
+    python benchmarks/hdf5_compression.py --duration 28800
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from scipy.signal import lfilter
+
+from slumber.sources.zmax import SAMPLE_RATE
+from slumber.utils.hdf5 import DatasetOptions, HDF5Manager, decode_data
+
+EEG_SCALE = 3952 / 65536  # uV per ADC count of the ZMax EEG channels
+N_CHANNELS = 2
+N_SLEEP_STAGES = 5
+SCORE_DURATION = 30
+CHUNK_SIZE = 1024
+GROWTH_FACTOR = 2.0
+
+OPTIONS = {
+    "none": DatasetOptions(compression=None),
+    "gzip": DatasetOptions(compression="gzip"),
+    "gzip-1": DatasetOptions(compression="gzip", compression_level=1),
+    "gzip-1+shuffle": DatasetOptions(
+        compression="gzip", compression_level=1, shuffle=True
+    ),
+    "lzf": DatasetOptions(compression="lzf"),
+    "lzf+shuffle": DatasetOptions(compression="lzf", shuffle=True),
+    "float32+lzf+shuffle": DatasetOptions(
+        compression="lzf", shuffle=True, dtype="float32"
+    ),
+    "int16+lzf+shuffle": DatasetOptions(
+        compression="lzf", shuffle=True, scale=EEG_SCALE
+    ),
+    "int16+gzip-1+shuffle": DatasetOptions(
+        compression="gzip", compression_level=1, shuffle=True, scale=EEG_SCALE
+    ),
+}
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Measure HDF5 write throughput and file size per dataset option"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Duration of the session in seconds",
+        default=8 * 3600,
+    )
+    parser.add_argument(
+        "--block-duration",
+        type=float,
+        help="Duration of the data appended at once in seconds",
+        default=10,
+    )
+    parser.add_argument(
+        "--options",
+        type=str,
+        nargs="+",
+        choices=list(OPTIONS),
+        help="Dataset options to compare (default: all)",
+        default=list(OPTIONS),
+    )
+    return parser
+
+
+def _generate_session(duration: float) -> dict[str, tuple[np.ndarray, float]]:
+    """
+    Returns each dataset with the number of rows appended per second.
+    """
+    rng = np.random.default_rng(0)
+    n_samples = int(duration * SAMPLE_RATE)
+
+    # Autocorrelated noise of tens of uV, quantized like the ZMax ADC
+    noise = lfilter([1], [1, -0.95], rng.standard_normal((n_samples, N_CHANNELS)), 0)
+    eeg = np.rint(noise * 5 / EEG_SCALE) * EEG_SCALE
+
+    timestamps = 1.7e9 + np.arange(n_samples) / SAMPLE_RATE
+    timestamps += rng.normal(0, 1e-4, n_samples)
+
+    n_scores = int(duration // SCORE_DURATION)
+    probabilities = rng.dirichlet(np.ones(N_SLEEP_STAGES), n_scores)
+
+    return {
+        "eeg": (eeg, SAMPLE_RATE),
+        "timestamp": (timestamps, SAMPLE_RATE),
+        "probabilities": (probabilities, 1 / SCORE_DURATION),
+    }
+
+
+def _write(
+    file_path: Path,
+    data: np.ndarray,
+    rows_per_second: float,
+    block_duration: float,
+    options: DatasetOptions,
+) -> float:
+    """
+    Appends data in blocks like a storage unit and returns the time taken.
+    """
+    block_size = max(1, int(rows_per_second * block_duration))
+
+    start_time = time.perf_counter()
+    with HDF5Manager(file_path) as manager:
+        manager.create_group("session")
+        for start in range(0, len(data), block_size):
+            block = options.encode(data[start : start + block_size])
+            if start == 0:
+                manager.create_dataset(
+                    "session",
+                    "data",
+                    data=block,
+                    chunks=(CHUNK_SIZE, *block.shape[1:]),
+                    **options.create_kwargs,
+                )
+            else:
+                manager.append("session", "data", block, growth_factor=GROWTH_FACTOR)
+
+    return time.perf_counter() - start_time
+
+
+def _is_lossless(file_path: Path, data: np.ndarray) -> bool:
+    with HDF5Manager(file_path) as manager:
+        dataset = manager.get_dataset("session", "data")
+        stored = decode_data(
+            dataset[:], dataset.attrs.get("scale"), dataset.attrs.get("offset", 0.0)
+        )
+    return np.array_equal(stored, data)
+
+
+def main() -> None:
+    args = _get_parser().parse_args()
+    logger.remove()
+
+    session = _generate_session(args.duration)
+    print(f"Session of {args.duration / 3600:.1f} h")
+    print(
+        f"{'dataset':>14} {'options':>22} {'MB/s':>8} {'MiB':>8}"
+        f" {'ratio':>6} {'lossless':>8}"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for dataset_name, (data, rows_per_second) in session.items():
+            for name in args.options:
+                options = OPTIONS[name]
+                if options.scale is not None and dataset_name != "eeg":
+                    continue
+
+                file_path = Path(directory) / f"{dataset_name}_{name}.h5"
+                duration = _write(
+                    file_path, data, rows_per_second, args.block_duration, options
+                )
+                size = file_path.stat().st_size
+
+                print(
+                    f"{dataset_name:>14} {name:>22}"
+                    f" {data.nbytes / duration / 1e6:>8.2f}"
+                    f" {size / 2**20:>8.1f} {data.nbytes / size:>6.2f}"
+                    f" {str(_is_lossless(file_path, data)):>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
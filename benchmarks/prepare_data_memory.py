@@ -0,0 +1,126 @@
+"""
+Compares the peak memory allocated by UTimeModel.prepare_data with the
+previous implementation, which deep-copied the data and converted it to
+float32 after gathering the periods.
+
+Usage:
+    python benchmarks/prepare_data_memory.py --duration 3600
+"""
+
+import argparse
+import copy
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from psg_utils.preprocessing import apply_scaling, quality_control_funcs
+
+from slumber import MODELS_DIR
+from slumber.processing.sleep_scoring import UTimeModel
+from slumber.processing.transforms import Resample
+from slumber.sources.zmax import SAMPLE_RATE
+from slumber.utils.data import Data, get_all_periods
+
+DEFAULT_MODEL = "utime_EEG_10"
+N_CHANNELS = 2
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Measure peak memory allocated by UTimeModel.prepare_data"
+    )
+    parser.add_argument(
+        "--model-dir",
+        type=Path,
+        help="Path to directory containing U-Time model",
+        default=MODELS_DIR / DEFAULT_MODEL,
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Duration of the data in seconds",
+        default=3600,
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        help="Number of consecutive calls to measure",
+        default=3,
+    )
+    return parser
+
+
+def _legacy_prepare_data(model: UTimeModel, data: Data) -> np.ndarray:
+    data = copy.deepcopy(data)
+
+    if (n_samples_dropped := data.length % model.n_samples_per_period) != 0:
+        data = data[:-n_samples_dropped]
+
+    if data.sample_rate != model.input_sample_rate:
+        data = Resample()(data, model.input_sample_rate)
+
+    if quality_control := model.hyperparameters.get("quality_control_func"):
+        quality_control = dict(quality_control)
+        quality_control_function = getattr(
+            quality_control_funcs, quality_control.pop("quality_control_func")
+        )
+        data.array, _ = quality_control_function(
+            psg=data.array,
+            sample_rate=data.sample_rate,
+            period_length_sec=model.n_samples_per_period / data.sample_rate,
+            **quality_control,
+        )
+
+    if scaler := model.hyperparameters.get("scaler"):
+        data.array, _ = apply_scaling(data.array, scaler)
+
+    periods = get_all_periods(data, model.n_samples_per_period)
+    batch_size = periods.shape[0] // model.n_periods
+    periods = periods[: batch_size * model.n_periods]
+    return periods.reshape(
+        batch_size, model.n_periods, model.n_samples_per_period, -1
+    ).astype(np.float32)
+
+
+def _measure_peak_memory(
+    prepare_data: Callable[[Data], np.ndarray], data: Data, repeats: int
+) -> list[int]:
+    peaks = []
+
+    for _ in range(repeats):
+        tracemalloc.start()
+        prepare_data(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+
+    return peaks
+
+
+def main() -> None:
+    args = _get_parser().parse_args()
+    logger.remove()
+
+    model = UTimeModel(args.model_dir)
+    n_samples = int(args.duration * SAMPLE_RATE)
+    data = Data(
+        np.random.default_rng(0).standard_normal((n_samples, N_CHANNELS)),
+        sample_rate=SAMPLE_RATE,
+    )
+    print(f"Input: {data.array.shape} {data.array.dtype}, {data.array.nbytes} bytes")
+
+    for name, prepare_data in [
+        ("legacy", lambda data: _legacy_prepare_data(model, data)),
+        ("current", model.prepare_data),
+    ]:
+        peaks = _measure_peak_memory(prepare_data, data, args.repeats)
+        print(
+            f"{name:>8}: peak per call (MiB) "
+            + ", ".join(f"{peak / 2**20:.1f}" for peak in peaks)
+        )
+
+
+if __name__ == "__main__":
+    main()
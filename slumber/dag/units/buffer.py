@@ -6,7 +6,8 @@ from loguru import logger
 from pydantic import Field
 
 from slumber.dag.utils import PydanticSettings
-from slumber.utils.data import Data, TimestampedArray
+from slumber.utils.data import Data
+from slumber.utils.ring_buffer import RingBuffer
 
 
 class RollingBufferSettings(PydanticSettings):
@@ -16,8 +17,10 @@ class RollingBufferSettings(PydanticSettings):
 
 
 class RollingBufferState(ez.State):
-    buffer: TimestampedArray | None = None
+    buffer: RingBuffer | None = None
     data_length: int = None
+    sample_rate: int = None
+    channel_names: list[str] = None
 
 
 class RollingBuffer(ez.Unit):
@@ -31,7 +34,7 @@ class RollingBuffer(ez.Unit):
     @ez.publisher(OUTPUT)
     async def on_message(self, data: Data) -> AsyncGenerator:
         self._update_buffer(data)
-        yield (self.OUTPUT, self.STATE.buffer)
+        yield (self.OUTPUT, self._get_buffer_data())
 
     def _update_buffer(self, data: Data) -> None:
         if not isinstance(data, Data):
@@ -46,26 +49,50 @@ class RollingBuffer(ez.Unit):
                 f" expected length {self.STATE.data_length}"
             )
 
-        self.STATE.buffer.roll(-data.length)
-        self.STATE.buffer[-data.length :] = data
+        if data.sample_rate != self.STATE.sample_rate:
+            raise ValueError(
+                f"Sample rate mismatch: {data.sample_rate} != {self.STATE.sample_rate}"
+            )
+
+        self.STATE.buffer.append(data.array, data.timestamps, data.mask)
+
+    def _get_buffer_data(self) -> Data:
+        """
+        Returns a copy of the buffer contents as a Data object. Messages are
+        delivered by reference, so subscribers may still hold the previous
+        one when the buffer is next updated.
+        """
+        mask = self.STATE.buffer.mask
+        return Data(
+            array=self.STATE.buffer.array.copy(),
+            sample_rate=self.STATE.sample_rate,
+            channel_names=self.STATE.channel_names,
+            timestamps=self.STATE.buffer.timestamps.copy(),
+            mask=None if mask is None else mask.copy(),
+        )
 
     def _initialize_buffer(self, data: Data) -> None:
         self.STATE.data_length = data.length
-        self.STATE.buffer = Data(
-            array=np.zeros(
-                (
-                    self.SETTINGS.size * data.length,
-                    data.n_channels,
-                )
-            ),
+        self.STATE.sample_rate = data.sample_rate
+        self.STATE.channel_names = data.channel_names
+        self.STATE.buffer = RingBuffer(
+            capacity=self.SETTINGS.size * data.length,
+            n_channels=data.n_channels,
+            dtype=data.array.dtype,
+            with_mask=data.mask is not None,
+        )
+
+        initial_data = Data(
+            array=np.zeros((self.STATE.buffer.capacity, data.n_channels)),
             sample_rate=data.sample_rate,
-            channel_names=data.channel_names,
             timestamp_offset=data.timestamps[0]
-            - (data.length / data.sample_rate) * (self.SETTINGS.size - 1),
+            - (data.length / data.sample_rate) * self.SETTINGS.size,
+        )
+        # The initial zeros are not valid data
+        self.STATE.buffer.fill(
+            initial_data.array,
+            initial_data.timestamps,
+            np.zeros(self.STATE.buffer.capacity, dtype=bool),
         )
-
-        assert np.equal(
-            self.STATE.buffer.timestamps[-data.length :], data.timestamps
-        ).all()
 
         logger.info(f"Initialized rolling buffer: {self.STATE.buffer}")
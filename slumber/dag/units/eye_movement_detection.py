@@ -6,10 +6,7 @@ from loguru import logger
 from pydantic import Field
 
 from slumber.dag.utils import PydanticSettings
-from slumber.processing.eye_movement import (
-    DEFAULTS,
-    detect_lr_eye_movements,
-)
+from slumber.processing.eye_movement import DEFAULTS, EyeMovementDetector
 from slumber.utils.data import Data, Event
 
 
@@ -24,15 +21,28 @@ class Settings(PydanticSettings):
     # TODO: add cross field validations
 
 
+class State(ez.State):
+    detector: EyeMovementDetector
+
+
 class EyeMovementDetection(ez.Unit):
+    """
+    Detects eye movement sequences in the EEG data, incrementally so that each
+    sequence is published once, when it is complete.
+    """
+
     SETTINGS = Settings
+    STATE = State
 
     INPUT = ez.InputStream(Data)
     OUTPUT = ez.OutputStream(list[Event])
 
+    def initialize(self) -> None:
+        self.STATE.detector = EyeMovementDetector(**asdict(self.SETTINGS))
+
     @ez.subscriber(INPUT)
     @ez.publisher(OUTPUT)
     async def detect_eye_movements(self, data: Data) -> AsyncGenerator:
-        eye_movements = detect_lr_eye_movements(data, **asdict(self.SETTINGS))
+        eye_movements = self.STATE.detector.update(data)
         logger.debug(f"Eye movements: {eye_movements}")
         yield (self.OUTPUT, eye_movements)
@@ -1,6 +1,9 @@
+import asyncio
 import time
 from collections.abc import AsyncGenerator
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Literal
 
 import ezmsg.core as ez
 import h5py
@@ -13,23 +16,86 @@ from slumber.dag.utils import PydanticSettings
 from slumber.utils.data import ArrayBase
 from slumber.utils.hdf5 import (
     DatasetDoesNotExistError,
+    DatasetOptions,
     HDF5Manager,
+    WriteBehindWriter,
+    WriteStatistics,
+    get_dataset_options,
 )
 
 
-class Settings(PydanticSettings):
+class StorageSettings(PydanticSettings):
     file_path: Path
-    group_name: str
+    compression: Literal["gzip", "lzf"] | None = settings["hdf5"]["compression"]
+    chunk_size: int = Field(
+        1024, gt=0, description="Number of rows in each chunk of the datasets"
+    )
+    growth_factor: float = Field(
+        2.0,
+        ge=1.0,
+        description=(
+            "Factor by which full datasets are over-allocated."
+            " They are trimmed to their length when the file is flushed or"
+            " closed, before which readers must only read the number of rows"
+            " in their `length` attribute."
+        ),
+    )
+    datasets: dict[str, DatasetOptions] = Field(
+        default_factory=dict,
+        description=(
+            "Options of datasets by `<group_name>/<dataset_name>` or by"
+            " `<dataset_name>` in all groups. Other datasets are compressed"
+            " with `compression`."
+        ),
+    )
+
+    @property
+    def default_dataset_options(self) -> DatasetOptions:
+        return DatasetOptions(compression=self.compression)
+
+
+def _update_attributes(
+    written_attributes: dict[str, dict], path: str, attributes: dict
+) -> bool:
+    """
+    Records the attributes of the group or dataset at path and returns
+    whether they differ from the ones written before.
+    """
+    previous = written_attributes.get(path)
+    if (
+        previous is not None
+        and previous.keys() == attributes.keys()
+        and all(
+            np.array_equal(value, previous[key]) for key, value in attributes.items()
+        )
+    ):
+        return False
+
+    written_attributes[path] = attributes
+    return bool(attributes) or previous is not None
+
+
+class Settings(StorageSettings):
+    group_name: str = Field(min_length=1)
     flush_after: int | None = Field(
         None, ge=1, description="Flush after this many writes"
     )
-    compression: str = settings["hdf5"]["compression"]
+    write_behind: bool = Field(
+        False,
+        description=(
+            "Write from a background thread instead of the event loop."
+            " Rows are staged in memory and written in blocks of whole chunks,"
+            " or all of them when flushing."
+        ),
+    )
 
 
 class State(ez.State):
     hdf5_manager: HDF5Manager
     group: h5py.Group
     write_counter: int
+    attributes: dict[str, dict]  # By path of the group or dataset
+    writer: WriteBehindWriter | None = None
 
 
 class HDF5Storage(ez.Unit):
@@ -44,15 +110,51 @@ class HDF5Storage(ez.Unit):
             self.SETTINGS.group_name
         )
         self.STATE.write_counter = 0
+        self.STATE.attributes = {}
+
+        if self.SETTINGS.write_behind:
+            self.STATE.writer = WriteBehindWriter(
+                self.STATE.hdf5_manager,
+                chunk_size=self.SETTINGS.chunk_size,
+                growth_factor=self.SETTINGS.growth_factor,
+                default_options=self.SETTINGS.default_dataset_options,
+                dataset_options=self.SETTINGS.datasets,
+            )
 
     def shutdown(self):
-        self.STATE.hdf5_manager.close()
+        try:
+            if self.STATE.writer is not None:
+                self.STATE.writer.close()
+        finally:
+            self.STATE.hdf5_manager.close()
 
     @ez.subscriber(INPUT)
     async def store(self, message: ArrayBase) -> AsyncGenerator:
-        self.STATE.group.attrs.update(message.attributes)
+        group_name = self.SETTINGS.group_name
+
+        if _update_attributes(self.STATE.attributes, group_name, message.attributes):
+            if self.STATE.writer is not None:
+                self.STATE.writer.set_attributes(group_name, **message.attributes)
+            else:
+                self.STATE.group.attrs.update(message.attributes)
+
         for dataset_name, data in message.datasets.items():
-            self._store_data(data, dataset_name)
+            attributes = message.dataset_attributes.get(dataset_name, {})
+            path = f"{group_name}/{dataset_name}"
+
+            if self.STATE.writer is not None:
+                if _update_attributes(self.STATE.attributes, path, attributes):
+                    self.STATE.writer.set_dataset_attributes(
+                        group_name, dataset_name, **attributes
+                    )
+                self.STATE.writer.append(group_name, dataset_name, data)
+            # Only recorded once written, as empty data does not create the dataset
+            elif self._store_data(data, dataset_name) and _update_attributes(
+                self.STATE.attributes, path, attributes
+            ):
+                self.STATE.hdf5_manager.get_dataset(
+                    group_name, dataset_name
+                ).attrs.update(attributes)
 
         self.STATE.write_counter += 1
         if (
@@ -63,20 +165,33 @@ class HDF5Storage(ez.Unit):
                 f"{self.address} is flushing {self.STATE.hdf5_manager.file_path}",
                 flush_after=self.SETTINGS.flush_after,
             )
-            self.STATE.hdf5_manager.file.flush()
+            if self.STATE.writer is not None:
+                self.STATE.writer.flush()
+            else:
+                self.STATE.hdf5_manager.flush()
             self.STATE.write_counter = 0
 
-    def _store_data(self, data: np.ndarray, dataset_name: str) -> None:
+    def _store_data(self, data: np.ndarray, dataset_name: str) -> bool:
+        """Returns whether the data was stored, i.e. it is not empty."""
         if data.size == 0:
             logger.warning(f"Data is empty. Skipping storage of {dataset_name}.")
-            return
+            return False
 
         start_time = time.time()
+        options = get_dataset_options(
+            self.SETTINGS.datasets,
+            self.SETTINGS.group_name,
+            dataset_name,
+            self.SETTINGS.default_dataset_options,
+        )
+        data = options.encode(data)
+
         try:
             self.STATE.hdf5_manager.append(
                 group_name=self.SETTINGS.group_name,
                 dataset_name=dataset_name,
                 data=data,
+                growth_factor=self.SETTINGS.growth_factor,
             )
         except DatasetDoesNotExistError:
             logger.info(f"Dataset `{dataset_name}` does not exist. Creating it.")
@@ -84,10 +199,133 @@ class HDF5Storage(ez.Unit):
                 group_name=self.SETTINGS.group_name,
                 dataset_name=dataset_name,
                 data=data,
-                compression=self.SETTINGS.compression,
+                chunks=(self.SETTINGS.chunk_size, *data.shape[1:]),
+                **options.create_kwargs,
             )
 
         logger.info(
             f"Stored data {data.shape} in datast {dataset_name}"
             f" in {time.time() - start_time} seconds."
         )
+        return True
+
+
+@dataclass
+class GroupMessage:
+    group_name: str
+    message: ArrayBase
+
+
+class HDF5GroupTagSettings(PydanticSettings):
+    group_name: str
+
+
+class HDF5GroupTag(ez.Unit):
+    """
+    Tags messages with the HDF5 group they are stored in by HDF5StorageService.
+    """
+
+    SETTINGS = HDF5GroupTagSettings
+
+    INPUT = ez.InputStream(ArrayBase)
+    OUTPUT = ez.OutputStream(GroupMessage)
+
+    @ez.subscriber(INPUT)
+    @ez.publisher(OUTPUT)
+    async def tag(self, message: ArrayBase) -> AsyncGenerator:
+        yield (self.OUTPUT, GroupMessage(self.SETTINGS.group_name, message))
+
+
+class HDF5StorageServiceSettings(StorageSettings):
+    flush_interval: float = Field(
+        15.0, gt=0, description="Seconds between flushes of all groups"
+    )
+    log_statistics_interval: float | None = Field(None, gt=0)
+
+
+class HDF5StorageServiceState(ez.State):
+    hdf5_manager: HDF5Manager
+    writer: WriteBehindWriter
+    attributes: dict[str, dict]
+
+
+class HDF5StorageService(ez.Unit):
+    """
+    Stores the messages of all groups of a file through a single file handle.
+    Messages from HDF5GroupTag units are written from a background thread and
+    all groups are flushed together every flush_interval seconds.
+    """
+
+    SETTINGS = HDF5StorageServiceSettings
+    STATE = HDF5StorageServiceState
+
+    INPUT = ez.InputStream(GroupMessage)
+
+    def initialize(self) -> None:
+        self.STATE.hdf5_manager = HDF5Manager(self.SETTINGS.file_path)
+        self.STATE.writer = WriteBehindWriter(
+            self.STATE.hdf5_manager,
+            chunk_size=self.SETTINGS.chunk_size,
+            growth_factor=self.SETTINGS.growth_factor,
+            default_options=self.SETTINGS.default_dataset_options,
+            dataset_options=self.SETTINGS.datasets,
+        )
+        self.STATE.attributes = {}
+
+    def shutdown(self):
+        try:
+            self.STATE.writer.close()
+        finally:
+            self._log_statistics()
+            self.STATE.hdf5_manager.close()
+
+    @property
+    def statistics(self) -> dict[str, WriteStatistics]:
+        """Returns the write statistics of each group."""
+        return self.STATE.writer.statistics
+
+    @ez.subscriber(INPUT)
+    async def store(self, message: GroupMessage) -> None:
+        group_name = message.group_name
+        attributes = message.message.attributes
+
+        if _update_attributes(self.STATE.attributes, group_name, attributes):
+            self.STATE.writer.set_attributes(group_name, **attributes)
+
+        for dataset_name, data in message.message.datasets.items():
+            attributes = message.message.dataset_attributes.get(dataset_name, {})
+            if _update_attributes(
+                self.STATE.attributes, f"{group_name}/{dataset_name}", attributes
+            ):
+                self.STATE.writer.set_dataset_attributes(
+                    group_name, dataset_name, **attributes
+                )
+
+            self.STATE.writer.append(group_name, dataset_name, data)
+
+    @ez.task
+    async def flush(self) -> None:
+        while True:
+            await asyncio.sleep(self.SETTINGS.flush_interval)
+            logger.debug(f"{self.address} is flushing {self.SETTINGS.file_path}")
+            self.STATE.writer.flush()
+
+    @ez.task
+    async def log_statistics(self) -> None:
+        if self.SETTINGS.log_statistics_interval is None:
+            return
+
+        while True:
+            await asyncio.sleep(self.SETTINGS.log_statistics_interval)
+            self._log_statistics()
+
+    def _log_statistics(self) -> None:
+        for group_name, statistics in list(self.statistics.items()):
+            logger.info(
+                f"{self.address} wrote {statistics.bytes_written} bytes to"
+                f" {group_name} in {statistics.writes} writes, mean latency"
+                f" {statistics.mean_latency * 1000:.1f} ms.",
+                group_name=group_name,
+                mean_latency=statistics.mean_latency,
+                **asdict(statistics),
+            )
@@ -1,4 +1,3 @@
-import asyncio
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
@@ -26,6 +25,7 @@ from slumber.sources.zmax import (
     LEDColor,
 )
 from slumber.utils.audio import temporary_volume
+from slumber.utils.clock import get_clock
 from slumber.utils.helpers import (
     create_enum_by_name_resolver,
 )
@@ -200,7 +200,7 @@ class Cueing(ez.Unit):
                     "Cueing is disabled. Trying again in"
                     f" {self.SETTINGS.enabled_check_interval} second."
                 )
-                await asyncio.sleep(self.SETTINGS.enabled_check_interval)
+                await get_clock().sleep(self.SETTINGS.enabled_check_interval)
                 continue
 
             visual_cueing_signal = self._generate_visual_cueing_signal()
@@ -212,7 +212,7 @@ class Cueing(ez.Unit):
                 ),
             )
             yield (self.OUTPUT_ZMAX_STIMULATION_SIGNAL, visual_cueing_signal)
-            await asyncio.sleep(self.SETTINGS.cueing_interval)
+            await get_clock().sleep(self.SETTINGS.cueing_interval)
 
             if not self.STATE.enabled:
                 logger.info("Cueing is disabled. Stopping cueing.")
@@ -233,7 +233,7 @@ class Cueing(ez.Unit):
                 self.STATE.audio_intensity.value,
                 self.STATE.audio_intensity.engine,
             )
-            await asyncio.sleep(self.SETTINGS.cueing_interval)
+            await get_clock().sleep(self.SETTINGS.cueing_interval)
 
             if not self.STATE.enabled:
                 logger.info("Cueing is disabled. Stopping cueing.")
@@ -249,7 +249,7 @@ class Cueing(ez.Unit):
                 ),
             )
             yield (self.OUTPUT_ZMAX_STIMULATION_SIGNAL, vibration_cueing_signal)
-            await asyncio.sleep(self.SETTINGS.cueing_interval)
+            await get_clock().sleep(self.SETTINGS.cueing_interval)
 
             if self.STATE.increase_intensity:
                 self._adjust_intensity(increment=True)
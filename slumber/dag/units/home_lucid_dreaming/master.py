@@ -1,5 +1,4 @@
 import asyncio
-import time
 from collections.abc import AsyncGenerator
 from enum import Enum
 from multiprocessing.connection import Connection
@@ -14,6 +13,7 @@ from slumber import settings
 from slumber.dag.units.event_logger import Event as LogEvent
 from slumber.dag.units.zmax import ZMaxStimulationSignal
 from slumber.dag.utils import PydanticSettings
+from slumber.utils.clock import get_clock
 from slumber.utils.data import Data, Event
 from slumber.utils.helpers import create_enum_by_name_resolver
 
@@ -46,6 +46,12 @@ class Settings(PydanticSettings):
     ] = ExperimentState.AWAKE
     gui_connection: Connection | None = None
     minimum_elapsed_time: float = Field(0.0, ge=0.0)
+    eye_signal_duration: float = Field(
+        30.0,
+        gt=0.0,
+        description="Seconds the participant is considered eye signaling after"
+        " an accepted eye signal is received",
+    )
 
 
 class State(ez.State):
@@ -54,6 +60,7 @@ class State(ez.State):
     in_rem: bool  # by sleep staging
     aroused: bool
     eye_signaling: bool
+    last_eye_signal_time: float | None
     rem_cueing: bool
     gui_connection: Connection
 
@@ -74,17 +81,18 @@ class Master(ez.Unit):
     OUTPUT_WAKE_UP_SIGNAL = ez.OutputStream(ZMaxStimulationSignal)
 
     async def initialize(self) -> None:
-        self.STATE.start_time = time.time()
+        self.STATE.start_time = get_clock().time()
         self.STATE.experiment_state = self.SETTINGS.experiment_state
         self.STATE.in_rem = False
         self.STATE.aroused = False
         self.STATE.eye_signaling = False
+        self.STATE.last_eye_signal_time = None
         self.STATE.rem_cueing = self.SETTINGS.cueing_enabled
         self.STATE.gui_connection = self.SETTINGS.gui_connection
 
     @property
     def elapsed_time(self) -> float:
-        return time.time() - self.STATE.start_time
+        return get_clock().time() - self.STATE.start_time
 
     @ez.publisher(OUTPUT_LOG_EVENT)
     async def update_experiment_state(self) -> AsyncGenerator:
@@ -174,10 +182,18 @@ class Master(ez.Unit):
             return
 
         logger.debug(f"Eye signals: {events}")
-        eye_signaling = any(
+        # Each eye signal is received once, when it is complete
+        now = get_clock().time()
+        if any(
             event.label.startswith(prefix)
             for event in events
             for prefix in self.SETTINGS.accepted_eye_signals
+        ):
+            self.STATE.last_eye_signal_time = now
+        eye_signaling = (
+            self.STATE.last_eye_signal_time is not None
+            and now - self.STATE.last_eye_signal_time
+            < self.SETTINGS.eye_signal_duration
         )
 
         if not eye_signaling and self.STATE.eye_signaling and not self.STATE.in_rem:
@@ -253,7 +269,7 @@ class Master(ez.Unit):
         while self.STATE.experiment_state != ExperimentState.AWAKE:
             yield (self.OUTPUT_WAKE_UP_SIGNAL, self.SETTINGS.wake_up_signal)
             logger.info("Wake up signal sent", signal=self.SETTINGS.wake_up_signal)
-            await asyncio.sleep(self.SETTINGS.wake_up_signal_interval)
+            await get_clock().sleep(self.SETTINGS.wake_up_signal_interval)
 
     async def _log_events(
         self, events: list[Event], event_type: EventType, include_label: bool = True
@@ -1,28 +1,39 @@
 import asyncio
-import time
 from collections.abc import AsyncGenerator
-from typing import Generic, TypeVar
+from dataclasses import asdict, dataclass
+from typing import Generic, Literal, TypeVar
 
 import ezmsg.core as ez
 import numpy as np
-from ezmsg.util.rate import Rate
 from loguru import logger
 from pydantic import Field, model_validator
 
 from slumber.dag.utils import PydanticSettings
+from slumber.utils.clock import Rate, get_clock
 from slumber.utils.data import (
     Data,
     Sample,
     TimestampedArray,
-    samples_to_timestamped_array,
+    to_timestamped_array,
 )
+from slumber.utils.sample_ring import SampleRing
 
 T = TypeVar("T")
 
+INITIAL_PENDING_CAPACITY = 1024
+
 
 class QueueSettings(PydanticSettings):
     max_size: int = Field(gt=0)
     leaky: bool = False
+    storage: Literal["queue", "ring"] = Field(
+        "queue",
+        description=(
+            "queue: messages are stored in an asyncio.Queue of max_size messages."
+            " ring: the samples of the messages are copied into a preallocated"
+            " ring of max_size samples and drained in bulk."
+        ),
+    )
     log_queue_size_interval: float | None = Field(None, gt=0)
 
 
@@ -47,6 +58,29 @@ class TimeQueueSettings(QueueSettings):
     gap_threshold: float = Field(ge=0)
     dropped_samples_warn_threshold: int | None = Field(None, ge=0)
     timestamp_margin: float = Field(ge=0)
+    interpolation: Literal["zero", "nearest", "linear"] = Field(
+        "zero",
+        description=(
+            "How samples are mapped onto the regular timestamps."
+            " zero: samples are placed in order at consecutive regular"
+            " timestamps, skipping to the nearest one after gaps longer than"
+            " gap_threshold, regular timestamps without a sample are zero."
+            " nearest: each regular timestamp takes the nearest sample."
+            " linear: samples are linearly interpolated."
+        ),
+    )
+    gap_fill: Literal["zero", "linear", "hold", "nan"] | None = Field(
+        None,
+        description=(
+            "How regular timestamps in gaps longer than gap_threshold are filled."
+            " zero: with zeros."
+            " linear: linearly interpolated between the samples around the gap."
+            " hold: with the last sample before the gap."
+            " nan: with NaN."
+            " If None, they are filled like the other timestamps."
+            " In all cases, the published data has a mask marking them invalid."
+        ),
+    )
 
     @property
     def expected_publish_samples(self) -> int:
@@ -56,12 +90,34 @@ class TimeQueueSettings(QueueSettings):
 class QueueState(ez.State):
     queue: asyncio.Queue
     leaky: bool
+    ring: SampleRing | None = None
+    ring_not_empty: asyncio.Event
+    ring_not_full: asyncio.Event
+    channel_names: list[str] | None = None
+    scale: np.ndarray | None = None
+    offset: np.ndarray | None = None
+    n_dropped: int = 0
+
+
+class CountQueueState(QueueState):
+    remainder: TimestampedArray | None = None
 
 
 class TimeQueueState(QueueState):
     publish_rate: Rate
     publish_enabled: bool
-    channel_names: list[str] | None = None
+    pending_timestamps: np.ndarray | None = None
+    pending_array: np.ndarray | None = None
+    n_pending: int = 0
+    last_values: np.ndarray | None = None
+
+
+@dataclass
+class GapStatistics:
+    dropped_samples: int
+    missing_samples: int
+    gaps: int
+    max_gap_duration: float
 
 
 class Queue(ez.Unit, Generic[T]):
@@ -73,6 +129,17 @@ class Queue(ez.Unit, Generic[T]):
     async def initialize(self):
         self.STATE.leaky = self.SETTINGS.leaky
         self.STATE.queue = asyncio.Queue(self.SETTINGS.max_size)
+        self.STATE.ring_not_empty = asyncio.Event()
+        self.STATE.ring_not_full = asyncio.Event()
+
+    @property
+    def queue_size(self) -> int:
+        """
+        Returns the number of queued messages, or samples with ring storage.
+        """
+        if self.SETTINGS.storage == "ring":
+            return 0 if self.STATE.ring is None else len(self.STATE.ring)
+        return self.STATE.queue.qsize()
 
     @ez.task
     async def monitor_queue_size(self) -> None:
@@ -82,48 +149,121 @@ class Queue(ez.Unit, Generic[T]):
         while True:
             await asyncio.sleep(self.SETTINGS.log_queue_size_interval)
             logger.debug(
-                f"{self.address} has {self.STATE.queue.qsize()} samples queued."
+                f"{self.address} has {self.queue_size} {self.SETTINGS.storage} items"
+                f" queued and dropped {self.STATE.n_dropped} in total."
             )
 
     @ez.subscriber(INPUT)
     async def on_message(self, message: T) -> None:
-        if not self.STATE.leaky:
+        if self.SETTINGS.storage == "ring":
+            await self._push_ring(message)
+        elif not self.STATE.leaky:
             await self.STATE.queue.put(message)
         else:
             try:
                 self.STATE.queue.put_nowait(message)
             except asyncio.QueueFull:
-                logger.warning(
-                    f"{self.address} queue is full, dropping message.", message=message
-                )
                 self.STATE.queue.get_nowait()
                 self.STATE.queue.put_nowait(message)
+                self._count_dropped(1)
+
+    def _count_dropped(self, n_dropped: int) -> None:
+        # Drops are counted, and only the first one is logged,
+        # to keep logging off the hot path of an overflowing queue
+        if self.STATE.n_dropped == 0:
+            logger.warning(
+                f"{self.address} queue is full, dropping the oldest items."
+                " Further drops are counted and reported with the queue size."
+            )
+        self.STATE.n_dropped += n_dropped
 
+    async def _push_ring(self, message: Sample | TimestampedArray) -> None:
+        if isinstance(message, Sample):
+            array = message.array.reshape(1, -1)
+            timestamps = np.array([message.timestamp])
+        else:
+            array, timestamps = message.array, message.timestamps
+
+        if self.STATE.ring is None:
+            self.STATE.channel_names = message.channel_names
+            self.STATE.scale, self.STATE.offset = message.scale, message.offset
+            self.STATE.ring = SampleRing(
+                self.SETTINGS.max_size, array.shape[1], dtype=array.dtype
+            )
+
+        if not self.STATE.leaky:
+            while self.STATE.ring.free < min(len(array), self.STATE.ring.capacity):
+                self.STATE.ring_not_full.clear()
+                await self.STATE.ring_not_full.wait()
+
+        if n_dropped := self.STATE.ring.push(array, timestamps):
+            self._count_dropped(n_dropped)
+
+        self.STATE.ring_not_empty.set()
+
+    async def _wait_ring(self, n_samples: int = 1) -> None:
+        while self.STATE.ring is None or len(self.STATE.ring) < n_samples:
+            self.STATE.ring_not_empty.clear()
+            await self.STATE.ring_not_empty.wait()
+
+    def _drain_ring(self, n_samples: int | None = None) -> TimestampedArray:
+        array, timestamps = self.STATE.ring.drain(n_samples)
+        self.STATE.ring_not_full.set()
+        return TimestampedArray(
+            array,
+            self.STATE.channel_names,
+            timestamps,
+            scale=self.STATE.scale,
+            offset=self.STATE.offset,
+        )
 
-class CountQueue(Queue[Sample]):
+
+class CountQueue(Queue[Sample | TimestampedArray]):
     SETTINGS = CountQueueSettings
-    STATE = QueueState
+    STATE = CountQueueState
 
     OUTPUT = ez.OutputStream(TimestampedArray)
 
     @ez.publisher(OUTPUT)
     async def publish(self) -> AsyncGenerator:
         while True:
-            samples = []
-            for _ in range(self.SETTINGS.publish_count):
-                sample = await self.STATE.queue.get()
-                samples.append(sample)
+            if self.SETTINGS.storage == "ring":
+                await self._wait_ring(self.SETTINGS.publish_count)
+                array = self._drain_ring(self.SETTINGS.publish_count)
+            else:
+                array = await self._get_queued_array()
 
-            array = samples_to_timestamped_array(samples)
             logger.debug(f"{self.address} publishing {array}.")
 
             yield (self.OUTPUT, array)
 
+    async def _get_queued_array(self) -> TimestampedArray:
+        messages = []
+        n_samples = 0
+
+        if self.STATE.remainder is not None:
+            messages.append(self.STATE.remainder)
+            n_samples += self.STATE.remainder.length
+            self.STATE.remainder = None
+
+        while n_samples < self.SETTINGS.publish_count:
+            message = await self.STATE.queue.get()
+            messages.append(message)
+            n_samples += 1 if isinstance(message, Sample) else message.length
+
+        array = to_timestamped_array(messages)
+
+        if n_samples > self.SETTINGS.publish_count:
+            self.STATE.remainder = array[self.SETTINGS.publish_count :]
+            array = array[: self.SETTINGS.publish_count]
+
+        return array
+
 
 # TODO: make a base TimeQueue thst doesn't regularize sample rate
 
 
-class TimeQueue(Queue[Sample]):
+class TimeQueue(Queue[Sample | TimestampedArray]):
     SETTINGS = TimeQueueSettings
     STATE = TimeQueueState
 
@@ -145,9 +285,9 @@ class TimeQueue(Queue[Sample]):
 
     @ez.publisher(OUTPUT)
     async def publish(self) -> AsyncGenerator:
-        while self.STATE.queue.empty():
+        while self.queue_size == 0:
             logger.info("Waiting for the first sample to be received.")
-            await asyncio.sleep(self.SETTINGS.publish_enabled_check_interval)
+            await get_clock().sleep(self.SETTINGS.publish_enabled_check_interval)
             continue
 
         self._set_channel_names()
@@ -158,16 +298,18 @@ class TimeQueue(Queue[Sample]):
                     "Publishing is disabled. Trying again in"
                     f" {self.SETTINGS.publish_enabled_check_interval} second."
                 )
-                await asyncio.sleep(self.SETTINGS.publish_enabled_check_interval)
+                await get_clock().sleep(self.SETTINGS.publish_enabled_check_interval)
                 continue
 
-            current_time = time.time()
+            current_time = get_clock().time()
             expected_publish_time = (
                 self.STATE.publish_rate.last_time + self.SETTINGS.publish_interval
             )
 
             if expected_publish_time < current_time:
-                # TODO: Handle the data in the gap
+                # Samples older than the next window are dropped and counted
+                # in its gap statistics, and the slots missing in the window
+                # are filled according to gap_fill, see _process_queue
                 logger.warning(
                     f"{self.address} is behind schedule by"
                     f" {current_time - expected_publish_time} seconds.",
@@ -188,73 +330,347 @@ class TimeQueue(Queue[Sample]):
             yield (self.OUTPUT, data)
 
     def _set_channel_names(self) -> None:
-        sample: Sample = self.STATE.queue.get_nowait()
-        self.STATE.channel_names = sample.channel_names
+        message: Sample | TimestampedArray = (
+            self._drain_ring()
+            if self.SETTINGS.storage == "ring"
+            else self.STATE.queue.get_nowait()
+        )
+        self.STATE.channel_names = message.channel_names
         logger.info(f"Setting channel names to {self.STATE.channel_names}.")
 
-    def _process_queue(self, start_time: float, end_time: float) -> list[Sample]:
-        regular_timestamps = np.linspace(
-            start_time, end_time, self.SETTINGS.expected_publish_samples
+        self.STATE.pending_timestamps = np.empty(INITIAL_PENDING_CAPACITY)
+        self.STATE.pending_array = np.empty(
+            (INITIAL_PENDING_CAPACITY, len(self.STATE.channel_names))
         )
-        array = np.zeros(
-            (
-                self.SETTINGS.expected_publish_samples,
-                len(self.STATE.channel_names),
+        self._add_pending(message)
+
+    def _add_pending(self, message: Sample | TimestampedArray) -> None:
+        # Raw counts are scaled here, since they are interpolated
+        if isinstance(message, Sample):
+            timestamps, array = message.timestamp, message.physical_array
+            n_samples = 1
+        else:
+            timestamps, array = message.timestamps, message.physical_array
+            n_samples = message.length
+
+        n_pending = self.STATE.n_pending + n_samples
+        if n_pending > len(self.STATE.pending_timestamps):
+            capacity = max(n_pending, 2 * len(self.STATE.pending_timestamps))
+            self.STATE.pending_timestamps = np.resize(
+                self.STATE.pending_timestamps, capacity
+            )
+            self.STATE.pending_array = np.resize(
+                self.STATE.pending_array, (capacity, self.STATE.pending_array.shape[1])
             )
-        )
 
-        dropped_samples = 0
-        index = 0
-        while (
-            not self.STATE.queue.empty()
-            and index < self.SETTINGS.expected_publish_samples
-        ):
-            sample: Sample = self.STATE.queue.get_nowait()
+        self.STATE.pending_timestamps[self.STATE.n_pending : n_pending] = timestamps
+        self.STATE.pending_array[self.STATE.n_pending : n_pending] = array
+        self.STATE.n_pending = n_pending
 
-            if sample.timestamp < start_time - self.SETTINGS.timestamp_margin:
-                logger.debug(
-                    "Dropping sample that is too old."
-                    f" Cutoff time is {start_time} but"
-                    f" sample timestamp is {sample.timestamp}"
-                )
-                dropped_samples += 1
-                continue
+    def _drain_queue(self) -> None:
+        if self.SETTINGS.storage == "ring":
+            if len(self.STATE.ring) > 0:
+                self._add_pending(self._drain_ring())
+            return
 
-            if (
-                gap := sample.timestamp - regular_timestamps[index]
-            ) > self.SETTINGS.gap_threshold:
-                logger.warning(
-                    f"Large gap ({gap} sec) detected in data."
-                    f" Current index: {index}. Finding next closest index ...",
-                    sample_timestamp=sample.timestamp,
-                    index_timestamp=regular_timestamps[index],
-                    gap_threshold=self.SETTINGS.gap_threshold,
-                )
-                index = np.argmin(np.abs(regular_timestamps[index:] - sample.timestamp))
-                logger.debug(f"Found next closest index: {index}.")
+        while not self.STATE.queue.empty():
+            self._add_pending(self.STATE.queue.get_nowait())
 
-            array[index, :] = sample.array
-            index += 1
+    def _process_queue(self, start_time: float, end_time: float) -> Data:
+        """
+        Maps the queued samples between start_time and end_time, with the
+        timestamp margin, onto regular timestamps. Older samples are dropped.
+        Samples closer to the next regular timestamps are kept for the next
+        call, but still used for nearest and linear interpolation
+        if they are within the margin.
+        """
+        self._drain_queue()
 
-            if sample.timestamp >= end_time + self.SETTINGS.timestamp_margin:
-                logger.debug(
-                    f"Sample timestamp ({sample.timestamp}) is past"
-                    f" end time + margin ({end_time + self.SETTINGS.timestamp_margin})."
-                    " Stopping."
-                )
-                break
+        n_pending = self.STATE.n_pending
+        timestamps = self.STATE.pending_timestamps[:n_pending]
+        array = self.STATE.pending_array[:n_pending]
+
+        regular_timestamps = np.linspace(
+            start_time, end_time, self.SETTINGS.expected_publish_samples
+        )
+        half_sample_period = 0.5 / self.SETTINGS.sample_rate
+
+        is_too_old = timestamps < start_time - self.SETTINGS.timestamp_margin
+        is_kept = timestamps >= end_time + min(
+            half_sample_period, self.SETTINGS.timestamp_margin
+        )
+        is_used = ~is_too_old & (timestamps < end_time + self.SETTINGS.timestamp_margin)
+        if self.SETTINGS.interpolation == "zero":
+            is_used &= ~is_kept
+
+        regular_array, mask, gap_statistics = regularize(
+            timestamps[is_used],
+            array[is_used],
+            regular_timestamps,
+            interpolation=self.SETTINGS.interpolation,
+            gap_threshold=self.SETTINGS.gap_threshold,
+            gap_fill=self.SETTINGS.gap_fill,
+            previous_values=self.STATE.last_values,
+        )
+        # Samples that did not fit the regular timestamps are dropped too
+        gap_statistics.dropped_samples += int(np.count_nonzero(is_too_old))
+
+        is_published = ~is_too_old & ~is_kept
+        if is_published.any():
+            last_index = np.flatnonzero(is_published)[
+                np.argmax(timestamps[is_published])
+            ]
+            self.STATE.last_values = array[last_index].copy()
+
+        n_kept = int(np.count_nonzero(is_kept))
+        self.STATE.pending_timestamps[:n_kept] = timestamps[is_kept]
+        self.STATE.pending_array[:n_kept] = array[is_kept]
+        self.STATE.n_pending = n_kept
 
         if (
             self.SETTINGS.dropped_samples_warn_threshold is not None
-            and dropped_samples > self.SETTINGS.dropped_samples_warn_threshold
+            and gap_statistics.dropped_samples
+            > self.SETTINGS.dropped_samples_warn_threshold
         ):
             logger.warning(
-                f"{self.address} dropped {dropped_samples} samples due to being too old"
+                f"{self.address} dropped {gap_statistics.dropped_samples} samples"
+                " due to being too old"
+            )
+
+        if gap_statistics.gaps > 0:
+            logger.warning(
+                f"{gap_statistics.gaps} gaps detected in data,"
+                f" the longest is {gap_statistics.max_gap_duration} sec.",
+                **asdict(gap_statistics),
+                gap_threshold=self.SETTINGS.gap_threshold,
             )
 
         return Data(
-            array=array,
+            array=regular_array,
             timestamps=regular_timestamps,
             sample_rate=self.SETTINGS.sample_rate,
             channel_names=self.STATE.channel_names,
+            metadata={"gap_statistics": gap_statistics},
+            mask=mask,
         )
+
+
+def regularize(
+    timestamps: np.ndarray,
+    array: np.ndarray,
+    regular_timestamps: np.ndarray,
+    interpolation: Literal["zero", "nearest", "linear"] = "zero",
+    gap_threshold: float = np.inf,
+    gap_fill: Literal["zero", "linear", "hold", "nan"] | None = None,
+    previous_values: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, GapStatistics]:
+    """
+    Maps samples onto regular timestamps.
+
+    Args:
+        timestamps (np.ndarray): The sample timestamps.
+                                 Shape (n_samples,)
+        array (np.ndarray): The sample values.
+                            Shape (n_samples, n_channels)
+        regular_timestamps (np.ndarray): Evenly spaced timestamps.
+                                         Shape (n_regular_samples,)
+        interpolation (str): See TimeQueueSettings.interpolation.
+        gap_threshold (float): Time in seconds between consecutive samples
+                               above which they are separated by a gap.
+                               The regular timestamps in a gap are missing.
+        gap_fill (str): See TimeQueueSettings.gap_fill.
+        previous_values (np.ndarray): The values of the sample before the
+                                      first one, held in a leading gap.
+                                      Shape (n_channels,)
+
+    Returns:
+        np.ndarray: The values at the regular timestamps.
+                    Shape (n_regular_samples, n_channels)
+        np.ndarray: Whether each regular timestamp is valid, i.e. not missing.
+                    Shape (n_regular_samples,)
+        GapStatistics: The gaps in the samples. With zero interpolation,
+                       regular timestamps without a sample are missing and
+                       samples that do not fit are dropped.
+    """
+    if np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, array = timestamps[order], array[order]
+
+    regular_array = np.zeros((len(regular_timestamps), array.shape[1]))
+    is_unfilled = np.ones(len(regular_timestamps), dtype=bool)
+    n_overflowing = 0
+
+    if len(timestamps) > 0:
+        if interpolation == "zero":
+            indices = _get_slot_indices(regular_timestamps, timestamps, gap_threshold)
+            is_placed = indices < len(regular_timestamps)
+            regular_array[indices[is_placed]] = array[is_placed]
+            is_unfilled[indices[is_placed]] = False
+            n_overflowing = len(indices) - int(np.count_nonzero(is_placed))
+        elif interpolation == "nearest":
+            regular_array[:] = array[
+                _get_nearest_indices(timestamps, regular_timestamps)
+            ]
+        elif interpolation == "linear":
+            _interpolate(timestamps, array, regular_timestamps, out=regular_array)
+        else:
+            raise ValueError(f"Invalid interpolation: {interpolation}")
+
+    is_missing, gap_statistics = _find_gaps(
+        timestamps, regular_timestamps, gap_threshold
+    )
+    if interpolation == "zero":
+        # Regular timestamps are missing exactly if no sample was placed there
+        is_missing = is_unfilled
+        gap_statistics.missing_samples = int(np.count_nonzero(is_missing))
+        gap_statistics.dropped_samples = n_overflowing
+
+    if gap_fill is not None and is_missing.any():
+        regular_array[is_missing] = _fill_gaps(
+            timestamps,
+            array,
+            regular_timestamps[is_missing],
+            gap_fill,
+            previous_values,
+        )
+
+    return regular_array, ~is_missing, gap_statistics
+
+
+def _interpolate(
+    timestamps: np.ndarray,
+    array: np.ndarray,
+    new_timestamps: np.ndarray,
+    out: np.ndarray,
+) -> np.ndarray:
+    for channel in range(array.shape[1]):
+        out[:, channel] = np.interp(new_timestamps, timestamps, array[:, channel])
+    return out
+
+
+def _fill_gaps(
+    timestamps: np.ndarray,
+    array: np.ndarray,
+    missing_timestamps: np.ndarray,
+    gap_fill: Literal["zero", "linear", "hold", "nan"],
+    previous_values: np.ndarray | None,
+) -> np.ndarray:
+    """
+    Returns the values of the missing timestamps.
+    Shape (n_missing_timestamps, n_channels)
+    """
+    shape = (len(missing_timestamps), array.shape[1])
+
+    if gap_fill == "zero":
+        return np.zeros(shape)
+
+    if gap_fill == "nan":
+        return np.full(shape, np.nan)
+
+    if gap_fill not in ("linear", "hold"):
+        raise ValueError(f"Invalid gap fill: {gap_fill}")
+
+    if len(timestamps) == 0:
+        if previous_values is None:
+            return np.zeros(shape)
+        return np.tile(previous_values, (len(missing_timestamps), 1))
+
+    if gap_fill == "linear":
+        return _interpolate(timestamps, array, missing_timestamps, out=np.empty(shape))
+
+    previous_indices = np.searchsorted(timestamps, missing_timestamps, side="right") - 1
+    values = array[np.maximum(previous_indices, 0)]
+
+    if previous_values is not None:
+        values[previous_indices < 0] = previous_values
+
+    return values
+
+
+def _get_nearest_indices(reference: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Returns the index of the nearest element of the sorted reference
+    for each value.
+    """
+    if len(reference) == 1:
+        return np.zeros(len(values), dtype=int)
+
+    indices = np.clip(np.searchsorted(reference, values), 1, len(reference) - 1)
+    is_left_nearer = values - reference[indices - 1] <= reference[indices] - values
+    indices[is_left_nearer] -= 1
+    return indices
+
+
+def _get_slot_indices(
+    regular_timestamps: np.ndarray, timestamps: np.ndarray, gap_threshold: float
+) -> np.ndarray:
+    """
+    Returns the index of the regular timestamp of each sorted sample. Samples
+    are placed in order, each after the previous one, so that jittered or
+    bursty samples do not overwrite each other. The first sample, and each
+    sample more than gap_threshold after the regular timestamp it would be
+    placed at, are placed at their nearest regular timestamp instead. Samples
+    placed past the last regular timestamp get an index out of range.
+    """
+    n_samples = len(timestamps)
+    # The index of each sample's regular timestamp minus the sample's index
+    offsets = _get_nearest_indices(regular_timestamps, timestamps) - np.arange(
+        n_samples
+    )
+    sample_period = (
+        regular_timestamps[1] - regular_timestamps[0]
+        if len(regular_timestamps) > 1
+        else np.inf
+    )
+    max_shift = gap_threshold / sample_period
+
+    shifts = np.empty(n_samples, dtype=int)
+    start = 0
+    while start < n_samples:
+        # Samples are only placed later than the sequential index after gaps
+        is_after_gap = offsets[start + 1 :] - offsets[start] > max_shift
+        end = start + 1 + (np.argmax(is_after_gap) if is_after_gap.any() else n_samples)
+        shifts[start:end] = offsets[start]
+        start = end
+
+    return np.arange(n_samples) + shifts
+
+
+def _find_gaps(
+    timestamps: np.ndarray, regular_timestamps: np.ndarray, gap_threshold: float
+) -> tuple[np.ndarray, GapStatistics]:
+    """
+    Returns whether each regular timestamp is missing and the gap statistics.
+    """
+    # Regular timestamps just outside the interval bound the first and last gaps
+    sample_period = (
+        regular_timestamps[1] - regular_timestamps[0]
+        if len(regular_timestamps) > 1
+        else 0.0
+    )
+    lower_bound = regular_timestamps[0] - sample_period
+    upper_bound = regular_timestamps[-1] + sample_period
+    if len(timestamps) > 0:
+        lower_bound = min(lower_bound, timestamps[0])
+        upper_bound = max(upper_bound, timestamps[-1])
+
+    bounded_timestamps = np.concatenate([[lower_bound], timestamps, [upper_bound]])
+    intervals = np.diff(bounded_timestamps)
+    is_gap = intervals > gap_threshold
+
+    # Regular timestamps that coincide with a sample are not missing
+    interval_indices = np.clip(
+        np.searchsorted(bounded_timestamps, regular_timestamps, side="right") - 1,
+        0,
+        len(intervals) - 1,
+    )
+    is_missing = is_gap[interval_indices] & (
+        regular_timestamps != bounded_timestamps[interval_indices]
+    )
+
+    return is_missing, GapStatistics(
+        dropped_samples=0,
+        missing_samples=int(np.count_nonzero(is_missing)),
+        gaps=int(np.count_nonzero(is_gap)),
+        max_gap_duration=float(intervals[is_gap].max(initial=0.0)),
+    )
@@ -0,0 +1,141 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import ezmsg.core as ez
+from loguru import logger
+from pydantic import Field
+
+from slumber.dag.units.zmax import ZMaxStimulationSignal
+from slumber.dag.utils import PydanticSettings
+from slumber.utils.clock import VirtualClock, get_clock, set_clock
+from slumber.utils.data import TimestampedArray
+from slumber.utils.hdf5 import SessionReader
+
+
+class Settings(PydanticSettings):
+    file_path: Path
+    group_name: str = "zmax_raw"
+    block_duration: float = Field(
+        1.0, gt=0.0, description="Duration of each published block in seconds"
+    )
+    speed: float | None = Field(
+        None,
+        gt=0.0,
+        description=(
+            "Replay speed relative to real time, e.g. 60 to replay an hour in"
+            " a minute. If None, blocks are replayed as fast as possible."
+        ),
+    )
+    min_block_interval: float = Field(
+        0.005,
+        ge=0.0,
+        description=(
+            "Real time in seconds between blocks when replaying as fast as"
+            " possible, so that downstream units receive a block before the"
+            " clock passes it."
+        ),
+    )
+    start_time: float | None = None
+    end_time: float | None = None
+    data_collection_enabled_check_interval: float = Field(1.0, gt=0.0)
+    terminate: bool = Field(
+        True, description="Terminate the DAG when the replay is done"
+    )
+
+
+class State(ez.State):
+    reader: SessionReader
+    clock: VirtualClock
+    data_collection_enabled: bool = True
+
+
+class SessionReplay(ez.Unit):
+    """
+    Replays a group of a session file written by HDF5StorageService, e.g.
+    the raw ZMax data, in place of ZMaxDataReceiver.
+
+    The virtual clock of the process is advanced to the timestamps of the
+    published blocks, so that units keeping time with it, e.g. TimeQueue,
+    Master and Cueing, run as they did during the recording, at speed times
+    real time or as fast as possible. The clock should be set before the
+    DAG is run, see slumber.scripts.replay_session, as units may read it
+    when they are initialized.
+    """
+
+    SETTINGS = Settings
+    STATE = State
+
+    INPUT_DATA_COLLECTION_ENABLED = ez.InputStream(bool)
+    INPUT_STIMULATION_SIGNAL = ez.InputStream(ZMaxStimulationSignal)
+
+    OUTPUT_BLOCK = ez.OutputStream(TimestampedArray)
+
+    async def initialize(self) -> None:
+        self.STATE.reader = SessionReader(self.SETTINGS.file_path)
+
+        clock = get_clock()
+        if not isinstance(clock, VirtualClock):
+            start_time = self.SETTINGS.start_time
+            if start_time is None:
+                start_time, _ = self.STATE.reader.get_time_range(
+                    self.SETTINGS.group_name
+                )
+            logger.warning(
+                "No virtual clock is set. Setting one, but units initialized"
+                " before this one keep times of the real clock."
+            )
+            clock = VirtualClock(start_time)
+            set_clock(clock)
+
+        self.STATE.clock = clock
+
+    async def shutdown(self) -> None:
+        self.STATE.reader.close()
+
+    @ez.subscriber(INPUT_DATA_COLLECTION_ENABLED)
+    async def enable(self, enabled: bool) -> None:
+        self.STATE.data_collection_enabled = enabled
+
+    @ez.subscriber(INPUT_STIMULATION_SIGNAL)
+    async def stimulate(self, signal: ZMaxStimulationSignal) -> None:
+        logger.info(
+            f"Replayed stimulation at {self.STATE.clock.time()}: {signal}",
+            replay_time=self.STATE.clock.time(),
+        )
+
+    @ez.publisher(OUTPUT_BLOCK)
+    async def replay(self) -> AsyncGenerator:
+        real_interval = (
+            self.SETTINGS.block_duration / self.SETTINGS.speed
+            if self.SETTINGS.speed is not None
+            else self.SETTINGS.min_block_interval
+        )
+
+        for block in self.STATE.reader.iter_windows(
+            self.SETTINGS.group_name,
+            self.SETTINGS.block_duration,
+            start_time=self.SETTINGS.start_time,
+            end_time=self.SETTINGS.end_time,
+        ):
+            while not self.STATE.data_collection_enabled:
+                await asyncio.sleep(
+                    self.SETTINGS.data_collection_enabled_check_interval
+                )
+
+            yield (
+                self.OUTPUT_BLOCK,
+                TimestampedArray(
+                    block.array,
+                    block.channel_names,
+                    block.timestamps,
+                    scale=block.scale,
+                    offset=block.offset,
+                ),
+            )
+            await asyncio.sleep(real_interval)
+            self.STATE.clock.advance(block.timestamps[-1])
+
+        logger.info(f"Replay of {self.SETTINGS.file_path} is done.")
+        if self.SETTINGS.terminate:
+            raise ez.NormalTermination
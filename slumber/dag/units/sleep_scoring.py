@@ -4,10 +4,10 @@ from pathlib import Path
 
 import ezmsg.core as ez
 from loguru import logger
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from slumber.dag.utils import PydanticSettings
-from slumber.processing.sleep_scoring import UTimeModel, score
+from slumber.processing.sleep_scoring import IncrementalScorer, UTimeModel, score
 from slumber.utils.data import Data
 
 
@@ -16,16 +16,48 @@ class ModelConfig(PydanticSettings):
     weight_file_name: str | None = None
     n_periods: int | None = Field(None, ge=2)
     n_samples_per_prediction: int = Field(1, gt=0)
+    max_batch_size: int | None = Field(None, gt=0)
+    compile_inference: bool = False
+
+
+class IncrementalScoringConfig(PydanticSettings):
+    context_periods: int = Field(
+        ge=2,
+        description=(
+            "Number of most recent periods the model is run on for each update."
+            " Overrides the number of periods of the model."
+        ),
+    )
+    margin_periods: int = Field(
+        0,
+        ge=0,
+        description=(
+            "Number of periods at the start of the context"
+            " for which the previous scores are kept."
+        ),
+    )
+
+    @model_validator(mode="after")
+    def validate_margin_periods(self) -> "IncrementalScoringConfig":
+        if self.margin_periods >= self.context_periods:
+            raise ValueError("margin_periods must be less than context_periods")
+        return self
 
 
 class Settings(PydanticSettings):
     model: ModelConfig
     channel_groups: list[list[int | str]] | None = None
     arg_max: bool = True
+    incremental: IncrementalScoringConfig | None = None
+    warm_up: bool = Field(
+        True,
+        description="Whether to run the model once on zeros when initializing.",
+    )
 
 
 class State(ez.State):
     model: UTimeModel
+    scorer: IncrementalScorer | None = None
 
 
 class SleepScoring(ez.Unit):
@@ -36,19 +68,39 @@ class SleepScoring(ez.Unit):
     OUTPUT = ez.OutputStream(Data)
 
     async def initialize(self) -> None:
-        self.STATE.model = UTimeModel(**asdict(self.SETTINGS.model))
+        model_config = asdict(self.SETTINGS.model)
+
+        if self.SETTINGS.incremental is not None:
+            model_config["n_periods"] = self.SETTINGS.incremental.context_periods
+
+        self.STATE.model = UTimeModel(**model_config)
         logger.info(f"Loaded model from {self.SETTINGS.model.model_dir}")
 
+        if self.SETTINGS.warm_up:
+            self.STATE.model.warm_up(
+                batch_size=len(self.SETTINGS.channel_groups or [None])
+            )
+
+        if self.SETTINGS.incremental is not None:
+            self.STATE.scorer = IncrementalScorer(
+                self.STATE.model,
+                channel_groups=self.SETTINGS.channel_groups,
+                margin_periods=self.SETTINGS.incremental.margin_periods,
+            )
+
     @ez.subscriber(INPUT)
     @ez.publisher(OUTPUT)
     async def score_sleep(self, data: Data) -> AsyncGenerator:
         logger.debug(f"Scoring {data}")
-        scores = score(
-            data,
-            self.STATE.model,
-            channel_groups=self.SETTINGS.channel_groups,
-            arg_max=self.SETTINGS.arg_max,
-        )
+        if self.STATE.scorer is not None:
+            scores = self.STATE.scorer.score(data, arg_max=self.SETTINGS.arg_max)
+        else:
+            scores = score(
+                data,
+                self.STATE.model,
+                channel_groups=self.SETTINGS.channel_groups,
+                arg_max=self.SETTINGS.arg_max,
+            )
 
         logger.debug(f"Sleep scores: {scores}")
 
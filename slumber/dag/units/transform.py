@@ -1,16 +1,28 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import asdict, dataclass, field
 from inspect import signature
 from typing import Annotated, Any
 
 import ezmsg.core as ez
+import numpy as np
 from loguru import logger
 from pydantic import BeforeValidator, Field, model_validator
 
 from slumber.dag.utils import PydanticSettings
 from slumber.processing import transforms
-from slumber.utils.data import Data
+from slumber.utils.data import Data, propagate_mask
 from slumber.utils.helpers import create_class_by_name_resolver
 
+# Transforms that never return their input array or a view of it, so that
+# the stage before them can write into a buffer reused across messages
+INPUT_COPYING_TRANSFORMS = (
+    transforms.FIRFilter,
+    transforms.Resample,
+    transforms.StreamingResample,
+)
+
 
 class TransformConfig(PydanticSettings):
     transform: Annotated[
@@ -37,29 +49,179 @@ class TransformConfig(PydanticSettings):
                 f"Missing required parameters for transform: {missing_params}"
             )
 
+        try:
+            sig.bind(None, None, **self.kwargs)
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for transform: {e}") from e
+
         return self
 
-    def apply_transform(self, data: Data) -> Data:
-        return self.transform()(data, **self.kwargs)
+    def create(self) -> Callable[[Data], Data]:
+        """
+        Returns a function that applies a new instance of the transform with
+        the configured arguments. The instance keeps the state of stateful
+        transforms, e.g. StreamingFilter, between calls.
+        """
+        transform = self.transform()
+        kwargs = self.kwargs
+
+        def apply(data: Data) -> Data:
+            return propagate_mask(data, transform(data, **kwargs))
+
+        return apply
+
+
+@dataclass
+class StageStatistics:
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def add(self, elapsed_time: float) -> None:
+        self.calls += 1
+        self.total_time += elapsed_time
+        self.max_time = max(self.max_time, elapsed_time)
+
+
+@dataclass
+class Stage:
+    name: str
+    function: Callable[[Data], Data]
+    statistics: StageStatistics = field(default_factory=StageStatistics)
+
+
+class _PhysicalSelection:
+    """
+    Scales raw counts to physical units and applies an ArraySelector in one
+    pass, so that only the selected samples and channels are scaled. If
+    reuse_buffer is True, the output is written into a buffer reused across
+    calls, which is only valid until the next call.
+    """
+
+    def __init__(self, kwargs: dict[str, Any], reuse_buffer: bool) -> None:
+        self._selector = transforms.ArraySelector()
+        self._kwargs = kwargs
+        self._reuse_buffer = reuse_buffer
+        self._buffer: np.ndarray | None = None
+
+    def __call__(self, data: Data) -> Data:
+        selected = self._selector(data, **self._kwargs)
+        if selected.scale is None:
+            return selected
+
+        if not self._reuse_buffer:
+            array = np.empty(selected.shape)
+        elif self._buffer is not None and self._buffer.shape == selected.shape:
+            array = self._buffer
+        else:
+            array = self._buffer = np.empty(selected.shape)
+
+        # As ArrayBase.physical_array, without scaling the other channels
+        np.multiply(selected.array, selected.scale, out=array)
+        array += selected.offset
+
+        return Data(
+            array,
+            sample_rate=selected.sample_rate,
+            channel_names=selected.channel_names,
+            timestamps=selected.timestamps,
+            mask=selected.mask,
+        )
+
+
+class TransformPipeline:
+    """
+    The transforms of a Transform unit, compiled once into stages that are
+    applied to every message.
+
+    Each transform is instantiated once, so that stateful transforms keep
+    their state. Scaling raw counts to physical units is fused with a leading
+    ArraySelector, whose output is then written into a reused buffer if the
+    next transform copies its input anyway. The time spent in each stage is
+    recorded in its statistics.
+    """
+
+    def __init__(self, configs: list[TransformConfig]) -> None:
+        self.stages: list[Stage] = []
+
+        if configs and configs[0].transform is transforms.ArraySelector:
+            reuse_buffer = len(configs) > 1 and issubclass(
+                configs[1].transform, INPUT_COPYING_TRANSFORMS
+            )
+            self.stages.append(
+                Stage(
+                    "to_physical+ArraySelector",
+                    _PhysicalSelection(configs[0].kwargs, reuse_buffer),
+                )
+            )
+            configs = configs[1:]
+        else:
+            self.stages.append(Stage("to_physical", Data.to_physical))
+
+        for config in configs:
+            self.stages.append(Stage(config.transform.__name__, config.create()))
+
+    def __call__(self, data: Data) -> Data:
+        for stage in self.stages:
+            start_time = time.perf_counter()
+            data = stage.function(data)
+            stage.statistics.add(time.perf_counter() - start_time)
+            logger.debug(f"Data after transform {stage.name}: {data}")
+
+        return data
 
 
 class Settings(PydanticSettings):
     transform_configs: list[TransformConfig] = Field(
         default_factory=list, alias="transforms", min_length=1
     )
+    log_statistics_interval: float | None = Field(
+        None, gt=0, description="Seconds between logs of the stage timings"
+    )
+
+
+class State(ez.State):
+    pipeline: TransformPipeline
 
 
 class Transform(ez.Unit):
     SETTINGS = Settings
+    STATE = State
 
     INPUT = ez.InputStream(Data)
     OUTPUT = ez.OutputStream(Data)
 
+    def initialize(self) -> None:
+        self.STATE.pipeline = TransformPipeline(self.SETTINGS.transform_configs)
+
+    def shutdown(self) -> None:
+        self._log_statistics()
+
     @ez.subscriber(INPUT)
     @ez.publisher(OUTPUT)
     async def apply_transforms(self, data: Data) -> AsyncGenerator:
-        for config in self.SETTINGS.transform_configs:
-            data = config.apply_transform(data)
-            logger.debug(f"Data after transform {config.transform.__name__}: {data}")
-
-        yield (self.OUTPUT, data)
+        yield (self.OUTPUT, self.STATE.pipeline(data))
+
+    @ez.task
+    async def log_statistics(self) -> None:
+        if self.SETTINGS.log_statistics_interval is None:
+            return
+
+        while True:
+            await asyncio.sleep(self.SETTINGS.log_statistics_interval)
+            self._log_statistics()
+
+    def _log_statistics(self) -> None:
+        for stage in self.STATE.pipeline.stages:
+            statistics = stage.statistics
+            logger.info(
+                f"{self.address} stage {stage.name} ran {statistics.calls} times,"
+                f" mean time {statistics.mean_time * 1000:.2f} ms.",
+                stage=stage.name,
+                mean_time=statistics.mean_time,
+                **asdict(statistics),
+            )
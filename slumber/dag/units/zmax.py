@@ -5,6 +5,7 @@ from functools import cached_property
 from typing import Annotated
 
 import ezmsg.core as ez
+import numpy as np
 from loguru import logger
 from pydantic import (
     BaseModel,
@@ -12,6 +13,7 @@ from pydantic import (
     ConfigDict,
     Field,
     IPvAnyAddress,
+    model_validator,
 )
 
 from slumber.dag.utils import PydanticSettings
@@ -19,6 +21,7 @@ from slumber.sources.zmax import (
     DEFAULTS,
     LED_MAX_INTENSITY,
     LED_MIN_INTENSITY,
+    SAMPLE_RATE,
     STIMULATION_MAX_DURATION,
     STIMULATION_MAX_REPETITIONS,
     STIMULATION_MIN_DURATION,
@@ -26,8 +29,9 @@ from slumber.sources.zmax import (
     DataType,
     LEDColor,
     ZMax,
+    get_scale_table,
 )
-from slumber.utils.data import Sample
+from slumber.utils.data import Sample, TimestampedArray
 from slumber.utils.helpers import create_enum_by_name_resolver
 
 
@@ -72,17 +76,78 @@ class Settings(PydanticSettings):
     ] = Field(set(list(DataType)), min_length=1)
     retry_attempts: int | None = Field(DEFAULTS["retry_attempts"], ge=0)
     retry_delay: float = Field(DEFAULTS["retry_delay"], ge=0.0)
+    block_size: int | None = Field(
+        None,
+        gt=0,
+        description=(
+            "Number of samples per block published on OUTPUT_BLOCK."
+            " If neither block_size nor block_duration is given,"
+            " samples are published one by one on OUTPUT_SAMPLE."
+        ),
+    )
+    block_duration: float | None = Field(
+        None, gt=0.0, description="Duration of a published block in seconds."
+    )
+    raw_counts: bool = Field(
+        False,
+        description=(
+            "Publish the raw 16-bit counts as uint16 with the scale and offset"
+            " converting them to physical units, instead of float64 values."
+        ),
+    )
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    @model_validator(mode="after")
+    def validate_block_settings(self) -> "Settings":
+        if self.block_size is not None and self.block_duration is not None:
+            raise ValueError("Only one of block_size and block_duration can be set.")
+        return self
+
     @cached_property
     def channel_names(self) -> list[str]:
         return [data_type.name for data_type in self.data_types]
 
+    @cached_property
+    def scale_table(self) -> tuple[np.ndarray | None, np.ndarray | None]:
+        """Returns the scale and offset of published values, if they are raw."""
+        if not self.raw_counts:
+            return None, None
+        return get_scale_table(self.data_types)
+
+    @property
+    def samples_per_block(self) -> int | None:
+        if self.block_duration is not None:
+            return max(1, round(self.block_duration * SAMPLE_RATE))
+        return self.block_size
+
 
 class State(ez.State):
     zmax: ZMax
     data_collection_enabled: bool
+    block_arrays: list[np.ndarray]
+    block_timestamps: list[np.ndarray]
+    block_length: int = 0
+    last_timestamp: float | None = None
+
+
+def _interpolate_timestamps(
+    n_samples: int,
+    arrival_time: float,
+    last_timestamp: float | None,
+    sample_rate: float = SAMPLE_RATE,
+) -> np.ndarray:
+    """
+    Interpolates the timestamps of samples that arrived together.
+    The samples are spread evenly between the last timestamp and the arrival
+    time, but never further apart than the sample rate implies, so that the
+    samples after a gap in the data are not stretched over the gap.
+    """
+    start_time = arrival_time - n_samples / sample_rate
+    if last_timestamp is not None:
+        start_time = max(start_time, last_timestamp)
+
+    return np.linspace(start_time, arrival_time, n_samples + 1)[1:]
 
 
 class ZMaxDataReceiver(ez.Unit):
@@ -94,11 +159,14 @@ class ZMaxDataReceiver(ez.Unit):
     INPUT_STIMULATION_SIGNAL = ez.InputStream(ZMaxStimulationSignal)
 
     OUTPUT_SAMPLE = ez.OutputStream(Sample)
+    OUTPUT_BLOCK = ez.OutputStream(TimestampedArray)
 
     async def initialize(self):
         self.STATE.zmax = ZMax(**self.SETTINGS.zmax.model_dump())
         self.STATE.zmax.connect()
         self.STATE.data_collection_enabled = self.SETTINGS.data_collection_enabled
+        self.STATE.block_arrays = []
+        self.STATE.block_timestamps = []
 
     async def shutdown(self) -> None:
         self.STATE.data_collection_enabled = False
@@ -113,6 +181,7 @@ class ZMaxDataReceiver(ez.Unit):
 
     @ez.main
     @ez.publisher(OUTPUT_SAMPLE)
+    @ez.publisher(OUTPUT_BLOCK)
     async def publish_sample(self) -> AsyncGenerator:
         while True:
             if not self.STATE.data_collection_enabled:
@@ -126,14 +195,8 @@ class ZMaxDataReceiver(ez.Unit):
                 continue
 
             try:
-                array = self.STATE.zmax.read(self.SETTINGS.data_types)
-                yield (
-                    self.OUTPUT_SAMPLE,
-                    Sample(
-                        array=array,
-                        timestamp=time.time(),
-                        channel_names=self.SETTINGS.channel_names,
-                    ),
+                array = self.STATE.zmax.read_many(
+                    self.SETTINGS.data_types, raw=self.SETTINGS.raw_counts
                 )
             except TimeoutError as e:
                 logger.warning(
@@ -141,6 +204,52 @@ class ZMaxDataReceiver(ez.Unit):
                     " Possible causes: Connection between ZMax and PC is lost"
                     " (e.g., ZMax is off or dongle is disconnected)"
                 )
+                continue
+
+            timestamps = _interpolate_timestamps(
+                len(array), time.time(), self.STATE.last_timestamp
+            )
+            self.STATE.last_timestamp = timestamps[-1]
+
+            scale, offset = self.SETTINGS.scale_table
+            if self.SETTINGS.samples_per_block is None:
+                for values, timestamp in zip(array, timestamps, strict=True):
+                    yield (
+                        self.OUTPUT_SAMPLE,
+                        Sample(
+                            array=values,
+                            timestamp=timestamp,
+                            channel_names=self.SETTINGS.channel_names,
+                            scale=scale,
+                            offset=offset,
+                        ),
+                    )
+                continue
+
+            self.STATE.block_arrays.append(array)
+            self.STATE.block_timestamps.append(timestamps)
+            self.STATE.block_length += len(array)
+
+            while self.STATE.block_length >= self.SETTINGS.samples_per_block:
+                yield (self.OUTPUT_BLOCK, self._pop_block())
+
+    def _pop_block(self) -> TimestampedArray:
+        block_size = self.SETTINGS.samples_per_block
+        array = np.concatenate(self.STATE.block_arrays)
+        timestamps = np.concatenate(self.STATE.block_timestamps)
+
+        self.STATE.block_arrays = [array[block_size:]]
+        self.STATE.block_timestamps = [timestamps[block_size:]]
+        self.STATE.block_length -= block_size
+
+        scale, offset = self.SETTINGS.scale_table
+        return TimestampedArray(
+            array=array[:block_size],
+            timestamps=timestamps[:block_size],
+            channel_names=self.SETTINGS.channel_names,
+            scale=scale,
+            offset=offset,
+        )
 
     @ez.subscriber(INPUT_STIMULATION_SIGNAL)
     async def stimulate(self, signal: ZMaxStimulationSignal) -> None:
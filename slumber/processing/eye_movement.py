@@ -5,6 +5,7 @@ from loguru import logger
 from scipy.signal import find_peaks
 
 from slumber import settings
+from slumber.processing.filter_design import design_fir
 from slumber.processing.transforms import FIRFilter
 from slumber.utils.data import Data, Event
 
@@ -63,6 +64,181 @@ def detect_lr_eye_movements(
     return sequences
 
 
+class EyeMovementDetector:
+    """
+    Detects left/right eye movements like detect_lr_eye_movements, but
+    incrementally, e.g. for a live stream of EEG data.
+
+    Each update only filters the samples that are new since the previous one,
+    with the FIR filters of detect_lr_eye_movements and the previous samples
+    within a filter length as context, and only searches peaks among them.
+    The filtered samples are thus equal to those of detect_lr_eye_movements
+    on the whole signal, except the ones within half a filter length of the
+    end, which are filtered with padding as detect_lr_eye_movements does at
+    the end of a window.
+
+    A peak is final, and is not searched again, once no later sample can be
+    a higher peak within min_same_event_gap. A sequence is complete once
+    max_sequence_gap has passed after its last movement. Each sequence is
+    returned once, by the update with the samples that complete it.
+    """
+
+    def __init__(
+        self,
+        left_eeg_label: str,
+        right_eeg_label: str,
+        difference_threshold: float = DEFAULTS["difference_threshold"],
+        min_same_event_gap: float = DEFAULTS["min_same_event_gap"],
+        max_sequence_gap: float = DEFAULTS["max_sequence_gap"],
+        low_cutoff: float = DEFAULTS["low_cutoff"],
+        high_cutoff: float = DEFAULTS["high_cutoff"],
+    ) -> None:
+        self.left_eeg_label = left_eeg_label
+        self.right_eeg_label = right_eeg_label
+        self.difference_threshold = difference_threshold
+        self.min_same_event_gap = min_same_event_gap
+        self.max_sequence_gap = max_sequence_gap
+        self.low_cutoff = low_cutoff
+        self.high_cutoff = high_cutoff
+
+        self._sample_rate: int | None = None
+        self._n_context = 0
+        self._last_timestamp: float | None = None
+        # The last samples of the unfiltered difference signal
+        self._difference = np.empty(0)
+        self._timestamps = np.empty(0)
+        self._final_time = -np.inf  # Peaks up to this time were searched
+        self._sequence: list[Event] = []
+
+    def update(self, data: Data) -> list[Event]:
+        """
+        Args:
+            data: The next chunk of EEG data, or a window ending with the new
+                samples, e.g. the output of RollingBuffer.
+
+        Returns:
+            The sequences completed by the new samples, as returned by
+            detect_lr_eye_movements.
+        """
+        sequences = []
+        if data.sample_rate != self._sample_rate:
+            sequences.extend(self._restart())
+            self._sample_rate = data.sample_rate
+            # Filtering twice spreads a sample over the length of the filter
+            self._n_context = len(
+                design_fir(data.sample_rate, self.low_cutoff, self.high_cutoff)
+            )
+
+        n_new = self._get_n_new(data)
+        if n_new is None:
+            logger.info(f"Restarting eye movement detection at {data.timestamps[0]}")
+            sequences.extend(self._restart())
+            n_new = data.length
+        if n_new == 0:
+            return sequences
+
+        new_data = data[-n_new:, [self.left_eeg_label, self.right_eeg_label]]
+        self._difference = np.concatenate(
+            [self._difference, new_data.array[:, 0] - new_data.array[:, 1]]
+        )
+        self._timestamps = np.concatenate([self._timestamps, new_data.timestamps])
+        self._last_timestamp = data.timestamps[-1]
+
+        # Peaks closer to the end than the minimum gap may still be
+        # suppressed by a higher peak in the next samples
+        distance = max(round(self.min_same_event_gap * data.sample_rate), 1)
+        n_final = len(self._difference) - distance - 1
+        if n_final > 0:
+            difference_data = Data(
+                self._difference[:, np.newaxis],
+                sample_rate=data.sample_rate,
+                timestamps=self._timestamps,
+            )
+            for _ in range(2):
+                difference_data = FIRFilter()(
+                    difference_data,
+                    low_cutoff=self.low_cutoff,
+                    high_cutoff=self.high_cutoff,
+                )
+            events = _detect_movement_events(
+                difference_data, self.difference_threshold, self.min_same_event_gap
+            )
+            final_time = self._timestamps[n_final - 1]
+            for event in events:
+                if self._final_time < event.start_time <= final_time:
+                    sequences.extend(self._add_event(event))
+            self._final_time = final_time
+
+            if (
+                self._sequence
+                and final_time - self._sequence[-1].end_time > self.max_sequence_gap
+            ):
+                sequences.append(_merge_events(self._sequence))
+                self._sequence = []
+
+            # Keep the samples that are not final, the ones within the minimum
+            # gap before them, which suppress peaks as they did in this update,
+            # and the filter context before those
+            n_kept = len(self._difference) - n_final + distance + self._n_context
+            self._difference = self._difference[-n_kept:]
+            self._timestamps = self._timestamps[-n_kept:]
+
+        return sequences
+
+    def _get_n_new(self, data: Data) -> int | None:
+        """
+        Returns the number of samples of data after the last one processed,
+        or None if data does not continue the samples processed before.
+        """
+        if self._last_timestamp is None:
+            return data.length
+
+        n_old = np.searchsorted(data.timestamps, self._last_timestamp, "right")
+        if n_old > 0 and data.timestamps[n_old - 1] == self._last_timestamp:
+            return data.length - n_old
+
+        # Consecutive chunks
+        if n_old == 0 and (
+            abs(data.timestamps[0] - self._last_timestamp - 1 / data.sample_rate)
+            < 0.5 / data.sample_rate
+        ):
+            return data.length
+
+        return None
+
+    def _add_event(self, event: Event) -> list[Event]:
+        """
+        Adds a final movement to the current sequence, as _build_sequences
+        does, and returns the previous sequence if the movement ends it.
+        """
+        if (
+            self._sequence
+            and event.start_time - self._sequence[-1].end_time <= self.max_sequence_gap
+        ):
+            if event.label == self._sequence[-1].label:
+                self._sequence[-1].end_time = event.end_time
+            else:
+                self._sequence.append(event)
+            return []
+
+        completed = [_merge_events(self._sequence)] if self._sequence else []
+        self._sequence = [event]
+        return completed
+
+    def _restart(self) -> list[Event]:
+        """
+        Restarts the detection, e.g. after a gap, and returns the current
+        sequence, which the gap completes.
+        """
+        completed = [_merge_events(self._sequence)] if self._sequence else []
+        self._last_timestamp = None
+        self._difference = np.empty(0)
+        self._timestamps = np.empty(0)
+        self._final_time = -np.inf
+        self._sequence = []
+        return completed
+
+
 def _detect_movement_events(
     data: Data, threshold: float, min_same_event_gap: float
 ) -> list[Event]:
@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+import numpy as np
+from mne.filter import create_filter
+from scipy.signal import butter, firwin
+
+T = TypeVar("T")
+
+
+class FilterDesignCache:
+    """
+    Bounded LRU cache of filter coefficients, keyed by the filter type, order,
+    band and sample rate, so that filters are not designed again on every call.
+
+    Cached coefficients are shared by all callers and are read-only.
+    """
+
+    def __init__(self, max_size: int = 64) -> None:
+        if max_size <= 0:
+            raise ValueError(f"Max size must be positive, got {max_size}")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._designs: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"FilterDesignCache(size={len(self)}, max_size={self.max_size},"
+            f" hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._designs)
+
+    def get(self, key: Hashable, design: Callable[[], T]) -> T:
+        """
+        Returns the coefficients cached under key, designing them with design
+        if they are not cached.
+        """
+        with self._lock:
+            if key in self._designs:
+                self.hits += 1
+                self._designs.move_to_end(key)
+                return self._designs[key]
+
+            self.misses += 1
+
+        coefficients = _set_read_only(design())
+
+        with self._lock:
+            self._designs[key] = coefficients
+            self._designs.move_to_end(key)
+            while len(self._designs) > self.max_size:
+                self._designs.popitem(last=False)
+
+        return coefficients
+
+    def clear(self) -> None:
+        """Removes all designs and resets the counters."""
+        with self._lock:
+            self._designs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _set_read_only(coefficients: T) -> T:
+    if isinstance(coefficients, np.ndarray):
+        coefficients.flags.writeable = False
+    elif isinstance(coefficients, tuple):
+        for array in coefficients:
+            _set_read_only(array)
+    return coefficients
+
+
+def _freeze(kwargs: dict[str, Any]) -> str:
+    # Values may be unhashable, e.g. iir_params
+    return repr(sorted(kwargs.items()))
+
+
+filter_design_cache = FilterDesignCache()
+
+
+def design_fir(
+    sample_rate: float,
+    low_cutoff: float | None,
+    high_cutoff: float | None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Returns the coefficients of an FIR filter designed by
+    mne.filter.create_filter, as used by mne.filter.filter_data.
+
+    Args:
+        sample_rate (float): Sample rate in Hz.
+        low_cutoff (float, optional): Lower cutoff in Hz, see FIRFilter.
+        high_cutoff (float, optional): Upper cutoff in Hz, see FIRFilter.
+        **kwargs: Arguments of mne.filter.create_filter, e.g. filter_length.
+    """
+    return filter_design_cache.get(
+        ("fir", sample_rate, low_cutoff, high_cutoff, _freeze(kwargs)),
+        lambda: create_filter(
+            None,
+            sample_rate,
+            low_cutoff,
+            high_cutoff,
+            method="fir",
+            verbose=False,
+            **kwargs,
+        ),
+    )
+
+
+def design_iir(
+    sample_rate: float,
+    low_cutoff: float | None,
+    high_cutoff: float | None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Returns the second-order sections of an IIR filter designed by
+    mne.filter.create_filter, a 4th order Butterworth filter by default.
+
+    Args:
+        sample_rate (float): Sample rate in Hz.
+        low_cutoff (float, optional): Lower cutoff in Hz, see FIRFilter.
+        high_cutoff (float, optional): Upper cutoff in Hz, see FIRFilter.
+        **kwargs: Arguments of mne.filter.create_filter, e.g. iir_params.
+    """
+    return filter_design_cache.get(
+        ("iir", sample_rate, low_cutoff, high_cutoff, _freeze(kwargs)),
+        lambda: create_filter(
+            None,
+            sample_rate,
+            low_cutoff,
+            high_cutoff,
+            method="iir",
+            verbose=False,
+            **kwargs,
+        )["sos"],
+    )
+
+
+def design_butter(
+    order: int,
+    band: float | tuple[float, ...],
+    btype: str,
+    sample_rate: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the numerator and denominator of a Butterworth filter designed by
+    scipy.signal.butter.
+    """
+    band = tuple(band) if isinstance(band, tuple | list) else band
+    return filter_design_cache.get(
+        ("butter", order, band, btype, sample_rate),
+        lambda: butter(order, band, btype=btype, fs=sample_rate),
+    )
+
+
+def design_resample_poly(
+    up: int, down: int, window: str | tuple = ("kaiser", 5.0)
+) -> np.ndarray:
+    """
+    Returns the anti-aliasing filter of scipy.signal.resample_poly for
+    resampling by up / down, scaled by up.
+    """
+    max_rate = max(up, down)
+    return filter_design_cache.get(
+        ("resample_poly", up, down, window),
+        lambda: firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=window) * up,
+    )
@@ -1,6 +1,8 @@
 import numpy as np
 from loguru import logger
-from scipy.signal import butter, filtfilt
+from scipy.signal import filtfilt
+
+from slumber.processing.filter_design import design_butter
 
 
 def compute_snr(
@@ -35,10 +37,10 @@ def compute_snr(
     """
 
     signal_filtered = filtfilt(
-        *butter(4, signal_band, btype="band", fs=sampling_rate), eeg_data
+        *design_butter(4, signal_band, "band", sampling_rate), eeg_data
     )
     noise_filtered = filtfilt(
-        *butter(4, noise_band, btype="band", fs=sampling_rate), eeg_data
+        *design_butter(4, noise_band, "band", sampling_rate), eeg_data
     )
 
     # Compute power
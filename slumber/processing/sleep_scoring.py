@@ -1,8 +1,10 @@
-import copy
+import time
+from collections.abc import Callable
 from functools import cached_property
 from pathlib import Path
 
 import numpy as np
+import tensorflow as tf
 from loguru import logger
 from psg_utils.preprocessing import apply_scaling, quality_control_funcs
 from tensorflow.keras.models import Model
@@ -11,7 +13,7 @@ from utime.bin.evaluate import get_and_load_model
 from utime.hyperparameters import YAMLHParams
 
 from slumber.processing.transforms import Resample
-from slumber.utils.data import Data, get_all_periods
+from slumber.utils.data import Data
 
 SLEEP_STAGE_CHANNEL_NAME = "sleep_stage"
 
@@ -30,6 +32,8 @@ class UTimeModel:
         weight_file_name: str | None = None,
         n_periods: int | None = None,
         n_samples_per_prediction: int | None = None,
+        max_batch_size: int | None = None,
+        compile_inference: bool = False,
     ):
         """
         Initializes a UTimeModel object.
@@ -44,6 +48,13 @@ class UTimeModel:
                                             giving 1 segmentation per period
                                             of signal. Set this to 1 to score
                                             every data point in the signal.
+            max_batch_size (int): The maximum number of inputs in a forward pass.
+                                  Larger batches are split. If None, all
+                                  inputs are predicted in one forward pass.
+            compile_inference (bool): Whether to run the model through a
+                                      tf.function traced once for the
+                                      input shape of the model, instead
+                                      of Keras predict_on_batch.
             dataset (str): The name of the dataset to use for loading preprocessing
                            configurations. If not set, the first dataset will be used.
         """
@@ -52,9 +63,18 @@ class UTimeModel:
         self._weight_file_name = weight_file_name
         self._n_periods = n_periods
         self._n_samples_per_prediction = n_samples_per_prediction
+        self._max_batch_size = max_batch_size
+        self._compile_inference = compile_inference
+        self._inference_function = None
+        self._first_call_latency: float | None = None
+        self._steady_state_latency_sum = 0.0
+        self._n_steady_state_calls = 0
         self._model = None
         self._hyperparameters = None
         self._dataset = None
+        self._resample_transform: Resample | None = None
+        self._working_buffer: np.ndarray | None = None
+        self._batch_buffer: np.ndarray | None = None
         self.load()
 
     def __repr__(self) -> str:
@@ -76,6 +96,25 @@ class UTimeModel:
     def model(self) -> Model:
         return self._model
 
+    @property
+    def first_call_latency(self) -> float | None:
+        """
+        Returns the duration of the first forward pass in seconds,
+        which includes tracing and initialization.
+        """
+        return self._first_call_latency
+
+    @property
+    def steady_state_latency(self) -> float | None:
+        """
+        Returns the mean duration of the forward passes after the first one
+        in seconds.
+        """
+        if self._n_steady_state_calls == 0:
+            return None
+
+        return self._steady_state_latency_sum / self._n_steady_state_calls
+
     @property
     def n_samples_per_prediction(self) -> int:
         return self._model.data_per_prediction
@@ -127,6 +166,12 @@ class UTimeModel:
     def load(self) -> None:
         self._hyperparameters = self._load_hyperparameters()
         self._model = self._load_model()
+        self._inference_function = (
+            self._compile_inference_function() if self._compile_inference else None
+        )
+        self._first_call_latency = None
+        self._steady_state_latency_sum = 0.0
+        self._n_steady_state_calls = 0
         logger.debug(f"Loading model {self!r}")
 
     def _load_hyperparameters(self) -> YAMLHParams:
@@ -210,9 +255,71 @@ class UTimeModel:
             clear_previous=True,
         )
 
+    def _compile_inference_function(self) -> Callable[[tf.Tensor], tf.Tensor]:
+        """
+        Wraps the model in a tf.function with a fixed input signature, so that
+        it is traced only once. The batch size is left dynamic so that
+        channel groups and split batches share the same trace.
+        """
+        model = self._model
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec(shape=(None, *self.input_shape), dtype=tf.float32)
+            ]
+        )
+        def inference_function(inputs: tf.Tensor) -> tf.Tensor:
+            return model(inputs, training=False)
+
+        return inference_function
+
+    def warm_up(self, batch_size: int = 1) -> None:
+        """
+        Runs forward passes on zeros so that tracing and initialization
+        do not delay the first prediction.
+
+        Args:
+            batch_size (int): The number of inputs in the forward passes,
+                              e.g. the number of channel groups.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Please call load() before warm-up.")
+
+        inputs = np.zeros((batch_size, *self.input_shape), dtype=np.float32)
+        for _ in range(2):
+            self._run_model(inputs)
+
+        logger.info(
+            f"Warmed up model {self.name}: first call took"
+            f" {self.first_call_latency * 1000:.1f} ms, steady state"
+            f" {self.steady_state_latency * 1000:.1f} ms"
+        )
+
+    def _run_model(self, inputs: np.ndarray) -> np.ndarray:
+        start_time = time.perf_counter()
+
+        if self._inference_function is not None:
+            predictions = self._inference_function(tf.constant(inputs)).numpy()
+        else:
+            predictions = np.asarray(self.model.predict_on_batch(inputs))
+
+        latency = time.perf_counter() - start_time
+        if self._first_call_latency is None:
+            self._first_call_latency = latency
+        else:
+            self._steady_state_latency_sum += latency
+            self._n_steady_state_calls += 1
+
+        logger.debug(f"Forward pass on {inputs.shape} took {latency * 1000:.1f} ms")
+        return predictions
+
     def prepare_data(self, data: Data) -> np.ndarray:
         """
         Prepares the data for prediction.
+
+        The data is preprocessed in a float32 working buffer that is reused
+        across calls, so the returned array is a view into it and is only
+        valid until the next call.
         """
 
         if self._hyperparameters is None:
@@ -220,57 +327,88 @@ class UTimeModel:
                 "Model not loaded. Please call load() before preparing data."
             )
 
-        data = copy.deepcopy(data)
-
         if (n_samples_dropped := data.length % self.n_samples_per_period) != 0:
             logger.warning(
                 f"Dropping {n_samples_dropped} samples to match model input shape"
                 f" requirement of {self.n_samples_per_period} samples per period."
             )
-            data = data[:-n_samples_dropped]
 
-        if data.sample_rate != self.input_sample_rate:
-            data = Resample()(data, self.input_sample_rate)
-            # TODO: initialize the transform once and reuse
+        array = data.array[: data.length - n_samples_dropped]
+
+        # Invalid samples may be NaN, which the model does not accept
+        has_invalid_samples = data.mask is not None and not data.mask.all()
+
+        sample_rate = data.sample_rate
+        if sample_rate != self.input_sample_rate:
+            if has_invalid_samples:
+                array = np.nan_to_num(array, nan=0.0)
+            array = self._resample(array, sample_rate).array
+            sample_rate = self.input_sample_rate
+
+        working_buffer = self._get_working_buffer(array.shape)
+        np.copyto(working_buffer, array, casting="same_kind")
+
+        if has_invalid_samples:
+            np.nan_to_num(working_buffer, copy=False, nan=0.0)
 
         if quality_control := self.hyperparameters.get("quality_control_func"):
             # Run over epochs and assess if epoch-specific changes should be
             # made to limit the influence of very high noise level ecochs etc.
-            _apply_quality_control(
-                data,
+            quality_controlled_array = _apply_quality_control(
+                working_buffer,
+                sample_rate,
                 **quality_control,
-                period_length_sec=self.n_samples_per_period / data.sample_rate,
+                period_length_sec=self.n_samples_per_period / sample_rate,
             )
+            if quality_controlled_array is not working_buffer:
+                np.copyto(working_buffer, quality_controlled_array)
 
         if scaler := self.hyperparameters.get("scaler"):
-            _apply_scaling(data, scaler)
-
-        periods = get_all_periods(data, self.n_samples_per_period)
+            np.copyto(working_buffer, _apply_scaling(working_buffer, scaler))
 
-        batch_size = periods.shape[0] // self.n_periods
+        n_periods = len(working_buffer) // self.n_samples_per_period
+        batch_size = n_periods // self.n_periods
 
-        if (n_periods_dropped := periods.shape[0] % self.n_periods) != 0:
+        if (n_periods_dropped := n_periods % self.n_periods) != 0:
             logger.warning(
                 f"Dropping {n_periods_dropped} periods to match model input shape"
                 f" requirement of {self.input_shape[0]} periods per batch."
             )
-            periods = periods[:-n_periods_dropped]
 
-        return periods.reshape(
+        n_samples = batch_size * self.n_periods * self.n_samples_per_period
+        return working_buffer[:n_samples].reshape(
             batch_size, self.n_periods, self.n_samples_per_period, -1
-        ).astype(np.float32)
+        )
+
+    def _resample(self, array: np.ndarray, sample_rate: float) -> Data:
+        if self._resample_transform is None:
+            self._resample_transform = Resample()
+
+        return self._resample_transform(
+            Data(array, sample_rate=sample_rate), self.input_sample_rate
+        )
+
+    def _get_working_buffer(self, shape: tuple[int, ...]) -> np.ndarray:
+        if self._working_buffer is None or self._working_buffer.shape != shape:
+            logger.debug(f"Allocating working buffer of shape {shape}")
+            self._working_buffer = np.empty(shape, dtype=np.float32)
+
+        return self._working_buffer
 
     def predict(self, data: np.ndarray, channel_groups: list[list[int]]) -> np.ndarray:
         """
         Predicts the sleep stage for the given data.
 
+        The channel groups are stacked along the batch axis and predicted
+        together, in forward passes of at most max_batch_size inputs.
+
         Args:
             data (np.ndarray): The data to predict on.
             channel_groups (list[list[int]]): A list of channel groups.
                                               Each group contains the indices
                                               of the channels to be used for
                                               prediction. The final prediction
-                                              is the sum of the predictions
+                                              is the mean of the predictions
                                               for each group.
         """
 
@@ -279,21 +417,56 @@ class UTimeModel:
 
         self._assert_channel_groups(channel_groups)
 
-        predictions_list = []
+        batch = self._stack_channel_groups(data, channel_groups)
+        logger.debug(
+            f"Predicting for {len(channel_groups)} channel groups {channel_groups}"
+            f" with batch shape {batch.shape}"
+        )
 
-        for i, channel_group in enumerate(channel_groups):
-            logger.debug(
-                f"Predicting for channel group {i} with channels {channel_group}"
-            )
-            current_predictions = self.model.predict_on_batch(data[..., channel_group])
-            predictions_list.append(current_predictions)
+        max_batch_size = self._max_batch_size or len(batch)
+        predictions = np.concatenate(
+            [
+                self._run_model(batch[i : i + max_batch_size])
+                for i in range(0, len(batch), max_batch_size)
+            ]
+        )
 
-        predictions = np.mean(predictions_list, axis=0)
+        predictions = predictions.reshape(
+            len(channel_groups), len(data), *predictions.shape[1:]
+        ).mean(axis=0)
         logger.debug(f"Original predictions shape: {predictions.shape}")
         predictions = predictions.reshape(-1, predictions.shape[-1])
         logger.debug(f"Final predictions shape: {predictions.shape}")
         return predictions
 
+    def _stack_channel_groups(
+        self, data: np.ndarray, channel_groups: list[list[int]]
+    ) -> np.ndarray:
+        """
+        Returns the channel groups of data stacked along the batch axis,
+        in a buffer that is reused across calls.
+        Shape (n_groups * batch_size, n_periods, n_samples_per_period, n_channels)
+        """
+        batch_size = len(data)
+        shape = (
+            len(channel_groups) * batch_size,
+            *data.shape[1:-1],
+            self.input_shape[-1],
+        )
+
+        if self._batch_buffer is None or self._batch_buffer.shape != shape:
+            self._batch_buffer = np.empty(shape, dtype=np.float32)
+
+        for i, channel_group in enumerate(channel_groups):
+            np.take(
+                data,
+                channel_group,
+                axis=-1,
+                out=self._batch_buffer[i * batch_size : (i + 1) * batch_size],
+            )
+
+        return self._batch_buffer
+
     def _assert_channel_groups(self, channel_groups: list[list[int]]) -> None:
         """
         Asserts that the channel groups are valid.
@@ -312,11 +485,16 @@ class UTimeModel:
                 )
 
 
-def _apply_quality_control(data: Data, quality_control_func: str, **kwargs) -> Data:
+def _apply_quality_control(
+    array: np.ndarray, sample_rate: float, quality_control_func: str, **kwargs
+) -> np.ndarray:
+    """
+    Applies the quality control function, in place if the function supports it.
+    """
     quality_control_function = getattr(quality_control_funcs, quality_control_func)
-    data.array, indices = quality_control_function(
-        psg=data.array,
-        sample_rate=data.sample_rate,
+    array, indices = quality_control_function(
+        psg=array,
+        sample_rate=sample_rate,
         **kwargs,
     )
 
@@ -326,12 +504,12 @@ def _apply_quality_control(data: Data, quality_control_func: str, **kwargs) -> D
             f" periods in channel {i}"
         )
 
-    return data
+    return array
 
 
-def _apply_scaling(data: Data, scaler: str) -> Data:
-    data.array, _ = apply_scaling(data.array, scaler)
-    return data
+def _apply_scaling(array: np.ndarray, scaler: str) -> np.ndarray:
+    scaled_array, _ = apply_scaling(array, scaler)
+    return scaled_array
 
 
 def score(
@@ -370,22 +548,188 @@ def score(
         ]
     )
 
+    mask = data.mask
+    n_samples_per_score = round(data.sample_rate / output_sample_rate)
+
     data = model.prepare_data(data)
     logger.info(
         f"Predicting sleep stages for data with shape {data.shape}"
         f" and channel groups {channel_groups}"
     )
     predictions = model.predict(data, channel_groups)
-    channel_names = model.sleep_stage_annotations
-
-    if arg_max:
-        predictions = np.reshape(np.argmax(predictions, axis=-1), (-1, 1))
-        channel_names = [SLEEP_STAGE_CHANNEL_NAME]
-        logger.debug(f"Applied argmax, prediction shape: {predictions.shape}")
 
-    return Data(
+    scores = Data(
         predictions,
         sample_rate=output_sample_rate,
-        channel_names=channel_names,
+        channel_names=model.sleep_stage_annotations,
         timestamp_offset=timestamp_offset,
+        mask=_get_scores_mask(mask, len(predictions), n_samples_per_score)
+        if mask is not None
+        else None,
+    )
+
+    return _apply_arg_max(scores) if arg_max else scores
+
+
+def _get_scores_mask(
+    mask: np.ndarray, n_scores: int, n_samples_per_score: int
+) -> np.ndarray:
+    """
+    A score is valid only if all the samples it was predicted from are valid.
+    """
+    return (
+        mask[: n_scores * n_samples_per_score]
+        .reshape(n_scores, n_samples_per_score)
+        .all(axis=1)
     )
+
+
+def _apply_arg_max(scores: Data) -> Data:
+    sleep_stages = np.reshape(np.argmax(scores.array, axis=-1), (-1, 1))
+    logger.debug(f"Applied argmax, prediction shape: {sleep_stages.shape}")
+    return Data(
+        sleep_stages,
+        sample_rate=scores.sample_rate,
+        channel_names=[SLEEP_STAGE_CHANNEL_NAME],
+        timestamps=scores.timestamps,
+        mask=scores.mask,
+    )
+
+
+class IncrementalScorer:
+    def __init__(
+        self,
+        model: UTimeModel,
+        channel_groups: list[list[int | str]] | None = None,
+        margin_periods: int = 0,
+    ):
+        """
+        Scores a rolling window of data by running the model only on the most
+        recent periods of the window and merging the result with the scores
+        of the previous call.
+
+        The model is run on its number of periods (the context) ending at the
+        end of the window. The scores of the first margin_periods periods of
+        the context lack left context, so the cached scores are kept for them.
+        The rest of the window is scored from scratch on the first call or
+        when the new data does not overlap enough with the previous window.
+
+        Args:
+            model (UTimeModel): The model. Its number of periods is the
+                                number of periods scored on each update.
+            channel_groups (list[list[int | str]]): See score.
+            margin_periods (int): Number of periods at the start of the context
+                                  for which the cached scores are kept.
+        """
+        if not 0 <= margin_periods < model.n_periods:
+            raise ValueError(
+                f"margin_periods must be between 0 and {model.n_periods - 1},"
+                f" got {margin_periods}"
+            )
+
+        self._model = model
+        self._channel_groups = channel_groups
+        self._margin_periods = margin_periods
+        self._scores: Data | None = None
+        self._last_timestamp: float | None = None
+
+    def reset(self) -> None:
+        self._scores = None
+        self._last_timestamp = None
+
+    def score(self, data: Data, arg_max: bool = True) -> Data:
+        """
+        Scores the window and returns the scores for all of it.
+        """
+        period_length = self._get_period_length(data)
+        context_length = period_length * self._model.n_periods
+
+        if (n_samples_dropped := data.length % period_length) != 0:
+            logger.warning(
+                f"Dropping the first {n_samples_dropped} samples to match"
+                f" a period length of {period_length} samples."
+            )
+            data = data[n_samples_dropped:]
+
+        n_new_samples = self._count_new_samples(data)
+        n_updated_samples = context_length - self._margin_periods * period_length
+
+        if (
+            self._scores is None
+            or self._scores.length != self._to_n_scores(data.length, data.sample_rate)
+            or n_new_samples > n_updated_samples
+        ):
+            logger.info("Scoring the whole window")
+            self._scores = self._score_all(data, context_length)
+        elif n_new_samples > 0:
+            logger.debug(f"Scoring the last {context_length} samples")
+            self._scores = self._merge(
+                score(
+                    data[-context_length:],
+                    self._model,
+                    channel_groups=self._channel_groups,
+                    arg_max=False,
+                ),
+                n_new_scores=self._to_n_scores(n_new_samples, data.sample_rate),
+                n_updated_scores=self._to_n_scores(n_updated_samples, data.sample_rate),
+            )
+
+        self._last_timestamp = data.timestamps[-1]
+        return _apply_arg_max(self._scores) if arg_max else self._scores
+
+    def _get_period_length(self, data: Data) -> int:
+        period_length = self._model.period_duration * data.sample_rate
+        if not float(period_length).is_integer():
+            raise ValueError(
+                f"Period duration {self._model.period_duration} s does not"
+                f" correspond to a whole number of samples at {data.sample_rate} Hz"
+            )
+        return int(period_length)
+
+    def _to_n_scores(self, n_samples: int, sample_rate: float) -> int:
+        output_sample_rate = (
+            self._model.input_sample_rate / self._model.n_samples_per_prediction
+        )
+        return round(n_samples / sample_rate * output_sample_rate)
+
+    def _count_new_samples(self, data: Data) -> int:
+        if self._last_timestamp is None:
+            return data.length
+
+        return data.length - int(
+            np.searchsorted(data.timestamps, self._last_timestamp, side="right")
+        )
+
+    def _score_all(self, data: Data, context_length: int) -> Data:
+        """
+        Scores the window in consecutive contexts. The window is zero-padded
+        at the start to a whole number of contexts, like a rolling buffer
+        that is not yet full.
+        """
+        n_padding_samples = -data.length % context_length
+        padded_data = Data(
+            np.concatenate(
+                [np.zeros((n_padding_samples, data.n_channels)), data.array]
+            ),
+            sample_rate=data.sample_rate,
+            channel_names=data.channel_names,
+            timestamp_offset=data.timestamps[0] - n_padding_samples / data.sample_rate,
+            mask=np.concatenate([np.zeros(n_padding_samples, bool), data.mask])
+            if data.mask is not None
+            else None,
+        )
+        scores = score(
+            padded_data, self._model, channel_groups=self._channel_groups, arg_max=False
+        )
+        return scores[self._to_n_scores(n_padding_samples, data.sample_rate) :]
+
+    def _merge(
+        self, context_scores: Data, n_new_scores: int, n_updated_scores: int
+    ) -> Data:
+        n_kept_scores = self._scores.length - n_updated_scores
+        return Data.concatenate(
+            [
+                self._scores[n_new_scores : n_kept_scores + n_new_scores],
+                context_scores[context_scores.length - n_updated_scores :],
+            ]
+        )
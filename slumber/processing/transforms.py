@@ -1,9 +1,21 @@
+from math import gcd
 from typing import Literal, Protocol, runtime_checkable
 
 import numpy as np
+from loguru import logger
 from mne.filter import filter_data, resample
+from scipy.signal import lfilter, oaconvolve, sosfilt, sosfilt_zi, upfirdn
 
+from slumber.processing.filter_design import (
+    design_fir,
+    design_iir,
+    design_resample_poly,
+)
 from slumber.utils.data import Data, TimestampedArray
+from slumber.utils.ring_buffer import RingBuffer
+
+# Arguments of mne.filter.filter_data that do not change the filtered values
+_FILTER_DATA_ONLY_ARGUMENTS = ("n_jobs", "copy", "verbose")
 
 
 @runtime_checkable
@@ -28,11 +40,15 @@ class FIRFilter(Transform):
         data: Data,
         low_cutoff: float | None = None,
         high_cutoff: float | None = None,
+        phase: Literal["zero", "zero-double", "minimum"] = "zero",
+        pad: str = "reflect_limited",
+        method: Literal["fir", "iir"] = "fir",
         **kwargs,
     ) -> Data:
         """
         Apply FIR filter with a Hamming window. The filter length is automatically
-        chosen using the filter design function.
+        chosen using the filter design function. Designs are cached, see
+        slumber.processing.filter_design.
 
         Args:
             data (Data): Input data object containing array and sample rate.
@@ -42,6 +58,14 @@ class FIRFilter(Transform):
             high_cutoff (float, optional): The upper frequency bound of
                 the bandpass filter in Hz.
                 If None, a lowpass filter is applied. Default is None.
+            phase (str): Phase of the filter, as for mne.filter.filter_data.
+            pad (str): Padding of the edges, as for mne.filter.filter_data.
+            method (str): "fir", or "iir" to filter with
+                mne.filter.filter_data without caching the design.
+            **kwargs: Other arguments of mne.filter.filter_data,
+                e.g. filter_length. Arguments that do not change the
+                filtered values, such as n_jobs and verbose, are ignored
+                for FIR filters.
 
         Returns:
             Data: The filtered data.
@@ -54,16 +78,258 @@ class FIRFilter(Transform):
             If `low_cutoff` is greater than `high_cutoff`, a bandstop filter is applied.
             If `low_cutoff` is less than `high_cutoff`, a bandpass filter is applied.
         """
+        if method != "fir" or kwargs.get("picks") is not None:
+            array = filter_data(
+                data.array.T,
+                data.sample_rate,
+                low_cutoff,
+                high_cutoff,
+                method=method,
+                phase=phase,
+                pad=pad,
+                **kwargs,
+            ).T
+        else:
+            kwargs.pop("picks", None)
+            for name in _FILTER_DATA_ONLY_ARGUMENTS:
+                kwargs.pop(name, None)
+            coefficients = design_fir(
+                data.sample_rate, low_cutoff, high_cutoff, phase=phase, **kwargs
+            )
+            array = _apply_fir(data.array, coefficients, phase, pad)
+
         return Data(
-            filter_data(
-                data.array.T, data.sample_rate, low_cutoff, high_cutoff, **kwargs
-            ).T,
+            array,
             sample_rate=data.sample_rate,
             channel_names=data.channel_names,
             timestamps=data.timestamps,
         )
 
 
+def _apply_fir(
+    array: np.ndarray, coefficients: np.ndarray, phase: str, pad: str
+) -> np.ndarray:
+    """
+    Filters the columns of array as mne.filter.filter_data does for an FIR
+    filter designed with the same phase: the edges are padded by the filter
+    length, the padded signal is convolved with the filter and the delay of
+    zero-phase filters is compensated.
+
+    Args:
+        array (np.ndarray): The signal. Shape (n_samples, n_channels)
+        coefficients (np.ndarray): The filter, see design_fir.
+        phase (str): "zero", "zero-double" or "minimum".
+        pad (str): "reflect_limited" or a mode of np.pad.
+
+    Returns:
+        np.ndarray: The filtered signal. Shape (n_samples, n_channels)
+    """
+    dtype = array.dtype if np.issubdtype(array.dtype, np.floating) else np.float64
+    n_samples = len(array)
+    n_edge = max(min(len(coefficients), n_samples) - 1, 0)
+    if phase == "zero-double":
+        coefficients = np.convolve(coefficients, coefficients[::-1])
+    if len(coefficients) == 1:
+        return (array * coefficients[0]).astype(dtype)
+
+    shift = n_edge + ((len(coefficients) - 1) // 2 if phase.startswith("zero") else 0)
+    filtered = oaconvolve(
+        _pad_edges(array.astype(np.float64), n_edge, pad),
+        coefficients[:, np.newaxis],
+        axes=0,
+    )
+    return filtered[shift : shift + n_samples].astype(dtype)
+
+
+def _pad_edges(array: np.ndarray, n_pad: int, pad: str) -> np.ndarray:
+    """Pads both ends of the first axis, as mne.filter does."""
+    if n_pad == 0:
+        return array
+    if pad != "reflect_limited":
+        kwargs = {"reflect_type": "odd"} if pad == "reflect" else {}
+        return np.pad(array, [(n_pad, n_pad), (0, 0)], pad, **kwargs)
+
+    # Odd reflection, zero padded beyond the length of the signal
+    zeros = np.zeros((max(n_pad - len(array) + 1, 0), array.shape[1]))
+    return np.concatenate(
+        [
+            zeros,
+            2 * array[:1] - array[n_pad:0:-1],
+            array,
+            2 * array[-1:] - array[-2 : -n_pad - 2 : -1],
+            zeros,
+        ]
+    )
+
+
+class CausalFilter:
+    """
+    Applies an FIR filter, given by its coefficients, or an IIR filter, given
+    by its second-order sections, to consecutive chunks of a signal, carrying
+    the filter state from one chunk to the next.
+    """
+
+    def __init__(self, coefficients: np.ndarray) -> None:
+        # sosfilt does not accept read-only sections, e.g. cached ones
+        self.coefficients = (
+            coefficients if coefficients.ndim == 1 else coefficients.copy()
+        )
+        self._state: np.ndarray | None = None
+
+    def reset(self) -> None:
+        """Restarts the filter, e.g. after a gap in the signal."""
+        self._state = None
+
+    def __call__(self, array: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            array (np.ndarray): The next chunk. Shape (n_samples, n_channels)
+
+        Returns:
+            np.ndarray: The filtered chunk. Shape (n_samples, n_channels)
+        """
+        array = array.astype(np.float64)
+        if self._state is None:
+            self._state = self._get_initial_state(array[0])
+
+        if self.coefficients.ndim == 1:
+            filtered, self._state = lfilter(
+                self.coefficients, 1.0, array, axis=0, zi=self._state
+            )
+        else:
+            filtered, self._state = sosfilt(
+                self.coefficients, array, axis=0, zi=self._state
+            )
+        return filtered
+
+    def _get_initial_state(self, sample: np.ndarray) -> np.ndarray:
+        """
+        Returns the filter state in steady state for a constant input equal to
+        sample, which avoids a transient at the start of the signal.
+        """
+        if self.coefficients.ndim == 1:
+            # For an FIR filter, the steady state is the sum of the
+            # coefficients following each delay
+            zi = np.cumsum(self.coefficients[::-1])[::-1][1:]
+            return zi[:, np.newaxis] * sample
+        return sosfilt_zi(self.coefficients)[..., np.newaxis] * sample
+
+
+class StreamingFilter(Transform):
+    """
+    FIR or IIR filter for a sliding window of data, e.g. the output of
+    RollingBuffer, that only filters the samples that are new since the
+    previous window.
+
+    The filter is designed once per sample rate and cutoffs, see
+    slumber.processing.filter_design, and its state is
+    carried from one window to the next, so that filtering a window costs
+    O(new samples) instead of O(window length). The filtered samples are
+    spliced into a ring buffer holding the filtered window.
+
+    Filtering is causal. FIR filters are linear phase and the output is
+    delayed by half the filter length, so its timestamps are shifted back
+    to those of the input samples it corresponds to. Apart from the first
+    filter length samples after a restart, the output equals that of
+    FIRFilter. IIR filters are Butterworth filters by default and their
+    delay depends on the frequency, so their timestamps are not shifted.
+
+    The filter restarts when a window does not continue the previous one,
+    e.g. after a gap, or when the sample rate, cutoffs or channels change.
+    """
+
+    def __init__(self) -> None:
+        self._key: tuple | None = None
+        self._filter: CausalFilter | None = None
+        self._delay = 0.0
+        self._buffer: RingBuffer | None = None
+        self._last_timestamp: float | None = None
+
+    def __call__(
+        self,
+        data: Data,
+        low_cutoff: float | None = None,
+        high_cutoff: float | None = None,
+        method: Literal["fir", "iir"] = "fir",
+        **kwargs,
+    ) -> Data:
+        """
+        Args:
+            data (Data): The current window. Consecutive windows must share
+                their samples apart from the new ones at the end.
+            low_cutoff (float, optional): As for FIRFilter.
+            high_cutoff (float, optional): As for FIRFilter.
+            method (str): "fir" or "iir".
+            **kwargs: Arguments of mne.filter.create_filter, e.g. iir_params.
+
+        Returns:
+            Data: The filtered window, backed by a read-only view that is only
+                valid until the next call.
+        """
+        if low_cutoff is None and high_cutoff is None:
+            return data
+
+        key = (
+            data.sample_rate,
+            data.n_channels,
+            low_cutoff,
+            high_cutoff,
+            method,
+            repr(sorted(kwargs.items())),
+        )
+        if key != self._key:
+            self._design(data.sample_rate, low_cutoff, high_cutoff, method, kwargs)
+            self._key = key
+            self._buffer = None
+
+        n_new = self._get_n_new(data)
+        if n_new > 0:
+            self._buffer.append(
+                self._filter(data.array[-n_new:]),
+                data.timestamps[-n_new:] - self._delay,
+                data.mask[-n_new:] if data.mask is not None else None,
+            )
+            self._last_timestamp = data.timestamps[-1]
+
+        return Data(
+            self._buffer.array,
+            sample_rate=data.sample_rate,
+            channel_names=data.channel_names,
+            timestamps=self._buffer.timestamps,
+            mask=self._buffer.mask if data.mask is not None else None,
+        )
+
+    def _design(
+        self,
+        sample_rate: int,
+        low_cutoff: float | None,
+        high_cutoff: float | None,
+        method: str,
+        kwargs: dict,
+    ) -> None:
+        if method == "fir":
+            coefficients = design_fir(sample_rate, low_cutoff, high_cutoff, **kwargs)
+            self._delay = (len(coefficients) - 1) / 2 / sample_rate
+        else:
+            coefficients = design_iir(sample_rate, low_cutoff, high_cutoff, **kwargs)
+            self._delay = 0.0
+        self._filter = CausalFilter(coefficients)
+
+    def _get_n_new(self, data: Data) -> int:
+        """
+        Returns the number of samples of data after the last filtered one and
+        restarts the filter if data does not continue the previous window.
+        """
+        if self._buffer is not None and self._buffer.capacity == data.length:
+            n_old = np.searchsorted(data.timestamps, self._last_timestamp, "right")
+            if n_old > 0 and data.timestamps[n_old - 1] == self._last_timestamp:
+                return data.length - n_old
+
+        self._buffer = RingBuffer(data.length, data.n_channels, with_mask=True)
+        self._filter.reset()
+        return data.length
+
+
 class Resample(Transform):
     def __call__(
         self,
@@ -87,6 +353,146 @@ class Resample(Transform):
         )
 
 
+class StreamingResample(Transform):
+    """
+    Polyphase resampler for consecutive chunks of a signal, e.g. the chunks
+    published by TimeQueue, that keeps its filter and the input samples it
+    still needs between chunks, so that chunk boundaries have no edge effects.
+
+    The filter is that of scipy.signal.resample_poly, designed once per pair
+    of sample rates, see slumber.processing.filter_design. The output is
+    identical to resampling the concatenated chunks with resample_poly, apart
+    from being delayed by half the filter length, i.e. 10 output samples when
+    halving the sample rate. The output of each call ends that much before
+    its input and its timestamps are shifted accordingly. The outputs of the
+    first call that precede the signal are filtered from zeros.
+
+    The resampler restarts when a chunk does not continue the previous one,
+    e.g. after a gap, or when the sample rates or channels change.
+    """
+
+    def __init__(self) -> None:
+        self._key: tuple | None = None
+        self._up = self._down = 1
+        self._coefficients: np.ndarray | None = None
+        self._n_pre_pad = 0
+        self._n_pre_remove = 0
+        self._history: np.ndarray | None = None
+        self._history_start = 0  # Input index of the first history sample
+        self._n_in = 0
+        self._n_out = 0
+        self._first_timestamp = 0.0
+
+    def __call__(
+        self,
+        data: Data,
+        new_sample_rate: int,
+        window: str | tuple = ("kaiser", 5.0),
+    ) -> Data:
+        """
+        Args:
+            data (Data): The next chunk of the signal.
+            new_sample_rate (int): The sample rate of the output.
+            window (str | tuple): Window of the anti-aliasing filter,
+                as for scipy.signal.resample_poly.
+
+        Returns:
+            Data: The resampled signal up to half the filter length before the
+                end of data. It has length * new_sample_rate / sample_rate
+                samples if that is an integer.
+        """
+        window = tuple(window) if isinstance(window, list) else window
+        key = (data.sample_rate, new_sample_rate, data.n_channels, window)
+        if key != self._key:
+            self._design(data.sample_rate, new_sample_rate, window)
+            self._key = key
+            self._history = None
+
+        expected_timestamp = self._first_timestamp + self._n_in / data.sample_rate
+        if self._history is None or (
+            abs(data.timestamps[0] - expected_timestamp) > 0.5 / data.sample_rate
+        ):
+            if self._history is not None:
+                logger.info(
+                    f"Restarting resampling at {data.timestamps[0]},"
+                    f" expected {expected_timestamp}"
+                )
+            self._restart(data)
+
+        segment = np.concatenate([self._history, data.array.astype(np.float64)], axis=0)
+        self._n_in += data.length
+
+        # Outputs are numbered as those of resample_poly, i.e. output i of
+        # upfirdn is output i - n_pre_remove. It needs the input samples up
+        # to (i * down - n_pre_pad) / up.
+        n_complete = self._get_n_complete(self._n_in)
+        offset = self._n_pre_remove - self._history_start * self._up // self._down
+        filtered = upfirdn(self._coefficients, segment, self._up, self._down, axis=0)[
+            self._n_out + offset : n_complete + offset
+        ]
+
+        timestamps = (
+            self._first_timestamp + np.arange(self._n_out, n_complete) / new_sample_rate
+        )
+        self._n_out = n_complete
+        self._trim_history(segment)
+
+        return Data(
+            filtered,
+            sample_rate=new_sample_rate,
+            channel_names=data.channel_names,
+            timestamps=timestamps,
+        )
+
+    def _design(
+        self, sample_rate: int, new_sample_rate: int, window: str | tuple
+    ) -> None:
+        divisor = gcd(new_sample_rate, sample_rate)
+        self._up = new_sample_rate // divisor
+        self._down = sample_rate // divisor
+
+        coefficients = design_resample_poly(self._up, self._down, window)
+        # Zero-pad the filter to put the outputs at the center, as
+        # scipy.signal.resample_poly does
+        half_len = (len(coefficients) - 1) // 2
+        self._n_pre_pad = self._down - half_len % self._down
+        self._coefficients = np.concatenate([np.zeros(self._n_pre_pad), coefficients])
+        self._n_pre_remove = (half_len + self._n_pre_pad) // self._down
+
+    def _get_n_complete(self, n_in: int) -> int:
+        """Returns the number of outputs that n_in input samples complete."""
+        return (
+            (n_in * self._up + self._n_pre_pad - 1) // self._down
+            - self._n_pre_remove
+            + 1
+        )
+
+    def _restart(self, data: Data) -> None:
+        self._history = np.zeros((0, data.n_channels))
+        self._history_start = 0
+        self._n_in = 0
+        self._first_timestamp = data.timestamps[0]
+        # The outputs of the first call start half the filter length before
+        # the signal, so that each call returns as many samples as the
+        # following ones
+        self._n_out = self._get_n_complete(0)
+
+    def _trim_history(self, segment: np.ndarray) -> None:
+        """
+        Keeps the input samples needed by the next outputs, starting at an
+        input index at which the phase of the filter is the same as at 0.
+        """
+        # Output i of upfirdn needs the input samples from
+        # (i * down - len(coefficients) + 1) / up
+        i = self._n_out + self._n_pre_remove
+        first_needed = max(
+            -((len(self._coefficients) - 1 - i * self._down) // self._up), 0
+        )
+        start = max(first_needed // self._down * self._down, self._history_start)
+        self._history = segment[start - self._history_start :]
+        self._history_start = start
+
+
 class ArraySelector(Transform):
     def __call__(
         self,
@@ -98,6 +504,8 @@ class ArraySelector(Transform):
     ) -> TimestampedArray:
         """
         Select specific channels and/or time slices from the data.
+        Returns a view of the data if the channels are evenly spaced, e.g.
+        all channels or consecutive ones.
 
         Args:
             data (TimestampedArray): Input TimestampedArray array object
@@ -109,4 +517,4 @@ class ArraySelector(Transform):
             TimestampedArray: TimestampedArray object with selected data
         """
         samples = slice(start_index, end_index, step)
-        return data[samples, channels]
+        return data.view(samples, channels)
@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import ezmsg.core as ez
+from loguru import logger
+
+from slumber import CONDITIONS_DIR
+from slumber.models.dag import CollectionConfig
+from slumber.utils.clock import VirtualClock, set_clock
+from slumber.utils.hdf5 import SessionReader
+from slumber.utils.helpers import load_yaml
+from slumber.utils.logger import setup_logging
+from slumber.utils.time import create_timestamped_name
+
+REPLAYS_DIR = Path("./replays")
+DATA_DIR_NAME = "data"
+LOG_FILE_NAME = "replay.log"
+SOURCE_UNIT = "ZMaxDataReceiver"
+REPLAY_UNIT = "SessionReplay"
+MASTER_UNIT = "Master"
+# Streams of ZMaxDataReceiver that SessionReplay replaces or does not have
+REPLACED_STREAMS = {"OUTPUT_SAMPLE": "OUTPUT_BLOCK"}
+REMOVED_STREAMS = {"INPUT_CONNECT_SIGNAL"}
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded session through the DAG of a condition"
+    )
+    parser.add_argument(
+        "condition_config_file",
+        type=str,
+        help="Name of the condition config file whose DAG is run",
+    )
+    parser.add_argument(
+        "file_path", type=Path, help="Path to the storage file of the session"
+    )
+    parser.add_argument(
+        "--group-name",
+        type=str,
+        help="Group of the raw ZMax data in the storage file",
+        default="zmax_raw",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        help="Replay speed relative to real time (default: as fast as possible)",
+        default=None,
+    )
+    parser.add_argument(
+        "--block-duration",
+        type=float,
+        help="Duration of each replayed block in seconds",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--start-time", type=float, help="Timestamp to start at", default=None
+    )
+    parser.add_argument(
+        "--end-time", type=float, help="Timestamp to end at", default=None
+    )
+    return parser
+
+
+def _replace_source(dag: dict[str, Any], replay_settings: dict[str, Any]) -> None:
+    """
+    Replaces the ZMax receivers of a DAG config with session replays and
+    starts the experiment asleep, since there is no GUI to set it.
+    """
+    sources = set()
+    for component in dag["components"]:
+        if component["unit"] == SOURCE_UNIT:
+            sources.add(component["name"])
+            component["unit"] = REPLAY_UNIT
+            component["settings"] = replay_settings
+        elif component["unit"] == MASTER_UNIT:
+            component.setdefault("settings", {})["experiment_state"] = "ASLEEP"
+
+    if not sources:
+        raise ValueError(f"The DAG has no {SOURCE_UNIT} to replace.")
+
+    def replace_stream(stream: str) -> str | None:
+        name, stream_name = stream.split("/")
+        if name not in sources:
+            return stream
+        if stream_name in REMOVED_STREAMS:
+            return None
+        return f"{name}/{REPLACED_STREAMS.get(stream_name, stream_name)}"
+
+    connections = [
+        [replace_stream(stream) for stream in streams]
+        for streams in dag.get("connections", [])
+    ]
+    dag["connections"] = [streams for streams in connections if None not in streams]
+
+
+def main() -> None:
+    args = _get_parser().parse_args()
+    file_path = args.file_path.absolute()
+
+    config = load_yaml(CONDITIONS_DIR / f"{args.condition_config_file}.yaml")
+    _replace_source(
+        config["dag"],
+        {
+            "file_path": file_path,
+            "group_name": args.group_name,
+            "block_duration": args.block_duration,
+            "speed": args.speed,
+            "start_time": args.start_time,
+            "end_time": args.end_time,
+        },
+    )
+    dag_config = CollectionConfig.model_validate(config["dag"])
+
+    # Units read the clock when initialized, so it is set before running
+    with SessionReader(file_path) as reader:
+        start_time, end_time = reader.get_time_range(args.group_name)
+    if args.start_time is not None:
+        start_time = args.start_time
+    if args.end_time is not None:
+        end_time = args.end_time
+    set_clock(VirtualClock(start_time))
+
+    run_directory = (
+        REPLAYS_DIR / create_timestamped_name(args.condition_config_file)
+    ).absolute()
+    (run_directory / DATA_DIR_NAME).mkdir(parents=True)
+    os.chdir(run_directory)
+    setup_logging(run_directory / LOG_FILE_NAME)
+
+    duration = end_time - start_time
+    logger.info(f"Replaying {duration / 3600:.1f} h of {file_path} in {run_directory}")
+    replay_start_time = time.perf_counter()
+
+    ez.run(**dag_config.configure())
+
+    elapsed_time = time.perf_counter() - replay_start_time
+    logger.info(
+        f"Replayed {duration / 3600:.1f} h in {elapsed_time:.1f} s"
+        f" ({duration / elapsed_time:.0f}x real time)"
+    )
+
+
+if __name__ == "__main__":
+    main()
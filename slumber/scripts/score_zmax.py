@@ -1,11 +1,14 @@
 import argparse
+from collections.abc import Iterator
 from pathlib import Path
+from typing import TextIO
 
 import mne
 import numpy as np
 from loguru import logger
 
 from slumber import MODELS_DIR
+from slumber.processing.filter_design import design_fir
 from slumber.processing.sleep_scoring import UTimeModel, score
 from slumber.processing.transforms import FIRFilter
 from slumber.sources.zmax import SAMPLE_RATE
@@ -17,6 +20,7 @@ PREDICTION_FILE_NAME = "utime_predictions.csv"
 FILTER_LOW_CUTOFF = 0.3
 FILTER_HIGH_CUTOFF = 30
 DEFAULT_MODEL = "utime_EEG_10"
+DEFAULT_OVERLAP_PERIODS = 10
 
 
 def _get_parser() -> argparse.ArgumentParser:
@@ -48,6 +52,21 @@ def _get_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--output-path", type=Path, help="Path to save output predictions", default=None
     )
+    parser.add_argument(
+        "--chunk-periods",
+        type=int,
+        help="Score the recording in chunks of this many model periods,"
+        " so that memory usage does not depend on the recording length."
+        " If not set, the whole recording is scored at once",
+        default=None,
+    )
+    parser.add_argument(
+        "--overlap-periods",
+        type=int,
+        help="Number of periods shared by consecutive chunks,"
+        " whose predictions are averaged",
+        default=DEFAULT_OVERLAP_PERIODS,
+    )
     return parser
 
 
@@ -67,6 +86,216 @@ def _load_data(data_dir: Path) -> Data:
     return data
 
 
+def _open_raw_data(data_dir: Path) -> list[mne.io.BaseRaw]:
+    return [
+        mne.io.read_raw_edf(data_dir / f"{data_type}.{FILE_EXTENSION}", preload=False)
+        for data_type in EEG_CHANNELS
+    ]
+
+
+def _iter_chunks(
+    raws: list[mne.io.BaseRaw],
+    chunk_length: int,
+    hop_length: int,
+    context_length: int = 0,
+) -> Iterator[tuple[Data, slice]]:
+    """
+    Reads the recording in chunks of chunk_length samples, starting every
+    hop_length samples. The last chunk ends at the end of the recording
+    and may be shorter.
+
+    Each chunk is read with up to context_length samples before and after it,
+    e.g. so that filtering it gives the same samples as filtering the whole
+    recording, and is yielded with the slice of the chunk in them.
+    """
+    n_samples = min(raw.n_times for raw in raws)
+
+    for start in range(0, n_samples, hop_length):
+        stop = min(start + chunk_length, n_samples)
+        context_start = max(start - context_length, 0)
+        context_stop = min(stop + context_length, n_samples)
+        array = np.column_stack(
+            [raw.get_data(start=context_start, stop=context_stop)[0] for raw in raws]
+        )
+        yield (
+            Data(
+                array,
+                sample_rate=SAMPLE_RATE,
+                channel_names=EEG_CHANNELS,
+                timestamp_offset=context_start / SAMPLE_RATE,
+            ),
+            slice(start - context_start, stop - context_start),
+        )
+
+        if stop == n_samples:
+            break
+
+
+class _OverlapAverager:
+    """
+    Averages the predictions of consecutive chunks where they overlap.
+    """
+
+    def __init__(self) -> None:
+        self._sums: np.ndarray | None = None
+        self._counts: np.ndarray | None = None
+
+    def add(self, predictions: np.ndarray, n_final: int) -> np.ndarray:
+        """
+        Adds the predictions of a chunk and returns the averaged predictions
+        of its first n_final rows, which no later chunk overlaps.
+        """
+        sums = predictions.astype(np.float64)
+        counts = np.ones(len(predictions))
+
+        if self._sums is not None:
+            sums[: len(self._sums)] += self._sums
+            counts[: len(self._counts)] += self._counts
+
+        self._sums, self._counts = sums[n_final:], counts[n_final:]
+        return sums[:n_final] / counts[:n_final, np.newaxis]
+
+    def flush(self) -> np.ndarray:
+        """
+        Returns the averaged predictions that are still pending.
+        """
+        if self._sums is None:
+            return np.empty((0, 0))
+
+        predictions = self._sums / self._counts[:, np.newaxis]
+        self._sums = self._counts = None
+        return predictions
+
+
+class _EpochAggregator:
+    """
+    Averages consecutive predictions into epochs, keeping the predictions of
+    an incomplete epoch until the next call.
+    """
+
+    def __init__(self, n_predictions_per_epoch: int) -> None:
+        self._n_predictions_per_epoch = n_predictions_per_epoch
+        self._remainder: np.ndarray | None = None
+
+    def add(self, predictions: np.ndarray) -> np.ndarray:
+        if self._remainder is not None:
+            predictions = np.concatenate([self._remainder, predictions])
+
+        n_complete_epochs = len(predictions) // self._n_predictions_per_epoch
+        n_used = n_complete_epochs * self._n_predictions_per_epoch
+        self._remainder = predictions[n_used:]
+        return (
+            predictions[:n_used]
+            .reshape(n_complete_epochs, self._n_predictions_per_epoch, -1)
+            .mean(axis=1)
+        )
+
+
+def _write_rows(file: TextIO, array: np.ndarray) -> None:
+    for row in array:
+        file.write(",".join(map(str, row)) + "\n")
+
+
+def _filter(data: Data) -> Data:
+    return FIRFilter()(
+        data, low_cutoff=FILTER_LOW_CUTOFF, high_cutoff=FILTER_HIGH_CUTOFF
+    )
+
+
+def _get_filter_length() -> int:
+    return len(design_fir(SAMPLE_RATE, FILTER_LOW_CUTOFF, FILTER_HIGH_CUTOFF))
+
+
+def _score_chunk(
+    data: Data, model: UTimeModel, chunk_length: int, period_length: int
+) -> np.ndarray:
+    """
+    Scores a chunk of at most chunk_length samples. A shorter chunk is cut to
+    whole periods and zero-padded at the end to the chunk length, and the
+    predictions of the padding are dropped.
+    """
+    n_samples = data.length - data.length % period_length
+    array = np.zeros((chunk_length, data.n_channels))
+    array[:n_samples] = data.array[:n_samples]
+
+    predictions = score(
+        Data(array, sample_rate=data.sample_rate, channel_names=data.channel_names),
+        model,
+        channel_groups=[[ch] for ch in EEG_CHANNELS],
+        arg_max=False,
+    )
+    return predictions.array[: len(predictions.array) * n_samples // chunk_length]
+
+
+def score_in_chunks(
+    data_dir: Path,
+    model: UTimeModel,
+    output_path: Path,
+    overlap_periods: int,
+    epoch_duration: int,
+    apply_filter: bool = True,
+) -> float:
+    """
+    Scores the recording in overlapping chunks of model.n_periods periods and
+    writes the predictions, aggregated to epochs, as they become final.
+
+    Returns:
+        float: The duration of the recording in seconds.
+    """
+    if not 0 <= overlap_periods < model.n_periods:
+        raise ValueError(
+            f"Overlap must be between 0 and {model.n_periods - 1} periods,"
+            f" got {overlap_periods}"
+        )
+
+    period_length = model.period_duration * SAMPLE_RATE
+    if not float(period_length).is_integer():
+        raise ValueError(
+            f"Period duration {model.period_duration} s does not correspond"
+            f" to a whole number of samples at {SAMPLE_RATE} Hz"
+        )
+    period_length = int(period_length)
+
+    chunk_length = model.n_periods * period_length
+    hop_length = (model.n_periods - overlap_periods) * period_length
+    predictions_sample_rate = model.input_sample_rate / model.n_samples_per_prediction
+    n_predictions_per_period = round(model.period_duration * predictions_sample_rate)
+    n_hop_predictions = (model.n_periods - overlap_periods) * n_predictions_per_period
+
+    overlap_averager = _OverlapAverager()
+    epoch_aggregator = _EpochAggregator(int(epoch_duration * predictions_sample_rate))
+
+    if output_path.exists():
+        logger.warning(f"File {output_path} already exists, overwriting")
+
+    raws = _open_raw_data(data_dir)
+    # The filter is applied to the chunks with the samples around them, which
+    # are dropped after filtering, so that the chunk edges are not padded
+    context_length = _get_filter_length() if apply_filter else 0
+
+    with open(output_path, "w") as file:
+        file.write(",".join(model.sleep_stage_annotations) + "\n")
+
+        for chunk, chunk_slice in _iter_chunks(
+            raws, chunk_length, hop_length, context_length
+        ):
+            if apply_filter:
+                chunk = _filter(chunk)
+            chunk = chunk[chunk_slice]
+            logger.info(f"Scoring chunk starting at {chunk.timestamps[0]:.0f} s")
+
+            predictions = _score_chunk(chunk, model, chunk_length, period_length)
+            final_predictions = overlap_averager.add(
+                predictions, n_final=min(n_hop_predictions, len(predictions))
+            )
+            _write_rows(file, epoch_aggregator.add(final_predictions))
+
+        if len(pending_predictions := overlap_averager.flush()) > 0:
+            _write_rows(file, epoch_aggregator.add(pending_predictions))
+
+    return min(raw.n_times for raw in raws) / SAMPLE_RATE
+
+
 def _resample_predictions(predictions: Data, epoch_duration: int) -> Data:
     logger.info(f"Resampling predictions to {epoch_duration}-second epochs")
     periods_to_aggregate = int(epoch_duration * predictions.sample_rate)
@@ -87,6 +316,30 @@ def _resample_predictions(predictions: Data, epoch_duration: int) -> Data:
 
 def main() -> None:
     args = _get_parser().parse_args()
+    output_path = args.output_path or args.data_dir / PREDICTION_FILE_NAME
+
+    if args.chunk_periods is not None:
+        logger.info(f"Loading model from {args.model_dir}")
+        model = UTimeModel(
+            args.model_dir,
+            weight_file_name=args.weight_file,
+            n_periods=args.chunk_periods,
+        )
+
+        logger.info(
+            f"Scoring sleep stages in chunks of {args.chunk_periods} periods"
+            f" overlapping by {args.overlap_periods} periods,"
+            f" saving predictions to {output_path}"
+        )
+        score_in_chunks(
+            args.data_dir,
+            model,
+            output_path,
+            overlap_periods=args.overlap_periods,
+            epoch_duration=args.epoch_duration,
+            apply_filter=not args.no_filter,
+        )
+        return
 
     logger.info(f"Loading data from {args.data_dir}")
     data = _load_data(args.data_dir)
@@ -96,9 +349,7 @@ def main() -> None:
             f"Applying FIR filter with low cutoff {FILTER_LOW_CUTOFF}"
             f" and high cutoff {FILTER_HIGH_CUTOFF}"
         )
-        data = FIRFilter()(
-            data, low_cutoff=FILTER_LOW_CUTOFF, high_cutoff=FILTER_HIGH_CUTOFF
-        )
+        data = _filter(data)
 
     logger.info(f"Loading model from {args.model_dir}")
     model = UTimeModel(args.model_dir, weight_file_name=args.weight_file)
@@ -118,7 +369,6 @@ def main() -> None:
         )
         predictions = _resample_predictions(predictions, args.epoch_duration)
 
-    output_path = args.output_path or args.data_dir / PREDICTION_FILE_NAME
     logger.info(f"Saving predictions to {output_path}")
     predictions.to_csv(output_path)
 
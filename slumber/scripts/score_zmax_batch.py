@@ -0,0 +1,273 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import tensorflow as tf
+from loguru import logger
+
+from slumber import MODELS_DIR
+from slumber.processing.sleep_scoring import UTimeModel
+from slumber.scripts.score_zmax import (
+    DEFAULT_MODEL,
+    DEFAULT_OVERLAP_PERIODS,
+    EEG_CHANNELS,
+    FILE_EXTENSION,
+    PREDICTION_FILE_NAME,
+    score_in_chunks,
+)
+
+DEFAULT_CHUNK_PERIODS = 100
+# Each worker loads TensorFlow and a model, so few workers fit in memory
+DEFAULT_WORKERS = 2
+PARTIAL_FILE_SUFFIX = ".partial"
+
+_model: UTimeModel | None = None  # Loaded once in each worker process
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Score sleep stages from many ZMax recordings in parallel"
+    )
+    parser.add_argument(
+        "data_dirs",
+        type=str,
+        nargs="*",
+        help="Paths or glob patterns of ZMax data directories",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Path to a text file listing one ZMax data directory per line",
+        default=None,
+    )
+    parser.add_argument(
+        "--model-dir",
+        type=Path,
+        help="Path to directory containing U-Time model",
+        default=MODELS_DIR / DEFAULT_MODEL,
+    )
+    parser.add_argument(
+        "--weight-file",
+        type=str,
+        help="Name of specific weight file to use",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-filter",
+        action="store_true",
+        help="Do not apply a filter to the data",
+    )
+    parser.add_argument(
+        "--epoch_duration",
+        type=int,
+        help="Duration of epochs in seconds",
+        default=30,
+    )
+    parser.add_argument(
+        "--output-name",
+        type=str,
+        help="Name of the predictions file saved in each data directory",
+        default=PREDICTION_FILE_NAME,
+    )
+    parser.add_argument(
+        "--chunk-periods",
+        type=int,
+        help="Number of model periods scored at once",
+        default=DEFAULT_CHUNK_PERIODS,
+    )
+    parser.add_argument(
+        "--overlap-periods",
+        type=int,
+        help="Number of periods shared by consecutive chunks,"
+        " whose predictions are averaged",
+        default=DEFAULT_OVERLAP_PERIODS,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes, each with a share of the CPUs"
+        f" (default: {DEFAULT_WORKERS})",
+        default=DEFAULT_WORKERS,
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Score recordings whose predictions are already up to date",
+    )
+    return parser
+
+
+def _collect_data_dirs(patterns: list[str], manifest: Path | None) -> list[Path]:
+    if manifest is not None:
+        patterns = patterns + [
+            line.strip() for line in manifest.read_text().splitlines() if line.strip()
+        ]
+
+    data_dirs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        data_dirs.extend(Path(match) for match in matches if Path(match).is_dir())
+
+    return list(dict.fromkeys(data_dirs))  # Remove duplicates, keeping the order
+
+
+def _get_latest_modification_time(paths: list[Path]) -> float:
+    return max(path.stat().st_mtime for path in paths)
+
+
+def _get_model_modification_time(model_dir: Path) -> float:
+    return _get_latest_modification_time(
+        [path for path in model_dir.rglob("*") if path.is_file()]
+    )
+
+
+def _is_up_to_date(
+    data_dir: Path, output_path: Path, model_modification_time: float
+) -> bool:
+    """
+    Predictions are up to date if they are newer than both the recording
+    and the model files, last modified at model_modification_time.
+    """
+    input_paths = [
+        data_dir / f"{data_type}.{FILE_EXTENSION}" for data_type in EEG_CHANNELS
+    ]
+
+    if not output_path.exists() or not all(path.exists() for path in input_paths):
+        return False
+
+    return output_path.stat().st_mtime >= max(
+        _get_latest_modification_time(input_paths), model_modification_time
+    )
+
+
+def _initialize_worker(
+    model_dir: Path, weight_file_name: str | None, chunk_periods: int, n_threads: int
+) -> None:
+    global _model
+    # Otherwise each worker uses a thread per CPU
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _model = UTimeModel(
+        model_dir, weight_file_name=weight_file_name, n_periods=chunk_periods
+    )
+
+
+def _score_night(
+    data_dir: Path,
+    output_path: Path,
+    overlap_periods: int,
+    epoch_duration: int,
+    apply_filter: bool,
+) -> tuple[float, float]:
+    """
+    Scores a recording with the model of the worker. The predictions are
+    written to a partial file that replaces the output only when complete.
+
+    Returns:
+        tuple[float, float]: The duration of the recording and the scoring
+                             time, both in seconds.
+    """
+    start_time = time.perf_counter()
+    partial_output_path = output_path.with_name(output_path.name + PARTIAL_FILE_SUFFIX)
+
+    recording_duration = score_in_chunks(
+        data_dir,
+        _model,
+        partial_output_path,
+        overlap_periods=overlap_periods,
+        epoch_duration=epoch_duration,
+        apply_filter=apply_filter,
+    )
+    partial_output_path.replace(output_path)
+
+    return recording_duration, time.perf_counter() - start_time
+
+
+def main() -> None:
+    args = _get_parser().parse_args()
+    if args.workers < 1:
+        raise ValueError(f"Number of workers must be positive, got {args.workers}")
+
+    data_dirs = _collect_data_dirs(args.data_dirs, args.manifest)
+    if not data_dirs:
+        raise ValueError("No ZMax data directories found")
+
+    if not args.force:
+        n_data_dirs = len(data_dirs)
+        model_modification_time = _get_model_modification_time(args.model_dir)
+        data_dirs = [
+            data_dir
+            for data_dir in data_dirs
+            if not _is_up_to_date(
+                data_dir, data_dir / args.output_name, model_modification_time
+            )
+        ]
+        logger.info(
+            f"Skipping {n_data_dirs - len(data_dirs)} of {n_data_dirs} recordings"
+            " with up to date predictions"
+        )
+
+    if not data_dirs:
+        return
+
+    logger.info(f"Scoring {len(data_dirs)} recordings")
+    start_time = time.perf_counter()
+    total_recording_duration = 0.0
+    failed_data_dirs = []
+
+    n_workers = min(args.workers, len(data_dirs))
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(args.model_dir, args.weight_file, args.chunk_periods, n_threads),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _score_night,
+                data_dir,
+                data_dir / args.output_name,
+                args.overlap_periods,
+                args.epoch_duration,
+                not args.no_filter,
+            ): data_dir
+            for data_dir in data_dirs
+        }
+
+        for future in as_completed(futures):
+            data_dir = futures[future]
+
+            try:
+                recording_duration, scoring_duration = future.result()
+            except Exception as exc:
+                logger.error(f"Failed to score {data_dir}: {exc!r}")
+                failed_data_dirs.append(data_dir)
+                continue
+
+            total_recording_duration += recording_duration
+            logger.info(
+                f"Scored {data_dir}: {recording_duration / 3600:.1f} h of recording"
+                f" in {scoring_duration:.1f} s"
+                f" ({recording_duration / scoring_duration:.0f}x real time)"
+            )
+
+    elapsed_time = time.perf_counter() - start_time
+    logger.info(
+        f"Scored {len(data_dirs) - len(failed_data_dirs)} recordings,"
+        f" {total_recording_duration / 3600:.1f} h in total,"
+        f" in {elapsed_time:.1f} s"
+    )
+
+    if failed_data_dirs:
+        raise RuntimeError(
+            f"Failed to score {len(failed_data_dirs)} recordings: {failed_data_dirs}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import os
 import socket
 import time
 import types
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -31,6 +31,7 @@ _SENDBYTES_MAX_RETRIES = 1
 _PACKET_TYPE_POSITION = 0
 _VALID_PACKET_TYPES = range(1, 12)
 _EXPECTED_DATA_LENGTH = 119
+_RECEIVE_BUFFER_SIZE = 65536  # Bytes requested from the socket per call
 
 _STIMULATION_RETRY_DELAY = 111  # Milliseconds
 _STIMULATION_FLASH_LED_COMMAND = 4
@@ -82,6 +83,20 @@ def get_byte_at(buffer: str, index: int) -> int:
     return int(hex_str, 16)
 
 
+def _build_hex_lookup() -> np.ndarray:
+    """
+    Build a table mapping ASCII codes to hexadecimal digit values.
+    Characters that are not hexadecimal digits are mapped to -1.
+    """
+    lookup = np.full(256, -1, dtype=np.int32)
+    for digit in "0123456789abcdef":
+        lookup[ord(digit)] = lookup[ord(digit.upper())] = int(digit, 16)
+    return lookup
+
+
+_HEX_LOOKUP = _build_hex_lookup()
+
+
 def _scale_eeg(value: int) -> float:
     """
     Convert the raw EEG value to uV.
@@ -215,6 +230,22 @@ class DataTypeConfig:
         value = get_word_at(buffer, self.buffer_position)
         return self.scale_function(value) if self.scale_function else value
 
+    @property
+    def scale(self) -> float:
+        """
+        Returns the physical units per raw count. Scale functions are linear.
+        """
+        if self.scale_function is None:
+            return 1.0
+        return float(self.scale_function(1) - self.scale_function(0))
+
+    @property
+    def offset(self) -> float:
+        """Returns the physical value of a raw count of zero."""
+        if self.scale_function is None:
+            return 0.0
+        return float(self.scale_function(0))
+
 
 class DataType(Enum):
     EEG_RIGHT = DataTypeConfig(1, _scale_eeg)
@@ -247,6 +278,90 @@ class DataType(Enum):
         return [data_type for data_type in cls if data_type.category == category]
 
 
+def _decode_bytes(packets: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode the hexadecimal bytes of equally sized data packets in one pass.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The decoded bytes with shape
+            (n_packets, n_bytes) and a boolean mask with shape (n_packets,)
+            that is False for packets containing non-hexadecimal characters.
+    """
+    # Non-ASCII characters become "?", which the lookup rejects as non-hexadecimal
+    characters = np.frombuffer(
+        "".join(packets).encode("ascii", errors="replace"), dtype=np.uint8
+    )
+    nibbles = _HEX_LOOKUP[characters.reshape(len(packets), -1)]
+    high_nibbles, low_nibbles = nibbles[:, 0::3], nibbles[:, 1::3]
+    is_hex = ((high_nibbles >= 0) & (low_nibbles >= 0)).all(axis=1)
+    return high_nibbles * 16 + low_nibbles, is_hex
+
+
+def get_scale_table(
+    data_types: Iterable[DataType] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the scale and offset converting the raw counts of each data type
+    to physical units, value = count * scale + offset.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The scales and offsets.
+            Both of shape (n_data_types,)
+    """
+    data_types = list(data_types or DataType)
+    return (
+        np.array([data_type.value.scale for data_type in data_types]),
+        np.array([data_type.value.offset for data_type in data_types]),
+    )
+
+
+def decode_packets(
+    packets: Sequence[str],
+    data_types: Iterable[DataType] | None = None,
+    raw: bool = False,
+) -> np.ndarray:
+    """
+    Decode the payloads of ZMax data packets into an array of values.
+    Invalid packets (wrong length, unknown packet type or non-hexadecimal
+    characters) are dropped.
+
+    Args:
+        packets (Sequence[str]): Payloads of data packets,
+            i.e. the part of the message after "D.".
+        data_types (Iterable[DataType] | None): The data types to extract.
+            Defaults to all data types.
+        raw (bool): Whether to return the raw 16-bit counts as uint16 instead
+            of physical units as float64. See get_scale_table.
+
+    Returns:
+        np.ndarray: The decoded values. Shape (n_valid_packets, n_data_types)
+    """
+    data_types = list(data_types or DataType)
+    dtype = np.uint16 if raw else np.float64
+
+    packets = [packet for packet in packets if len(packet) == _EXPECTED_DATA_LENGTH]
+    if not packets:
+        return np.empty((0, len(data_types)), dtype=dtype)
+
+    buffer, is_hex = _decode_bytes(packets)
+    is_valid = is_hex & np.isin(buffer[:, _PACKET_TYPE_POSITION], _VALID_PACKET_TYPES)
+    if not is_valid.all():
+        logger.warning(f"Dropping {np.count_nonzero(~is_valid)} invalid data packets")
+        buffer = buffer[is_valid]
+
+    array = np.empty((len(buffer), len(data_types)), dtype=dtype)
+    for i, data_type in enumerate(data_types):
+        position = data_type.value.buffer_position
+        values = buffer[:, position] * 256 + buffer[:, position + 1]
+        scale_function = data_type.value.scale_function
+        if raw or scale_function is None:
+            array[:, i] = values
+        else:
+            array[:, i] = scale_function(values)
+
+    return array
+
+
 def _initialize_socket(
     socket_timeout: float | None = None,
 ) -> socket.socket:
@@ -270,6 +385,7 @@ class ZMax:
         self._port = port
         self._socket_timeout = socket_timeout
         self._socket = _initialize_socket(self._socket_timeout)
+        self._receive_buffer = bytearray()
         self._live_sequence_number = 1
         self._dongle_status = DongleStatus.UNKNOWN
 
@@ -294,6 +410,7 @@ class ZMax:
             logger.info(f"Closed connection to {self!r}")
 
         self._socket = _initialize_socket(self._socket_timeout)
+        self._receive_buffer.clear()
 
     def connect(
         self,
@@ -336,66 +453,121 @@ class ZMax:
         self._dongle_status = DongleStatus[message.split("_")[2]]
         logger.info(f"Dongle status: {self._dongle_status.value}")
 
-    def read(self, data_types: list[DataType] | None = None) -> np.ndarray:
+    def read(
+        self, data_types: list[DataType] | None = None, raw: bool = False
+    ) -> np.ndarray:
+        """
+        Read the next data packet. See decode_packets for raw.
+
+        Returns:
+            np.ndarray: The values of the data types. Shape (n_data_types,)
+        """
         while True:
-            message = self._receive_line()
+            data = self._extract_data(self._receive_line())
 
-            if message.startswith("DEBUG"):  # Ignore debugging messages from the server
-                logger.debug(f"Debug message: {message}")
+            if data is None or not self._is_valid_data(data):
                 continue
 
-            if _is_dongle_message(message):
-                logger.debug(f"Dongle message: {message}")
-                self._handle_dongle_message(message)
+            array = decode_packets([data], data_types, raw=raw)
+            if len(array) == 0:
                 continue
 
-            if not message.startswith("D"):  # Only process valid data packets
-                logger.debug(f"Non-data message: {message}")
-                continue
+            return array[0]
 
-            try:
-                _, data = message.split(".")
-            except ValueError as e:
-                logger.warning(
-                    f"Failed to extract data from data message {message}: {e}"
-                )
-                continue
+    def read_many(
+        self, data_types: list[DataType] | None = None, raw: bool = False
+    ) -> np.ndarray:
+        """
+        Read all data packets that are currently available.
+        Blocks until at least one valid data packet is received.
+        See decode_packets for raw.
 
-            if not self._is_valid_data(data):
-                continue
+        Returns:
+            np.ndarray: The values of the data types.
+                Shape (n_packets, n_data_types)
+        """
+        while True:
+            packets = [
+                data
+                for message in self._receive_lines()
+                if (data := self._extract_data(message)) is not None
+            ]
 
-            data_types = data_types or list(DataType)
-            return np.array(
-                [data_type.value.get_value(data) for data_type in data_types]
-            )
+            array = decode_packets(packets, data_types, raw=raw)
+            if len(array) > 0:
+                return array
+
+    def _extract_data(self, message: str) -> str | None:
+        """
+        Returns the payload of a data message
+        or None if the message is not a data message.
+        """
+        if message.startswith("DEBUG"):  # Ignore debugging messages from the server
+            logger.debug(f"Debug message: {message}")
+            return None
+
+        if _is_dongle_message(message):
+            logger.debug(f"Dongle message: {message}")
+            self._handle_dongle_message(message)
+            return None
+
+        if not message.startswith("D"):  # Only process valid data packets
+            logger.debug(f"Non-data message: {message}")
+            return None
+
+        try:
+            _, data = message.split(".")
+        except ValueError as e:
+            logger.warning(f"Failed to extract data from data message {message}: {e}")
+            return None
+
+        return data
+
+    def _receive(self) -> None:
+        chunk = self._socket.recv(_RECEIVE_BUFFER_SIZE)
+        if not chunk:
+            raise ConnectionClosedError("The connection was closed by the server.")
+
+        self._receive_buffer.extend(chunk)
 
     def _receive_line(self) -> str:
-        line = bytearray()
-        while True:
-            char = self._socket.recv(1)
-            if not char:
-                raise ConnectionClosedError("The connection was closed by the server.")
+        while (end := self._receive_buffer.find(b"\n")) == -1:
+            self._receive()
 
-            if char == b"\r":
-                continue
+        line = self._receive_buffer[:end].replace(b"\r", b"")
+        del self._receive_buffer[: end + 1]
+        # A corrupted byte only invalidates its own packet
+        return line.decode("utf-8", errors="replace")
 
-            if char == b"\n":
-                break
+    def _receive_lines(self) -> list[str]:
+        """
+        Returns all complete lines in the receive buffer.
+        Receives from the socket until at least one line is complete.
+        """
+        while (end := self._receive_buffer.rfind(b"\n")) == -1:
+            self._receive()
 
-            line.extend(char)
-        return line.decode("utf-8")
+        lines = self._receive_buffer[:end].replace(b"\r", b"").split(b"\n")
+        del self._receive_buffer[: end + 1]
+        return [line.decode("utf-8", errors="replace") for line in lines]
 
     def _is_valid_data(self, data: str) -> bool:
-        """Validate the received data"""
-        packet_type = get_byte_at(data, _PACKET_TYPE_POSITION)
-        if packet_type not in _VALID_PACKET_TYPES:
-            logger.warning(f"Invalid type: {packet_type}")
-            return False
-
+        """
+        Validate the length and the type of the received data.
+        The other bytes are validated by decode_packets.
+        """
         if len(data) != _EXPECTED_DATA_LENGTH:
             logger.warning(f"Invalid data length: {len(data)}")
             return False
 
+        try:
+            packet_type = get_byte_at(data, _PACKET_TYPE_POSITION)
+        except ValueError:
+            packet_type = None
+        if packet_type not in _VALID_PACKET_TYPES:
+            logger.warning(f"Invalid type: {data[:2]!r}")
+            return False
+
         return True
 
     def vibrate(
@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+
+class Clock:
+    """
+    The time units of a DAG keep and sleep in. Defaults to real time.
+    """
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Time that is advanced explicitly, e.g. by a replay source to the
+    timestamps of the data it publishes. Sleeping waits until the time is
+    advanced past the wake-up time, however long that takes in real time.
+    """
+
+    def __init__(self, start_time: float = 0.0):
+        self._time = start_time
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+
+    def time(self) -> float:
+        return self._time
+
+    def advance(self, timestamp: float) -> None:
+        """
+        Sets the time to timestamp, unless it is in the past, and wakes the
+        sleepers whose wake-up time is reached.
+        """
+        with self._lock:
+            self._time = max(self._time, timestamp)
+            woken = []
+            while self._sleepers and self._sleepers[0][0] <= self._time:
+                woken.append(heapq.heappop(self._sleepers)[2])
+
+        for future in woken:
+            future.get_loop().call_soon_threadsafe(_wake, future)
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            heapq.heappush(
+                self._sleepers, (self._time + seconds, next(self._counter), future)
+            )
+        await future
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Rate:
+    """
+    Sleeps in a loop so that it runs at a given rate in the time of a clock,
+    like ezmsg.util.rate.Rate in real time.
+    """
+
+    def __init__(self, hz: float, clock: Clock | None = None):
+        self._clock = clock
+        self.sleep_duration = 1.0 / hz
+        self.last_time = self.clock.time()
+
+    @property
+    def clock(self) -> Clock:
+        return self._clock or get_clock()
+
+    def remaining(self) -> float:
+        """Returns the time remaining until the next iteration."""
+        current_time = self.clock.time()
+        # Time jumped backwards
+        self.last_time = min(self.last_time, current_time)
+        return self.sleep_duration - (current_time - self.last_time)
+
+    async def sleep(self) -> None:
+        remaining = self.remaining()
+        current_time = self.clock.time()
+
+        self.last_time += self.sleep_duration
+        # Skip the iterations missed when far behind schedule
+        if current_time - self.last_time > self.sleep_duration * 2:
+            self.last_time = current_time
+
+        await self.clock.sleep(max(0.0, remaining))
+
+
+_clock = Clock()
+
+
+def get_clock() -> Clock:
+    """Returns the clock of the units of this process."""
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """
+    Sets the clock of the units of this process, e.g. a VirtualClock to
+    replay a recording. Units read the clock when they use it, but keep
+    times taken from it, so it should be set before the DAG is run.
+    """
+    global _clock
+    _clock = clock
@@ -1,5 +1,5 @@
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import timedelta
 from functools import cached_property
 from pathlib import Path
@@ -25,10 +25,41 @@ def _validate_channel_names(objects: Sequence["ArrayBase"]) -> None:
     return reference_channels
 
 
+def _validate_scales(objects: Sequence["ArrayBase"]) -> None:
+    reference = objects[0]
+    for obj in objects[1:]:
+        if (obj.scale is None) != (reference.scale is None) or (
+            obj.scale is not None
+            and not (
+                np.array_equal(obj.scale, reference.scale)
+                and np.array_equal(obj.offset, reference.offset)
+            )
+        ):
+            raise ValueError("All objects must have identical scales and offsets.")
+
+
+def _to_slice(indices: list[int]) -> slice | list[int]:
+    """
+    Returns indices as a slice if they are evenly spaced, since indexing with
+    a slice returns a view instead of a copy.
+    """
+    if len(indices) == 1:
+        return slice(indices[0], indices[0] + 1)
+
+    steps = np.diff(indices)
+    if len(indices) == 0 or steps[0] <= 0 or np.any(steps != steps[0]):
+        return indices
+    return slice(indices[0], indices[-1] + 1, int(steps[0]))
+
+
 @dataclass
 class ArrayBase:
     array: np.ndarray[Any, np.dtype[np.float64]]
     channel_names: list[str]
+    # If given, array holds raw counts and the physical value of each channel
+    # is array * scale + offset, computed when physical_array is accessed
+    scale: np.ndarray | None = field(default=None, kw_only=True)
+    offset: np.ndarray | None = field(default=None, kw_only=True)
 
     def __post_init__(self):
         if not isinstance(self.array, np.ndarray):
@@ -43,6 +74,19 @@ class ArrayBase:
                 f" must match number of channels ({self.n_channels})."
             )
 
+        if self.scale is not None:
+            self.scale = np.broadcast_to(
+                np.asarray(self.scale, dtype=np.float64), (self.n_channels,)
+            )
+            self.offset = np.broadcast_to(
+                np.asarray(
+                    0.0 if self.offset is None else self.offset, dtype=np.float64
+                ),
+                (self.n_channels,),
+            )
+        elif self.offset is not None:
+            raise ValueError("An offset requires a scale.")
+
     # TODO: use dataclass methods for serialization
     def __str__(self) -> str:
         attrs = [f"{k}={v}" for k, v in self.attributes.items()]
@@ -60,6 +104,28 @@ class ArrayBase:
             "data": self.array,
         }
 
+    @property
+    def dataset_attributes(self) -> dict[str, dict[str, Any]]:
+        """Returns the attributes of each dataset, if any."""
+        if self.scale is None:
+            return {}
+        return {"data": {"scale": self.scale, "offset": self.offset}}
+
+    @property
+    def physical_array(self) -> np.ndarray:
+        """
+        Returns the values in physical units, scaling raw counts if needed.
+        """
+        if self.scale is None:
+            return self.array
+        return self.array * self.scale + self.offset
+
+    def to_physical(self) -> "ArrayBase":
+        """Returns a copy in physical units, or self if it already is."""
+        if self.scale is None:
+            return self
+        return replace(self, array=self.physical_array, scale=None, offset=None)
+
     @property
     def shape(self) -> tuple[int, int]:
         """Returns the shape of data"""
@@ -212,6 +278,26 @@ class TimestampedArray(ArrayBase):
     def get_channel_indices(self, channels: list[str]) -> list[int]:
         return [self.channel_index_map[ch] for ch in channels]
 
+    def view(
+        self,
+        samples: slice | None = None,
+        channels: list[int] | list[str] | None = None,
+    ) -> "TimestampedArray":
+        """
+        Selects samples and channels like indexing does, but returns a view of
+        the array instead of a copy if the channels are evenly spaced, e.g.
+        all channels or consecutive ones.
+        """
+        if channels is None:
+            indices = list(range(self.n_channels))
+        elif all(isinstance(channel, str) for channel in channels):
+            indices = self.get_channel_indices(channels)
+        else:
+            indices = [range(self.n_channels)[channel] for channel in channels]
+
+        channel_names = [self.channel_names[i] for i in indices]
+        return self._slice_data(samples, _to_slice(indices), channel_names)
+
     def _slice_data(
         self, samples: slice | None, channels: list, channel_names: list[str]
     ) -> "TimestampedArray":
@@ -226,6 +312,8 @@ class TimestampedArray(ArrayBase):
             "array": self.array[samples, channels],
             "channel_names": channel_names,
             "timestamps": self.timestamps[samples],
+            "scale": self.scale[channels] if self.scale is not None else None,
+            "offset": self.offset[channels] if self.offset is not None else None,
         }
 
     def roll(self, shift: int) -> None:
@@ -238,10 +326,15 @@ class TimestampedArray(ArrayBase):
             raise ValueError("At least one object must be provided.")
 
         channel_names = _validate_channel_names(objects)
+        _validate_scales(objects)
         array = np.concatenate([obj.array for obj in objects], axis=0)
         timestamps = np.concatenate([obj.timestamps for obj in objects])
         return TimestampedArray(
-            array=array, channel_names=channel_names, timestamps=timestamps
+            array=array,
+            channel_names=channel_names,
+            timestamps=timestamps,
+            scale=objects[0].scale,
+            offset=objects[0].offset,
         )
 
 
@@ -260,19 +353,35 @@ class Data(TimestampedArray):
         channel_names: list[str] | None = None,
         timestamp_offset: float = 0.0,
         timestamps: np.ndarray | None = None,
+        metadata: dict[str, Any] | None = None,
+        mask: np.ndarray | None = None,
+        scale: np.ndarray | None = None,
+        offset: np.ndarray | None = None,
     ) -> None:
         if sample_rate <= 0:
             raise ValueError(f"Sample rate must be positive, got {sample_rate}")
 
+        if mask is not None and mask.shape != (array.shape[0],):
+            raise ValueError(
+                f"Mask must have shape (n_samples,), got shape {mask.shape}"
+            )
+
         self.array = array
         self.sample_rate = sample_rate
+        # Information about how the data was produced, not kept when slicing
+        self.metadata = metadata if metadata is not None else {}
+        # Whether each sample is valid, e.g. not filled in a gap. None if all are
+        self.mask = mask
         timestamps = timestamps if timestamps is not None else self.index
-        timestamps = timestamps + timestamp_offset
+        if timestamp_offset != 0.0:
+            timestamps = timestamps + timestamp_offset
 
         super().__init__(
             array=array,
             channel_names=channel_names,
             timestamps=timestamps,
+            scale=scale,
+            offset=offset,
         )
 
     def _get_slice_kwargs(
@@ -280,6 +389,7 @@ class Data(TimestampedArray):
     ) -> dict[str, Any]:
         kwargs = super()._get_slice_kwargs(samples, channels, channel_names)
         kwargs["sample_rate"] = self.sample_rate
+        kwargs["mask"] = self.mask[samples] if self.mask is not None else None
         return kwargs
 
     def __setitem__(
@@ -298,10 +408,29 @@ class Data(TimestampedArray):
     def index(self) -> np.ndarray:
         return np.arange(self.length, dtype=np.int32) / self.sample_rate
 
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """
+        Returns whether each sample is valid, all True if there is no mask.
+        """
+        return self.mask if self.mask is not None else np.ones(self.length, bool)
+
     @property
     def duration(self) -> timedelta:
         return timedelta(seconds=self.length / self.sample_rate)
 
+    def to_physical(self) -> "Data":
+        if self.scale is None:
+            return self
+        return Data(
+            array=self.physical_array,
+            sample_rate=self.sample_rate,
+            channel_names=self.channel_names,
+            timestamps=self.timestamps,
+            metadata=self.metadata,
+            mask=self.mask,
+        )
+
     @property
     def attributes(self) -> dict[str, Any]:
         return {
@@ -320,19 +449,55 @@ class Data(TimestampedArray):
         if not all(obj.sample_rate == sample_rate for obj in objects):
             raise ValueError("All objects must have the same sample rate")
 
+        mask = None
+        if any(obj.mask is not None for obj in objects):
+            mask = np.concatenate([obj.valid_mask for obj in objects])
+
         return Data(
             array=base.array,
             channel_names=base.channel_names,
             timestamps=base.timestamps,
             sample_rate=sample_rate,
+            mask=mask,
+            scale=base.scale,
+            offset=base.offset,
         )
 
 
+def propagate_mask(source: Data, target: Data) -> Data:
+    """
+    Sets the mask of target, derived from source, if target has none.
+    If the number of samples differs, e.g. after resampling, a target sample
+    is valid only if the source samples on both sides of it are valid.
+    """
+    if source.mask is None or target.mask is not None:
+        return target
+
+    if target.length == source.length:
+        target.mask = source.mask
+        return target
+
+    # Both sides are the same sample if the timestamps match
+    next_indices = np.clip(
+        np.searchsorted(source.timestamps, target.timestamps, side="left"),
+        0,
+        source.length - 1,
+    )
+    previous_indices = np.clip(
+        np.searchsorted(source.timestamps, target.timestamps, side="right") - 1,
+        0,
+        source.length - 1,
+    )
+    target.mask = source.mask[previous_indices] & source.mask[next_indices]
+    return target
+
+
 def samples_to_timestamped_array(samples: Sequence[Sample]) -> TimestampedArray:
     if len(samples) == 0:
         raise NoSamplesError("No samples provided")
 
     channels_names = _validate_channel_names(samples)
+    _validate_scales(samples)
 
     array = np.stack([sample.array for sample in samples])
     timestamps = np.array([sample.timestamp for sample in samples])
@@ -341,37 +506,67 @@ def samples_to_timestamped_array(samples: Sequence[Sample]) -> TimestampedArray:
         array=array,
         channel_names=channels_names,
         timestamps=timestamps,
+        scale=samples[0].scale,
+        offset=samples[0].offset,
+    )
+
+
+def to_timestamped_array(
+    messages: Sequence[Sample | TimestampedArray],
+) -> TimestampedArray:
+    """
+    Concatenates samples and timestamped arrays, in order, into a single
+    TimestampedArray.
+    """
+    if len(messages) == 0:
+        raise NoSamplesError("No samples provided")
+
+    if all(isinstance(message, Sample) for message in messages):
+        return samples_to_timestamped_array(messages)
+
+    return TimestampedArray.concatenate(
+        [
+            samples_to_timestamped_array([message])
+            if isinstance(message, Sample)
+            else message
+            for message in messages
+        ]
     )
 
 
 def get_all_periods_by_period_length(
     data: Data,
     period_length: int,
+    copy: bool = False,
 ) -> np.ndarray:
     """
     Returns all periods in data.
     Args:
         data (Data): The data to get periods from.
         period_length (int): The length of each period in seconds.
+        copy (bool): See get_periods_by_index.
     Returns:
         np.ndarray: An numpy array.
                     Shape (n_periods, n_samples_per_period, n_channels)
     """
     n_samples_per_period = period_length * data.sample_rate
-    return get_all_periods(data, n_samples_per_period)
+    return get_all_periods(data, n_samples_per_period, copy=copy)
 
 
-def get_all_periods(data: Data, n_samples_per_period: int) -> np.ndarray:
+def get_all_periods(
+    data: Data, n_samples_per_period: int, copy: bool = False
+) -> np.ndarray:
     """
     Returns all periods in data.
     Args:
         data (Data): The data to get periods from.
         n_samples_per_period (int): The number of samples in each period.
+        copy (bool): See get_periods_by_index.
     Returns:
         np.ndarray: An numpy array.
                     Shape (n_periods, n_samples_per_period, n_channels)
     """
-    return get_periods_by_index(data, 0, n_samples_per_period, None)
+    return get_periods_by_index(data, 0, n_samples_per_period, None, copy=copy)
 
 
 def get_periods_by_index(
@@ -379,6 +574,7 @@ def get_periods_by_index(
     start_index: int,
     n_samples_per_period: int,
     n_periods: int | None = None,
+    copy: bool = False,
 ) -> np.ndarray:
     """
     Returns a number of periods in data starting from a given index.
@@ -390,6 +586,9 @@ def get_periods_by_index(
         n_periods (int): The number of periods to return. If None,
                             all periods from the start index to the end of
                             the data are returned.
+        copy (bool): Whether to return a copy. By default, the periods are
+                     a view of the data array if it is contiguous, so
+                     modifying them modifies the data.
 
     Returns:
         np.ndarray: An numpy array
@@ -424,10 +623,50 @@ def get_periods_by_index(
             f" {n_available_samples // n_samples_per_period} periods are available."
         )
 
-    period_indices = np.arange(start_sample_index, end_sample_index)
-    period_indices = period_indices.reshape(n_periods, n_samples_per_period)
+    periods = data.array[start_sample_index:end_sample_index].reshape(
+        n_periods, n_samples_per_period, data.n_channels
+    )
+
+    return periods.copy() if copy else periods
+
+
+def get_sliding_periods(
+    data: Data,
+    n_samples_per_period: int,
+    hop: int,
+    copy: bool = False,
+) -> np.ndarray:
+    """
+    Returns the periods of a sliding window over data.
+
+    Args:
+        data (Data): The data to get periods from.
+        n_samples_per_period (int): The number of samples in each period.
+        hop (int): The number of samples between the starts of
+                   consecutive periods. Periods overlap if it is smaller
+                   than n_samples_per_period.
+        copy (bool): Whether to return a copy. By default, the periods are
+                     a read-only view of the data array, so overlapping
+                     periods take no extra memory.
+
+    Returns:
+        np.ndarray: An numpy array
+                    Shape: (n_periods, n_samples_per_period, n_channels)
+
+    Raises:
+        ValueError: If the period length or the hop is invalid.
+    """
+    if n_samples_per_period <= 0 or n_samples_per_period > data.length:
+        raise ValueError(f"Invalid n_samples_per_period: {n_samples_per_period}")
+
+    if hop <= 0:
+        raise ValueError(f"Invalid hop: {hop}")
+
+    periods = np.lib.stride_tricks.sliding_window_view(
+        data.array, n_samples_per_period, axis=0
+    )[::hop].swapaxes(1, 2)
 
-    return data.array[period_indices]
+    return periods.copy() if copy else periods
 
 
 @dataclass
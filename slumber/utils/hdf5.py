@@ -1,11 +1,31 @@
+import math
+import queue
+import threading
+import time
 import types
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Literal
 
 import h5py
 import numpy as np
 from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from slumber import settings
+from slumber.utils.data import Data
+
+LENGTH_ATTRIBUTE = "length"
+SCALE_ATTRIBUTE = "scale"
+OFFSET_ATTRIBUTE = "offset"
+SAMPLE_RATE_ATTRIBUTE = "sample_rate"
+CHANNEL_NAMES_ATTRIBUTE = "channel_names"
+DATA_DATASET = "data"
+TIMESTAMP_DATASET = "timestamp"
+TIME_INDEX_DATASET = "timestamp_index"
+BLOCK_SIZE_ATTRIBUTE = "block_size"
+DEFAULT_TIME_INDEX_BLOCK_SIZE = 1024
 
 
 class GroupDoesNotExistError(ValueError):
@@ -16,6 +36,145 @@ class DatasetDoesNotExistError(ValueError):
     pass
 
 
+class DatasetOptions(BaseModel):
+    """
+    How a dataset is encoded and compressed.
+    """
+
+    compression: Literal["gzip", "lzf"] | None = settings["hdf5"]["compression"]
+    compression_level: int | None = Field(
+        None, ge=0, le=9, description="Level of gzip compression, 4 if None"
+    )
+    shuffle: bool = Field(
+        False,
+        description=(
+            "Shuffle the bytes of the values before compression,"
+            " which usually compresses numeric data better"
+        ),
+    )
+    scale_offset: int | None = Field(
+        None,
+        ge=0,
+        description=(
+            "Scale-offset filter. For floats, the number of decimal digits kept"
+            " (lossy). For integers, the number of bits kept, 0 to compute the"
+            " minimum number of bits losslessly."
+        ),
+    )
+    dtype: str | None = Field(
+        None, description="Data type stored, that of the data if None"
+    )
+    scale: float | list[float] | None = Field(
+        None,
+        description=(
+            "If given, values are stored as integer counts, (value - offset) / scale"
+            " rounded to the nearest integer, of dtype int16 by default. The scale"
+            " and offset of each channel are stored in the attributes of the"
+            " dataset, see decode_data."
+        ),
+    )
+    offset: float | list[float] = 0.0
+
+    model_config = ConfigDict(frozen=True)
+
+    @model_validator(mode="after")
+    def check_options(self) -> "DatasetOptions":
+        if self.compression_level is not None and self.compression != "gzip":
+            raise ValueError("compression_level can only be used with gzip")
+
+        if self.scale is not None and not np.issubdtype(
+            np.dtype(self.dtype or "int16"), np.integer
+        ):
+            raise ValueError(
+                f"Scaled values must be stored as integers, not {self.dtype}"
+            )
+
+        return self
+
+    @property
+    def create_kwargs(self) -> dict[str, Any]:
+        """Returns the keyword arguments of HDF5Manager.create_dataset."""
+        kwargs = {
+            "compression": self.compression,
+            "compression_opts": self.compression_level,
+            "shuffle": self.shuffle,
+            "scale_offset": self.scale_offset,
+        }
+
+        if self.scale is not None:
+            kwargs[SCALE_ATTRIBUTE] = self.scale
+            kwargs[OFFSET_ATTRIBUTE] = self.offset
+
+        return kwargs
+
+    def encode(self, data: np.ndarray) -> np.ndarray:
+        """
+        Converts data to the stored data type, quantizing it if scaled.
+        Warns if scaled values are clipped to the range of the data type.
+        """
+        if self.scale is None:
+            return data if self.dtype is None else data.astype(self.dtype, copy=False)
+
+        dtype = np.dtype(self.dtype or "int16")
+        counts = np.rint((data - np.asarray(self.offset)) / np.asarray(self.scale))
+
+        info = np.iinfo(dtype)
+        if counts.size > 0 and (counts.min() < info.min or counts.max() > info.max):
+            logger.warning(
+                f"Scaled values exceed the range of {dtype} and are clipped."
+            )
+            counts = np.clip(counts, info.min, info.max)
+
+        return counts.astype(dtype)
+
+
+def decode_data(
+    data: np.ndarray,
+    scale: float | np.ndarray | None = None,
+    offset: float | np.ndarray = 0.0,
+) -> np.ndarray:
+    """
+    Converts values stored as counts by DatasetOptions.encode back to
+    floats. Unscaled values are returned as is.
+    """
+    if scale is None:
+        return data
+    return data * np.asarray(scale) + np.asarray(offset)
+
+
+def get_dataset_options(
+    dataset_options: dict[str, DatasetOptions],
+    group_name: str,
+    dataset_name: str,
+    default: DatasetOptions,
+) -> DatasetOptions:
+    """
+    Returns the options of `<group_name>/<dataset_name>` or else of
+    `<dataset_name>` in any group, or else the default.
+    """
+    return dataset_options.get(
+        f"{group_name}/{dataset_name}", dataset_options.get(dataset_name, default)
+    )
+
+
+@dataclass
+class WriteStatistics:
+    writes: int = 0
+    bytes_written: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.writes if self.writes else 0.0
+
+    def add(self, n_bytes: int, latency: float) -> None:
+        self.writes += 1
+        self.bytes_written += n_bytes
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+
 class HDF5Manager:
     def __init__(self, file_path: Path):
         self.file_path = file_path
@@ -34,8 +193,17 @@ class HDF5Manager:
 
     def close(self) -> None:
         if self.file.id:
+            self.trim()
             self.file.close()
 
+    def flush(self) -> None:
+        """
+        Trims over-allocated datasets and flushes the file, so that the file
+        on disk has no rows beyond the data even if it is not closed cleanly.
+        """
+        self.trim()
+        self.file.flush()
+
     @property
     def groups(self) -> list[str]:
         return list(self.file.keys())
@@ -53,7 +221,11 @@ class HDF5Manager:
         shape: tuple[int, ...] | None = None,
         dtype: str | list[tuple[str, str]] | None = None,
         max_shape: tuple[int | None, ...] | None = None,
-        compression: str = settings["hdf5"]["compression"],
+        chunks: tuple[int, ...] | None = None,
+        compression: str | None = settings["hdf5"]["compression"],
+        compression_opts: int | None = None,
+        shuffle: bool = False,
+        scale_offset: int | None = None,
         **attributes,
     ) -> h5py.Dataset:
         """
@@ -72,8 +244,17 @@ class HDF5Manager:
                 To define field names, use a list of tuples (field_name, field_type).
             max_shape (tuple[int | None, ...] | None, optional):
                 The maximum shape of the dataset. Defaults to None.
-            compression (str, optional): The compression algorithm to use.
+            chunks (tuple[int, ...] | None, optional):
+                The chunk shape of the dataset. Defaults to None,
+                which lets h5py guess it.
+            compression (str | None, optional): The compression algorithm to use.
                 Defaults to settings["hdf5"]["compression"].
+            compression_opts (int | None, optional):
+                The compression level. Defaults to None.
+            shuffle (bool, optional): Whether to apply the shuffle filter.
+                Defaults to False.
+            scale_offset (int | None, optional):
+                The scale-offset filter, see DatasetOptions. Defaults to None.
             **attributes (dict, optional):
             Additional attributes to store in the dataset.
 
@@ -103,15 +284,53 @@ class HDF5Manager:
             shape=shape,
             dtype=dtype,
             maxshape=max_shape,
+            chunks=chunks,
             compression=compression,
+            compression_opts=compression_opts,
+            shuffle=shuffle,
+            scaleoffset=scale_offset,
         )
         dataset.attrs.update(attributes)
+
+        if dataset_name == TIMESTAMP_DATASET and data is not None:
+            self._update_time_index(group_name, 0, data)
+
         return dataset
 
     def get_dataset(self, group_name: str, dataset_name: str) -> h5py.Dataset:
         return self.file[group_name][dataset_name]
 
-    def append(self, group_name: str, dataset_name: str, data: np.ndarray) -> None:
+    def get_length(self, group_name: str, dataset_name: str) -> int:
+        """
+        Returns the number of rows appended to the dataset, which is less
+        than its first dimension while it is over-allocated.
+        """
+        dataset = self.get_dataset(group_name, dataset_name)
+        return int(dataset.attrs.get(LENGTH_ATTRIBUTE, dataset.shape[0]))
+
+    def append(
+        self,
+        group_name: str,
+        dataset_name: str,
+        data: np.ndarray,
+        growth_factor: float | None = None,
+    ) -> None:
+        """
+        Append data along the first axis of the dataset.
+
+        Args:
+            group_name (str): The name of the group of the dataset.
+            dataset_name (str): The name of the dataset.
+            data (np.ndarray): The rows to append.
+            growth_factor (float | None, optional):
+                If given, a full dataset is resized to at least this factor
+                times its size, rounded up to whole chunks, instead of to fit
+                the data exactly. The number of rows appended is stored in
+                the `length` attribute until the dataset is trimmed, on
+                flush and close. Until then, readers must only read the
+                first `length` rows, as get_length and SessionReader do.
+                Defaults to None.
+        """
         if group_name not in self.file:
             raise GroupDoesNotExistError(f"Group {group_name} does not exist.")
 
@@ -132,10 +351,541 @@ class HDF5Manager:
                 f" Dataset shape: {dataset.shape}, Data shape: {data.shape}"
             )
 
-        dataset.resize(dataset.shape[0] + len(data), axis=0)
-        dataset[-len(data) :] = data
+        length = self.get_length(group_name, dataset_name)
+        new_length = length + len(data)
+
+        if new_length > dataset.shape[0]:
+            size = new_length
+            if growth_factor is not None:
+                size = max(size, math.ceil(dataset.shape[0] * growth_factor))
+                if dataset.chunks is not None:
+                    size = math.ceil(size / dataset.chunks[0]) * dataset.chunks[0]
+            dataset.resize(size, axis=0)
+
+        dataset[length:new_length] = data
+
+        if new_length < dataset.shape[0] or LENGTH_ATTRIBUTE in dataset.attrs:
+            dataset.attrs[LENGTH_ATTRIBUTE] = new_length
+
+        if dataset_name == TIMESTAMP_DATASET:
+            self._update_time_index(group_name, length, data)
 
         logger.debug(
             f"Data appended to dataset {dataset_name} in group {group_name}."
             f" The new shape is {dataset.shape}."
         )
+
+    def index_timestamps(self, group_name: str) -> None:
+        """
+        Rebuilds the time index of a group from its timestamp dataset,
+        e.g. for files written before timestamps were indexed.
+        """
+        group = self.file[group_name]
+        if TIME_INDEX_DATASET in group:
+            del group[TIME_INDEX_DATASET]
+
+        dataset = group[TIMESTAMP_DATASET]
+        length = self.get_length(group_name, TIMESTAMP_DATASET)
+        step = _get_time_index_block_size(dataset) * 64
+        for start in range(0, length, step):
+            self._update_time_index(
+                group_name, start, dataset[start : min(start + step, length)]
+            )
+
+    def _update_time_index(
+        self, group_name: str, start: int, timestamps: np.ndarray
+    ) -> None:
+        """
+        Updates the time index of a group with timestamps appended at row
+        start. The index holds the minimum and maximum timestamp of each
+        block of rows, one block per chunk of the timestamp dataset, so that
+        a time range is found by reading only the blocks it overlaps.
+        """
+        if timestamps.ndim != 1 or len(timestamps) == 0:
+            return
+
+        group = self.file[group_name]
+        if TIME_INDEX_DATASET not in group:
+            index = group.create_dataset(
+                TIME_INDEX_DATASET,
+                shape=(0, 2),
+                dtype=np.float64,
+                maxshape=(None, 2),
+                chunks=(256, 2),
+            )
+            index.attrs[BLOCK_SIZE_ATTRIBUTE] = _get_time_index_block_size(
+                group[TIMESTAMP_DATASET]
+            )
+
+        index = group[TIME_INDEX_DATASET]
+        block_size = int(index.attrs[BLOCK_SIZE_ATTRIBUTE])
+        first_block = start // block_size
+        n_blocks = (start + len(timestamps) - 1) // block_size + 1
+
+        # Offsets of the first row of each block within timestamps
+        offsets = np.arange(first_block, n_blocks) * block_size - start
+        offsets[0] = 0
+        minima = np.minimum.reduceat(timestamps, offsets)
+        maxima = np.maximum.reduceat(timestamps, offsets)
+
+        n_indexed = index.shape[0]
+        if first_block < n_indexed:
+            minimum, maximum = index[first_block]
+            minima[0] = min(minima[0], minimum)
+            maxima[0] = max(maxima[0], maximum)
+
+        if n_blocks > n_indexed:
+            index.resize(n_blocks, axis=0)
+        index[first_block:n_blocks] = np.column_stack([minima, maxima])
+
+    def trim(self) -> None:
+        """
+        Resize over-allocated datasets to the number of rows appended.
+        """
+
+        def trim_dataset(name: str, item: h5py.Group | h5py.Dataset) -> None:
+            if isinstance(item, h5py.Dataset) and LENGTH_ATTRIBUTE in item.attrs:
+                item.resize(int(item.attrs[LENGTH_ATTRIBUTE]), axis=0)
+                del item.attrs[LENGTH_ATTRIBUTE]
+
+        if self.file.mode != "r":
+            self.file.visititems(trim_dataset)
+
+
+def _get_time_index_block_size(dataset: h5py.Dataset) -> int:
+    return dataset.chunks[0] if dataset.chunks else DEFAULT_TIME_INDEX_BLOCK_SIZE
+
+
+class WriteBehindWriter:
+    """
+    Writes appends and attributes to an HDF5 file from a background thread,
+    so that resizing and compression never block the caller.
+
+    Appended rows are staged in memory per dataset and handed to the thread
+    in blocks of whole chunks. Datasets are created with that chunk size and
+    grow geometrically. The staged rows that do not fill a chunk are only
+    written on flush and close.
+
+    Datasets are encoded and compressed with the options found by
+    get_dataset_options. The write latency and bytes written are recorded
+    per group in `statistics`. Groups are created when they are first
+    written to.
+    """
+
+    def __init__(
+        self,
+        hdf5_manager: HDF5Manager,
+        chunk_size: int,
+        growth_factor: float = 2.0,
+        default_options: DatasetOptions | None = None,
+        dataset_options: dict[str, DatasetOptions] | None = None,
+    ):
+        self._hdf5_manager = hdf5_manager
+        self._chunk_size = chunk_size
+        self._growth_factor = growth_factor
+        self._default_options = default_options or DatasetOptions()
+        self._dataset_options = dataset_options or {}
+
+        self._dataset_attributes: dict[tuple[str, str], dict] = {}
+        self._lock = threading.Lock()  # Guards _dataset_attributes
+        self._staged: dict[tuple[str, str], np.ndarray] = {}
+        self._n_staged: dict[tuple[str, str], int] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Exception | None = None
+        self.statistics: dict[str, WriteStatistics] = {}
+        self._thread = threading.Thread(
+            target=self._run, name=f"HDF5Writer({hdf5_manager.file_path})", daemon=True
+        )
+        self._thread.start()
+
+    def set_attributes(self, group_name: str, **attributes) -> None:
+        self._raise_error()
+        self._queue.put((self._write_attributes, (group_name, attributes)))
+
+    def set_dataset_attributes(
+        self, group_name: str, dataset_name: str, **attributes
+    ) -> None:
+        """
+        Sets attributes of a dataset when its staged rows are next written,
+        so that they apply to a dataset that does not exist yet.
+        """
+        self._raise_error()
+        with self._lock:
+            self._dataset_attributes[(group_name, dataset_name)] = attributes
+
+    def append(self, group_name: str, dataset_name: str, data: np.ndarray) -> None:
+        """
+        Stages the rows of data, handing all whole chunks to the thread.
+        """
+        self._raise_error()
+
+        key = (group_name, dataset_name)
+        staged = self._staged.get(key)
+        n_staged = self._n_staged.get(key, 0)
+
+        if staged is None or n_staged + len(data) > len(staged):
+            capacity = max(
+                self._chunk_size,
+                n_staged + len(data),
+                0 if staged is None else 2 * len(staged),
+            )
+            new_staged = np.empty((capacity, *data.shape[1:]), dtype=data.dtype)
+            if staged is not None:
+                new_staged[:n_staged] = staged[:n_staged]
+            staged = self._staged[key] = new_staged
+
+        staged[n_staged : n_staged + len(data)] = data
+        n_staged += len(data)
+
+        n_handed_off = n_staged - n_staged % self._chunk_size
+        if n_handed_off > 0:
+            self._hand_off(key, staged[:n_handed_off].copy())
+            staged[: n_staged - n_handed_off] = staged[n_handed_off:n_staged]
+            n_staged -= n_handed_off
+
+        self._n_staged[key] = n_staged
+
+    def flush(self) -> None:
+        """
+        Hands all staged rows to the thread, which trims over-allocated
+        datasets and flushes the file after writing them.
+        """
+        self._raise_error()
+
+        for key, n_staged in self._n_staged.items():
+            if n_staged > 0:
+                self._hand_off(key, self._staged[key][:n_staged].copy())
+                self._n_staged[key] = 0
+
+        self._queue.put((self._hdf5_manager.flush, ()))
+
+    def close(self) -> None:
+        """
+        Writes all staged rows and waits for the thread to finish.
+        """
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+        self._raise_error()
+
+    def _hand_off(self, key: tuple[str, str], data: np.ndarray) -> None:
+        self._queue.put((self._write_data, (*key, data)))
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            if self._error is not None:
+                continue
+
+            function, args = item
+            try:
+                function(*args)
+            except Exception as exc:
+                logger.exception(f"Failed to write to {self._hdf5_manager.file_path}")
+                self._error = exc
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"Writing to {self._hdf5_manager.file_path} failed"
+            ) from self._error
+
+    def _write_attributes(self, group_name: str, attributes: dict) -> None:
+        self._hdf5_manager.file.require_group(group_name).attrs.update(attributes)
+
+    def _write_data(self, group_name: str, dataset_name: str, data: np.ndarray) -> None:
+        start_time = time.perf_counter()
+        self._hdf5_manager.file.require_group(group_name)
+
+        options = get_dataset_options(
+            self._dataset_options, group_name, dataset_name, self._default_options
+        )
+        data = options.encode(data)
+
+        try:
+            self._hdf5_manager.append(
+                group_name, dataset_name, data, growth_factor=self._growth_factor
+            )
+        except DatasetDoesNotExistError:
+            logger.info(f"Dataset `{dataset_name}` does not exist. Creating it.")
+            self._hdf5_manager.create_dataset(
+                group_name=group_name,
+                dataset_name=dataset_name,
+                data=data,
+                chunks=(self._chunk_size, *data.shape[1:]),
+                **options.create_kwargs,
+            )
+
+        with self._lock:
+            attributes = self._dataset_attributes.pop((group_name, dataset_name), None)
+        if attributes:
+            self._hdf5_manager.get_dataset(group_name, dataset_name).attrs.update(
+                attributes
+            )
+
+        self.statistics.setdefault(group_name, WriteStatistics()).add(
+            data.nbytes, time.perf_counter() - start_time
+        )
+
+
+class SessionReader:
+    """
+    Reads the groups of a session file written by HDF5Storage or
+    HDF5StorageService as Data, by time range or in fixed-length windows,
+    without loading whole datasets.
+
+    Uncompressed contiguous datasets are memory-mapped, so that the arrays
+    of the returned Data are views of the file. Other datasets are read
+    through the HDF5 chunk cache. Time ranges are found by binary search of
+    the timestamp dataset, which is assumed to be sorted. If the group has a
+    time index, see HDF5Manager.index_timestamps, only one block of the
+    timestamp dataset is read per search.
+
+    Scaled datasets are returned as counts with their scale and offset,
+    see Data.to_physical.
+    """
+
+    def __init__(self, file_path: Path, chunk_cache_size: int = 64 * 2**20):
+        """
+        Args:
+            file_path (Path): The path of the session file, e.g. storage.h5.
+            chunk_cache_size (int, optional): The size of the chunk cache of
+                each dataset in bytes. Defaults to 64 MiB.
+        """
+        self.file_path = Path(file_path)
+        self.file = h5py.File(self.file_path, "r", rdcc_nbytes=chunk_cache_size)
+        self._arrays: dict[tuple[str, str], np.ndarray | h5py.Dataset] = {}
+        self._time_indices: dict[str, tuple[int, np.ndarray] | None] = {}
+
+    def __enter__(self) -> "SessionReader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: types.TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._arrays.clear()
+        self._time_indices.clear()
+        if self.file.id:
+            self.file.close()
+
+    @property
+    def groups(self) -> list[str]:
+        return list(self.file.keys())
+
+    def get_length(self, group_name: str) -> int:
+        """Returns the number of samples stored in the group."""
+        return len(self._get_array(group_name, TIMESTAMP_DATASET))
+
+    def get_time_range(self, group_name: str) -> tuple[float, float]:
+        """Returns the first and last timestamp of the group."""
+        timestamps = self._get_array(group_name, TIMESTAMP_DATASET)
+        if len(timestamps) == 0:
+            raise ValueError(f"Group {group_name} has no samples.")
+        return float(timestamps[0]), float(timestamps[len(timestamps) - 1])
+
+    def get_sample_rate(self, group_name: str) -> float:
+        """
+        Returns the sample rate stored with the group, or estimates it from
+        the median interval between its first timestamps.
+        """
+        attributes = self.file[group_name].attrs
+        if SAMPLE_RATE_ATTRIBUTE in attributes:
+            return np.asarray(attributes[SAMPLE_RATE_ATTRIBUTE]).item()
+
+        timestamps = self._get_array(group_name, TIMESTAMP_DATASET)[:1024]
+        if len(timestamps) < 2:
+            raise ValueError(f"Cannot estimate the sample rate of {group_name}.")
+
+        sample_rate = 1 / np.median(np.diff(timestamps))
+        return round(sample_rate) if sample_rate >= 1 else float(sample_rate)
+
+    def get_index(self, group_name: str, timestamp: float) -> int:
+        """Returns the index of the first sample at or after timestamp."""
+        timestamps = self._get_array(group_name, TIMESTAMP_DATASET)
+        if isinstance(timestamps, np.ndarray):
+            return int(np.searchsorted(timestamps, timestamp))
+
+        low, high = 0, len(timestamps)
+        if (time_index := self._get_time_index(group_name)) is not None:
+            # Only the rows of the first block reaching timestamp are read
+            block_size, maxima = time_index
+            block = int(np.searchsorted(maxima, timestamp))
+            if block == len(maxima):
+                return len(timestamps)
+            low, high = block * block_size, min((block + 1) * block_size, high)
+            return low + int(np.searchsorted(timestamps[low:high], timestamp))
+
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[middle] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read(
+        self,
+        group_name: str,
+        start_time: float | None = None,
+        end_time: float | None = None,
+    ) -> Data:
+        """
+        Returns the samples from start_time up to, but excluding, end_time.
+        Both default to the bounds of the recording.
+        """
+        start = 0 if start_time is None else self.get_index(group_name, start_time)
+        stop = (
+            self.get_length(group_name)
+            if end_time is None
+            else self.get_index(group_name, end_time)
+        )
+        return self._read_rows(group_name, start, max(start, stop))
+
+    def iter_windows(
+        self,
+        group_name: str,
+        window_duration: float,
+        hop_duration: float | None = None,
+        start_time: float | None = None,
+        end_time: float | None = None,
+    ) -> Iterator[Data]:
+        """
+        Yields windows of window_duration seconds, starting every
+        hop_duration seconds, by their number of samples at the sample rate of
+        the group. Only one window is read at a time and a last window shorter
+        than window_duration is not yielded.
+
+        Args:
+            group_name (str): The group to read.
+            window_duration (float): The duration of each window in seconds.
+            hop_duration (float | None, optional): The duration between the
+                starts of consecutive windows. Defaults to window_duration.
+            start_time (float | None, optional): The timestamp to start at.
+                Defaults to the start of the recording.
+            end_time (float | None, optional): The timestamp to end at.
+                Defaults to the end of the recording.
+        """
+        sample_rate = self.get_sample_rate(group_name)
+        window_length = round(window_duration * sample_rate)
+        hop = round((hop_duration or window_duration) * sample_rate)
+        if window_length <= 0 or hop <= 0:
+            raise ValueError(
+                "Windows and hops must be at least one sample long,"
+                f" got {window_length} and {hop} samples."
+            )
+
+        start = 0 if start_time is None else self.get_index(group_name, start_time)
+        stop = (
+            self.get_length(group_name)
+            if end_time is None
+            else self.get_index(group_name, end_time)
+        )
+        for window_start in range(start, stop - window_length + 1, hop):
+            yield self._read_rows(
+                group_name, window_start, window_start + window_length, sample_rate
+            )
+
+    def _read_rows(
+        self,
+        group_name: str,
+        start: int,
+        stop: int,
+        sample_rate: float | None = None,
+    ) -> Data:
+        array = self._get_array(group_name, DATA_DATASET)[start:stop]
+        if array.ndim == 1:
+            array = array.reshape(-1, 1)
+
+        attributes = self.file[group_name][DATA_DATASET].attrs
+        channel_names = self.file[group_name].attrs.get(CHANNEL_NAMES_ATTRIBUTE)
+        return Data(
+            array=array,
+            sample_rate=sample_rate or self.get_sample_rate(group_name),
+            channel_names=(
+                None
+                if channel_names is None
+                else [
+                    name.decode() if isinstance(name, bytes) else str(name)
+                    for name in channel_names
+                ]
+            ),
+            timestamps=self._get_array(group_name, TIMESTAMP_DATASET)[start:stop],
+            scale=attributes.get(SCALE_ATTRIBUTE),
+            offset=attributes.get(OFFSET_ATTRIBUTE),
+        )
+
+    def _get_time_index(self, group_name: str) -> tuple[int, np.ndarray] | None:
+        """
+        Returns the block size and the maximum timestamp of each block of the
+        time index of the group, if it has one.
+        """
+        if group_name not in self._time_indices:
+            group = self.file[group_name]
+            self._time_indices[group_name] = None
+            if TIME_INDEX_DATASET in group:
+                index = group[TIME_INDEX_DATASET]
+                self._time_indices[group_name] = (
+                    int(index.attrs[BLOCK_SIZE_ATTRIBUTE]),
+                    # Running maximum, in case timestamps are not sorted
+                    np.maximum.accumulate(index[:, 1]),
+                )
+
+        return self._time_indices[group_name]
+
+    def _get_array(
+        self, group_name: str, dataset_name: str
+    ) -> np.ndarray | h5py.Dataset:
+        """
+        Returns a memory map of the dataset if it is uncompressed and
+        contiguous, or else the dataset, limited to the rows appended.
+        """
+        key = (group_name, dataset_name)
+        if key not in self._arrays:
+            dataset = self.file[group_name][dataset_name]
+            length = int(dataset.attrs.get(LENGTH_ATTRIBUTE, dataset.shape[0]))
+            offset = dataset.id.get_offset()
+
+            if (
+                dataset.chunks is None
+                and dataset.compression is None
+                and offset is not None
+            ):
+                self._arrays[key] = np.memmap(
+                    self.file_path,
+                    dtype=dataset.dtype,
+                    mode="r",
+                    offset=offset,
+                    shape=dataset.shape,
+                )[:length]
+            elif length < dataset.shape[0]:
+                self._arrays[key] = _DatasetRows(dataset, length)
+            else:
+                self._arrays[key] = dataset
+
+        return self._arrays[key]
+
+
+class _DatasetRows:
+    """The first rows of an over-allocated dataset, read on indexing."""
+
+    def __init__(self, dataset: h5py.Dataset, length: int):
+        self._dataset = dataset
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, key: int | slice) -> np.ndarray:
+        if isinstance(key, slice):
+            return self._dataset[slice(*key.indices(self._length))]
+        if not -self._length <= key < self._length:
+            raise IndexError(f"Index {key} is out of range for {self._length} rows")
+        return self._dataset[key % self._length]
@@ -0,0 +1,163 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of timestamped samples that keeps the most recent
+    samples in chronological order.
+
+    Every sample is stored twice in a backing array of twice the capacity,
+    so that the buffer contents are always available as a contiguous view
+    without copying. Appending costs O(n_samples) regardless of the capacity.
+
+    If with_mask is True, a validity flag is also stored for every sample.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        n_channels: int,
+        dtype: np.dtype | type = np.float64,
+        with_mask: bool = False,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+
+        self._capacity = capacity
+        self._array = np.zeros((2 * capacity, n_channels), dtype=dtype)
+        self._timestamps = np.zeros(2 * capacity)
+        self._mask = np.ones(2 * capacity, dtype=bool) if with_mask else None
+        self._cursor = 0  # Position of the oldest sample
+
+    def __repr__(self) -> str:
+        return (
+            f"RingBuffer(capacity={self._capacity},"
+            f" n_channels={self.n_channels}, dtype={self._array.dtype})"
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def n_channels(self) -> int:
+        return self._array.shape[1]
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Returns a read-only view of the buffer contents, oldest sample first.
+        The view is only valid until the next append.
+        Shape (capacity, n_channels)
+        """
+        view = self._array[self._cursor : self._cursor + self._capacity]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Returns a read-only view of the buffer timestamps, oldest sample first.
+        The view is only valid until the next append.
+        Shape (capacity,)
+        """
+        view = self._timestamps[self._cursor : self._cursor + self._capacity]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def mask(self) -> np.ndarray | None:
+        """
+        Returns a read-only view of the buffer validity flags, oldest sample
+        first, or None if the buffer has no mask.
+        The view is only valid until the next append.
+        Shape (capacity,)
+        """
+        if self._mask is None:
+            return None
+
+        view = self._mask[self._cursor : self._cursor + self._capacity]
+        view.flags.writeable = False
+        return view
+
+    def fill(
+        self, array: np.ndarray, timestamps: np.ndarray, mask: np.ndarray | None = None
+    ) -> None:
+        """
+        Overwrites the whole buffer.
+
+        Args:
+            array (np.ndarray): Shape (capacity, n_channels)
+            timestamps (np.ndarray): Shape (capacity,)
+            mask (np.ndarray): Shape (capacity,). If None, all samples are valid.
+        """
+        if array.shape != (self._capacity, self.n_channels):
+            raise ValueError(
+                f"Array must have shape {(self._capacity, self.n_channels)},"
+                f" got {array.shape}"
+            )
+
+        self._cursor = 0
+        self._write(0, array, timestamps, mask)
+
+    def append(
+        self, array: np.ndarray, timestamps: np.ndarray, mask: np.ndarray | None = None
+    ) -> None:
+        """
+        Appends samples, overwriting the oldest ones.
+
+        Args:
+            array (np.ndarray): Shape (n_samples, n_channels)
+            timestamps (np.ndarray): Shape (n_samples,)
+            mask (np.ndarray): Shape (n_samples,). If None, all samples are valid.
+        """
+        if array.ndim != 2 or array.shape[1] != self.n_channels:
+            raise ValueError(
+                f"Array must have shape (n_samples, {self.n_channels}),"
+                f" got {array.shape}"
+            )
+
+        if timestamps.shape != (len(array),):
+            raise ValueError(
+                f"Timestamps must have shape ({len(array)},), got {timestamps.shape}"
+            )
+
+        if mask is None:
+            mask = np.ones(len(array), dtype=bool)
+        elif mask.shape != (len(array),):
+            raise ValueError(f"Mask must have shape ({len(array)},), got {mask.shape}")
+
+        # Only the most recent samples fit in the buffer
+        array, timestamps = array[-self._capacity :], timestamps[-self._capacity :]
+        mask = mask[-self._capacity :]
+        n_samples = len(array)
+
+        n_until_end = min(n_samples, self._capacity - self._cursor)
+        self._write(
+            self._cursor,
+            array[:n_until_end],
+            timestamps[:n_until_end],
+            mask[:n_until_end],
+        )
+        self._write(
+            0, array[n_until_end:], timestamps[n_until_end:], mask[n_until_end:]
+        )
+
+        self._cursor = (self._cursor + n_samples) % self._capacity
+
+    def _write(
+        self,
+        start: int,
+        array: np.ndarray,
+        timestamps: np.ndarray,
+        mask: np.ndarray | None,
+    ) -> None:
+        end = start + len(array)
+        mirror_start, mirror_end = start + self._capacity, end + self._capacity
+        self._array[start:end] = self._array[mirror_start:mirror_end] = array
+        self._timestamps[start:end] = timestamps
+        self._timestamps[mirror_start:mirror_end] = timestamps
+
+        if self._mask is not None:
+            valid = True if mask is None else mask
+            self._mask[start:end] = self._mask[mirror_start:mirror_end] = valid
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class SampleRing:
+    """
+    First-in first-out queue of timestamped samples stored in preallocated
+    arrays. Samples are pushed and drained in bulk, and pushing to a full
+    ring overwrites the oldest samples, which are counted as dropped.
+
+    The head and tail counters only increase, so the number of queued
+    samples is their difference and a single producer and a single consumer
+    never write the same counter.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        n_channels: int,
+        dtype: np.dtype | type = np.float64,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+
+        self._capacity = capacity
+        self._array = np.zeros((capacity, n_channels), dtype=dtype)
+        self._timestamps = np.zeros(capacity)
+        self._head = 0  # Number of samples pushed
+        self._tail = 0  # Number of samples drained or dropped
+        self._n_dropped = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"SampleRing(capacity={self._capacity},"
+            f" n_channels={self.n_channels}, dtype={self._array.dtype})"
+        )
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def n_channels(self) -> int:
+        return self._array.shape[1]
+
+    @property
+    def free(self) -> int:
+        return self._capacity - len(self)
+
+    @property
+    def n_dropped(self) -> int:
+        """Returns the number of samples overwritten before being drained."""
+        return self._n_dropped
+
+    def push(self, array: np.ndarray, timestamps: np.ndarray) -> int:
+        """
+        Appends samples, overwriting the oldest ones if the ring is full.
+
+        Args:
+            array (np.ndarray): Shape (n_samples, n_channels)
+            timestamps (np.ndarray): Shape (n_samples,)
+
+        Returns:
+            int: The number of samples dropped to make room.
+        """
+        if array.ndim != 2 or array.shape[1] != self.n_channels:
+            raise ValueError(
+                f"Array must have shape (n_samples, {self.n_channels}),"
+                f" got {array.shape}"
+            )
+
+        if timestamps.shape != (len(array),):
+            raise ValueError(
+                f"Timestamps must have shape ({len(array)},), got {timestamps.shape}"
+            )
+
+        n_dropped = max(0, len(array) - self.free)
+
+        # Only the most recent samples fit in the ring
+        array, timestamps = array[-self._capacity :], timestamps[-self._capacity :]
+        start = self._head % self._capacity
+        n_until_end = min(len(array), self._capacity - start)
+        self._array[start : start + n_until_end] = array[:n_until_end]
+        self._timestamps[start : start + n_until_end] = timestamps[:n_until_end]
+        self._array[: len(array) - n_until_end] = array[n_until_end:]
+        self._timestamps[: len(array) - n_until_end] = timestamps[n_until_end:]
+
+        self._head += len(array)
+        self._tail = max(self._tail, self._head - self._capacity)
+        self._n_dropped += n_dropped
+        return n_dropped
+
+    def drain(self, n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Removes and returns the n oldest samples, or all samples if n is None.
+
+        Returns:
+            np.ndarray: The values. Shape (n, n_channels)
+            np.ndarray: The timestamps. Shape (n,)
+        """
+        n = len(self) if n is None else n
+        if not 0 <= n <= len(self):
+            raise ValueError(f"Cannot drain {n} samples from {len(self)}")
+
+        start = self._tail % self._capacity
+        n_until_end = min(n, self._capacity - start)
+        array = np.concatenate(
+            [self._array[start : start + n_until_end], self._array[: n - n_until_end]]
+        )
+        timestamps = np.concatenate(
+            [
+                self._timestamps[start : start + n_until_end],
+                self._timestamps[: n - n_until_end],
+            ]
+        )
+        self._tail += n
+        return array, timestamps
+
+    def drain_until(self, timestamp: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Removes and returns the oldest samples up to, but excluding, the first
+        one at or after timestamp. Timestamps are assumed to be sorted.
+        """
+        start = self._tail % self._capacity
+        n_until_end = min(len(self), self._capacity - start)
+        n = int(
+            np.searchsorted(self._timestamps[start : start + n_until_end], timestamp)
+        )
+
+        if n == n_until_end:
+            n += int(
+                np.searchsorted(self._timestamps[: len(self) - n_until_end], timestamp)
+            )
+
+        return self.drain(n)
@@ -0,0 +1,135 @@
+import ezmsg.core as ez
+import numpy as np
+import pytest
+
+from slumber.models.dag import CollectionConfig
+from slumber.scripts.replay_session import _replace_source
+from slumber.utils.clock import VirtualClock, get_clock, set_clock
+from slumber.utils.hdf5 import HDF5Manager, SessionReader
+
+SAMPLE_RATE = 256
+START_TIME = 1000.0
+
+
+@pytest.fixture
+def session_file(tmp_path):
+    file_path = tmp_path / "session.h5"
+    array = np.random.default_rng(0).standard_normal((20 * SAMPLE_RATE, 2))
+    timestamps = START_TIME + np.arange(len(array)) / SAMPLE_RATE
+
+    with HDF5Manager(file_path) as manager:
+        manager.create_group(
+            "zmax_raw", channel_names=["EEG_LEFT", "EEG_RIGHT"], sample_rate=256
+        )
+        manager.create_dataset("zmax_raw", "data", data=array)
+        manager.create_dataset("zmax_raw", "timestamp", data=timestamps)
+
+    return file_path, array, timestamps
+
+
+@pytest.fixture
+def clock():
+    previous_clock = get_clock()
+    clock = VirtualClock(START_TIME)
+    set_clock(clock)
+    yield clock
+    set_clock(previous_clock)
+
+
+def _dag(output_path) -> dict:
+    return {
+        "components": [
+            {
+                "name": "ZMAX",
+                "unit": "ZMaxDataReceiver",
+                "settings": {
+                    "zmax": {},
+                    "data_collection_enabled": True,
+                    "data_collection_enabled_check_interval": 1.0,
+                },
+            },
+            {
+                "name": "ZMAX_SAMPLE_RATE_REGULATOR",
+                "unit": "TimeQueue",
+                "settings": {
+                    "max_size": 5120,
+                    "storage": "ring",
+                    "publish_interval": 5,
+                    "publish_enabled": True,
+                    "publish_enabled_check_interval": 1.0,
+                    "sample_rate": SAMPLE_RATE,
+                    "gap_threshold": 1.0,
+                    "timestamp_margin": 1.0,
+                },
+            },
+            {
+                "name": "STORAGE",
+                "unit": "HDF5Storage",
+                "settings": {"file_path": output_path, "group_name": "regularized"},
+            },
+            {"name": "MASTER", "unit": "Master"},
+        ],
+        "connections": [
+            ["ZMAX/OUTPUT_SAMPLE", "ZMAX_SAMPLE_RATE_REGULATOR/INPUT"],
+            ["ZMAX_SAMPLE_RATE_REGULATOR/OUTPUT", "STORAGE/INPUT"],
+            ["MASTER/OUTPUT_WAKE_UP_SIGNAL", "ZMAX/INPUT_STIMULATION_SIGNAL"],
+            ["MASTER/OUTPUT_CUEING_ENABLE_SIGNAL", "ZMAX/INPUT_CONNECT_SIGNAL"],
+        ],
+    }
+
+
+def test_replace_source(tmp_path):
+    dag = _dag(tmp_path / "output.h5")
+
+    _replace_source(dag, {"file_path": tmp_path / "session.h5"})
+
+    assert dag["components"][0]["unit"] == "SessionReplay"
+    assert dag["components"][0]["settings"] == {"file_path": tmp_path / "session.h5"}
+    assert dag["components"][3]["settings"] == {"experiment_state": "ASLEEP"}
+    assert dag["connections"] == [
+        ["ZMAX/OUTPUT_BLOCK", "ZMAX_SAMPLE_RATE_REGULATOR/INPUT"],
+        ["ZMAX_SAMPLE_RATE_REGULATOR/OUTPUT", "STORAGE/INPUT"],
+        ["MASTER/OUTPUT_WAKE_UP_SIGNAL", "ZMAX/INPUT_STIMULATION_SIGNAL"],
+    ]
+
+
+def test_replace_source_without_source(tmp_path):
+    dag = _dag(tmp_path / "output.h5")
+    dag["components"] = dag["components"][1:]
+
+    with pytest.raises(ValueError):
+        _replace_source(dag, {"file_path": tmp_path / "session.h5"})
+
+
+def test_replay_through_time_queue(session_file, clock, tmp_path):
+    file_path, array, timestamps = session_file
+    output_path = tmp_path / "output.h5"
+    dag = _dag(output_path)
+    dag["components"] = dag["components"][:3]
+    dag["connections"] = dag["connections"][:2]
+
+    _replace_source(dag, {"file_path": file_path, "block_duration": 0.5})
+    ez.run(**CollectionConfig.model_validate(dag).configure())
+
+    # The queue published every 5 s of the virtual clock
+    assert clock.time() == timestamps[-1]
+    with SessionReader(output_path) as reader:
+        regularized = reader.read("regularized")
+
+    assert regularized.length == 3 * 5 * SAMPLE_RATE
+    windows = regularized.array.reshape(3, 5 * SAMPLE_RATE, -1)
+    window_timestamps = regularized.timestamps.reshape(3, -1)
+    np.testing.assert_allclose(
+        window_timestamps[:, 0], START_TIME + np.array([0, 5, 10])
+    )
+    np.testing.assert_allclose(
+        window_timestamps[:, -1], START_TIME + np.array([5, 10, 15])
+    )
+    # Windows share their boundary timestamp, so its sample overflows the earlier
+    # window and the first slot of the later one stays empty
+    np.testing.assert_allclose(windows[0], array[: 5 * SAMPLE_RATE])
+    for i in [1, 2]:
+        start = i * 5 * SAMPLE_RATE
+        np.testing.assert_allclose(
+            windows[i, 1:], array[start + 1 : start + 5 * SAMPLE_RATE]
+        )
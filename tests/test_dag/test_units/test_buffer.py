@@ -0,0 +1,41 @@
+import asyncio
+
+import numpy as np
+
+from slumber.dag.units.buffer import (
+    RollingBuffer,
+    RollingBufferSettings,
+    RollingBufferState,
+)
+from slumber.utils.data import Data
+
+
+def _publish(buffer: RollingBuffer, data: Data) -> Data:
+    async def collect() -> list[tuple]:
+        return [output async for output in buffer.on_message(data)]
+
+    [(stream, message)] = asyncio.run(collect())
+    assert stream is buffer.OUTPUT
+    return message
+
+
+def test_published_data_is_kept_across_updates():
+    buffer = RollingBuffer(RollingBufferSettings(size=3))
+    buffer.STATE = RollingBufferState()
+    buffer._set_name("BUFFER")
+    buffer._set_location([])
+    chunks = [
+        Data(np.full((4, 2), float(i)), sample_rate=4, timestamp_offset=i)
+        for i in range(1, 5)
+    ]
+
+    first = _publish(buffer, chunks[0])
+    expected = first.array.copy()
+    expected_timestamps = first.timestamps.copy()
+    for chunk in chunks[1:]:
+        last = _publish(buffer, chunk)
+
+    np.testing.assert_array_equal(first.array, expected)
+    np.testing.assert_array_equal(first.timestamps, expected_timestamps)
+    np.testing.assert_array_equal(last.array[:, 0], np.repeat([2.0, 3.0, 4.0], 4))
+    np.testing.assert_allclose(last.timestamps, 2 + np.arange(12) / 4)
@@ -0,0 +1,40 @@
+import asyncio
+
+import h5py
+import numpy as np
+
+from slumber.dag.units.hdf5_storage import HDF5Storage, Settings, State
+from slumber.utils.data import TimestampedArray
+
+
+def _message(n_samples: int, start: int = 0) -> TimestampedArray:
+    return TimestampedArray(
+        np.arange(start, start + 2 * n_samples, dtype=np.uint16).reshape(-1, 2),
+        channel_names=["EEG_LEFT", "EEG_RIGHT"],
+        timestamps=np.arange(start, start + n_samples, dtype=np.float64),
+        scale=[0.5, 0.25],
+        offset=[-1.0, 1.0],
+    )
+
+
+def test_store_writes_attributes_after_empty_first_message(tmp_path):
+    file_path = tmp_path / "session.h5"
+    storage = HDF5Storage(
+        Settings.model_validate({"file_path": file_path, "group_name": "zmax_raw"})
+    )
+    storage.STATE = State()
+    storage._set_name("STORAGE")
+    storage._set_location([])
+    storage.initialize()
+
+    try:
+        for message in [_message(0), _message(4), _message(4, start=4)]:
+            asyncio.run(storage.store(message))
+    finally:
+        storage.shutdown()
+
+    with h5py.File(file_path, "r") as file:
+        dataset = file["zmax_raw/data"]
+        np.testing.assert_array_equal(dataset.attrs["scale"], [0.5, 0.25])
+        np.testing.assert_array_equal(dataset.attrs["offset"], [-1.0, 1.0])
+        assert len(file["zmax_raw/timestamp"]) == 8
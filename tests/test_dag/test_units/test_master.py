@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from slumber.dag.units.home_lucid_dreaming.master import (
+    ExperimentState,
+    Master,
+    Settings,
+    State,
+)
+from slumber.utils.clock import VirtualClock, get_clock, set_clock
+from slumber.utils.data import Event
+
+
+@pytest.fixture
+def clock():
+    previous_clock = get_clock()
+    clock = VirtualClock(1000.0)
+    set_clock(clock)
+    yield clock
+    set_clock(previous_clock)
+
+
+@pytest.fixture
+def master(clock):
+    settings = Settings.model_validate(
+        {
+            "wake_up_signal": {
+                "vibration": True,
+                "led_color": "OFF",
+                "on_duration": 5,
+                "off_duration": 5,
+                "repetitions": 3,
+            },
+            "cueing_enabled": True,
+            "rem_confidence_threshold": 0.8,
+            "accepted_eye_signals": ["LRL", "RLR"],
+            "wake_up_signal_interval": 4,
+            "experiment_state": "ASLEEP",
+        }
+    )
+    master = Master(settings)
+    master.STATE = State()
+    master._set_name("MASTER")
+    master._set_location([])
+    asyncio.run(master.initialize())
+    return master
+
+
+def _update_eye_signaling(master: Master, events: list[Event]) -> list[tuple]:
+    """Returns the outputs, up to the first wake up signal."""
+
+    async def collect() -> list[tuple]:
+        outputs = []
+        async for stream, message in master.update_eye_signaling(events):
+            outputs.append((stream, message))
+            if stream is master.OUTPUT_WAKE_UP_SIGNAL:
+                break
+        return outputs
+
+    return asyncio.run(collect())
+
+
+def test_eye_signaling_lasts_eye_signal_duration_after_receipt(master, clock):
+    master.STATE.in_rem = True
+
+    # The signal ended long before it is received, as detection takes time
+    outputs = _update_eye_signaling(master, [Event("LRLR", 900.0, 902.4)])
+    assert (master.OUTPUT_CUEING_ENABLE_INCREASE_INTENSITY_SIGNAL, False) in outputs
+    assert master.STATE.eye_signaling
+
+    for time in [1010.0, 1020.0]:
+        clock.advance(time)
+        assert _update_eye_signaling(master, []) == []
+        assert master.STATE.eye_signaling
+
+    master.STATE.in_rem = False
+    clock.advance(1030.0)
+    outputs = _update_eye_signaling(master, [])
+    assert outputs[-1] == (
+        master.OUTPUT_WAKE_UP_SIGNAL,
+        master.SETTINGS.wake_up_signal,
+    )
+    assert master.STATE.experiment_state == ExperimentState.WAKING
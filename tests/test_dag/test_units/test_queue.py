@@ -0,0 +1,195 @@
+import numpy as np
+import pytest
+
+from slumber.dag.units.queue import regularize
+
+SAMPLE_RATE = 10
+
+
+@pytest.fixture
+def regular_timestamps():
+    return np.arange(20) / SAMPLE_RATE
+
+
+def test_regularize_regular_samples(regular_timestamps):
+    array = np.random.rand(20, 2)
+    for interpolation in ["zero", "nearest", "linear"]:
+        regular_array, mask, gap_statistics = regularize(
+            regular_timestamps + 0.01,
+            array,
+            regular_timestamps,
+            interpolation=interpolation,
+            gap_threshold=0.5,
+        )
+        if interpolation != "linear":
+            np.testing.assert_array_equal(regular_array, array)
+        assert gap_statistics.gaps == 0
+        assert gap_statistics.missing_samples == 0
+
+
+@pytest.mark.parametrize(
+    "interpolation, expected",
+    [
+        (
+            "zero",
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19],
+        ),
+        ("nearest", [10] * 10 + list(range(10, 20))),
+        ("linear", [10] * 10 + list(range(10, 20))),
+    ],
+)
+def test_regularize_leading_gap(regular_timestamps, interpolation, expected):
+    timestamps = regular_timestamps[10:]
+    array = np.arange(10, 20, dtype=float).reshape(-1, 1)
+
+    regular_array, mask, gap_statistics = regularize(
+        timestamps,
+        array,
+        regular_timestamps,
+        interpolation=interpolation,
+        gap_threshold=0.5,
+    )
+
+    np.testing.assert_allclose(regular_array[:, 0], expected)
+    assert gap_statistics.gaps == 1
+    assert gap_statistics.missing_samples == 10
+    assert gap_statistics.max_gap_duration == pytest.approx(1.1)
+
+
+def test_regularize_gap_in_the_middle(regular_timestamps):
+    timestamps = np.concatenate([regular_timestamps[:5], regular_timestamps[15:]])
+    array = timestamps.reshape(-1, 1)
+
+    regular_array, mask, gap_statistics = regularize(
+        timestamps,
+        array,
+        regular_timestamps,
+        interpolation="linear",
+        gap_threshold=0.5,
+    )
+
+    np.testing.assert_allclose(regular_array[:, 0], regular_timestamps)
+    assert gap_statistics.gaps == 1
+    assert gap_statistics.missing_samples == 10
+    assert gap_statistics.max_gap_duration == pytest.approx(1.1)
+
+
+def test_regularize_unsorted_samples(regular_timestamps):
+    order = np.random.default_rng(0).permutation(20)
+    array = regular_timestamps.reshape(-1, 1)
+
+    regular_array, _, _ = regularize(
+        regular_timestamps[order], array[order], regular_timestamps
+    )
+
+    np.testing.assert_array_equal(regular_array, array)
+
+
+def test_regularize_without_samples(regular_timestamps):
+    regular_array, mask, gap_statistics = regularize(
+        np.empty(0), np.empty((0, 2)), regular_timestamps, gap_threshold=0.5
+    )
+
+    np.testing.assert_array_equal(regular_array, np.zeros((20, 2)))
+    assert gap_statistics.gaps == 1
+    assert gap_statistics.missing_samples == 20
+
+
+@pytest.mark.parametrize(
+    "gap_fill, expected",
+    [
+        ("zero", [0.0] * 10),
+        ("linear", np.arange(5, 15) / SAMPLE_RATE),
+        ("hold", [0.4] * 10),
+        ("nan", [np.nan] * 10),
+    ],
+)
+def test_regularize_gap_fill(regular_timestamps, gap_fill, expected):
+    timestamps = np.concatenate([regular_timestamps[:5], regular_timestamps[15:]])
+    array = timestamps.reshape(-1, 1)
+
+    regular_array, mask, _ = regularize(
+        timestamps,
+        array,
+        regular_timestamps,
+        interpolation="nearest",
+        gap_threshold=0.5,
+        gap_fill=gap_fill,
+    )
+
+    np.testing.assert_allclose(regular_array[5:15, 0], expected)
+    np.testing.assert_array_equal(regular_array[:5], array[:5])
+    np.testing.assert_array_equal(mask, ~((np.arange(20) >= 5) & (np.arange(20) < 15)))
+
+
+def test_regularize_hold_previous_values(regular_timestamps):
+    regular_array, mask, _ = regularize(
+        regular_timestamps[10:],
+        np.ones((10, 2)),
+        regular_timestamps,
+        gap_threshold=0.5,
+        gap_fill="hold",
+        previous_values=np.array([2.0, 3.0]),
+    )
+
+    np.testing.assert_array_equal(regular_array[:10], [[2.0, 3.0]] * 10)
+    np.testing.assert_array_equal(regular_array[10:], np.ones((10, 2)))
+    assert not mask[:10].any()
+    assert mask[10:].all()
+
+
+def _burst_timestamps(
+    n_samples: int, sample_rate: float, rng: np.random.Generator
+) -> np.ndarray:
+    """Timestamps interpolated over bursts of samples that arrive late."""
+    timestamps = []
+    last_timestamp = -np.inf
+    index = 0
+    while index < n_samples:
+        n_burst = min(int(rng.integers(1, 12)), n_samples - index)
+        index += n_burst
+        arrival_time = max(
+            (index - 1) / sample_rate + abs(rng.normal(0, 0.01)), last_timestamp
+        )
+        start_time = max(arrival_time - n_burst / sample_rate, last_timestamp)
+        timestamps.append(np.linspace(start_time, arrival_time, n_burst + 1)[1:])
+        last_timestamp = arrival_time
+    return np.concatenate(timestamps)
+
+
+@pytest.mark.parametrize("timestamps_kind", ["jittered", "bursty"])
+def test_regularize_zero_places_samples_in_order(timestamps_kind):
+    sample_rate = 256
+    regular_timestamps = np.arange(2560) / sample_rate
+    array = np.arange(1, 2561, dtype=float).reshape(-1, 1)
+    rng = np.random.default_rng(0)
+    if timestamps_kind == "jittered":
+        timestamps = np.sort(regular_timestamps + rng.normal(0, 0.0005, 2560))
+    else:
+        timestamps = _burst_timestamps(2560, sample_rate, rng)
+
+    regular_array, mask, gap_statistics = regularize(
+        timestamps, array, regular_timestamps, gap_threshold=1.0
+    )
+
+    # No sample overwrites another one, and slots without a sample are invalid
+    assert np.all(np.diff(regular_array[mask, 0]) == 1)
+    assert np.all(regular_array[~mask] == 0)
+    assert np.all(regular_array[mask] != 0)
+    assert mask.sum() + gap_statistics.dropped_samples == 2560
+    assert gap_statistics.missing_samples == np.count_nonzero(~mask) <= 5
+
+
+def test_regularize_zero_skips_gaps(regular_timestamps):
+    timestamps = np.concatenate([regular_timestamps[:5], regular_timestamps[15:]])
+
+    regular_array, mask, gap_statistics = regularize(
+        timestamps + 0.01,
+        timestamps.reshape(-1, 1),
+        regular_timestamps,
+        gap_threshold=0.5,
+    )
+
+    np.testing.assert_array_equal(regular_array[mask, 0], timestamps)
+    np.testing.assert_array_equal(mask, np.isin(regular_timestamps, timestamps))
+    assert gap_statistics.missing_samples == 10
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from slumber.dag.units.transform import TransformConfig, TransformPipeline
+from slumber.processing.transforms import ArraySelector, StreamingResample
+from slumber.utils.data import Data
+
+CHANNEL_NAMES = ["EEG_LEFT", "EEG_RIGHT", "ACC_X"]
+
+
+def _raw_chunk(start: int, length: int = 2560) -> Data:
+    rng = np.random.default_rng(start)
+    return Data(
+        rng.integers(0, 2**16, (length, 3)).astype(np.uint16),
+        sample_rate=256,
+        channel_names=CHANNEL_NAMES,
+        timestamp_offset=start / 256,
+        scale=np.array([0.01, 0.02, 0.5]),
+        offset=np.array([-300.0, -600.0, 0.0]),
+    )
+
+
+def _configs(*transforms: tuple[str, dict]) -> list[TransformConfig]:
+    return [
+        TransformConfig.model_validate({"class_name": name, "kwargs": kwargs})
+        for name, kwargs in transforms
+    ]
+
+
+def test_array_selector_returns_view():
+    data = _raw_chunk(0).to_physical()
+
+    selected = ArraySelector()(data, start_index=-10, channels=CHANNEL_NAMES[:2])
+    assert np.shares_memory(selected.array, data.array)
+    assert selected.channel_names == CHANNEL_NAMES[:2]
+    assert np.array_equal(selected.array, data.array[-10:, :2])
+
+    selected = ArraySelector()(data, channels=["EEG_RIGHT", "EEG_LEFT"])
+    assert np.array_equal(selected.array, data.array[:, [1, 0]])
+
+
+def test_transform_pipeline_matches_transforms():
+    configs = _configs(
+        ("ArraySelector", {"channels": CHANNEL_NAMES[:2]}),
+        ("StreamingResample", {"new_sample_rate": 128}),
+    )
+    pipeline = TransformPipeline(configs)
+    resample = StreamingResample()
+
+    assert [stage.name for stage in pipeline.stages] == [
+        "to_physical+ArraySelector",
+        "StreamingResample",
+    ]
+
+    for start in range(0, 3 * 2560, 2560):
+        chunk = _raw_chunk(start)
+        output = pipeline(chunk)
+        expected = resample(
+            ArraySelector()(chunk.to_physical(), channels=CHANNEL_NAMES[:2]), 128
+        )
+        assert np.array_equal(output.array, expected.array)
+        assert np.array_equal(output.timestamps, expected.timestamps)
+
+    assert all(stage.statistics.calls == 3 for stage in pipeline.stages)
+    assert all(stage.statistics.total_time > 0 for stage in pipeline.stages)
+
+
+def test_transform_pipeline_does_not_reuse_last_output():
+    pipeline = TransformPipeline(
+        _configs(("ArraySelector", {"channels": CHANNEL_NAMES[:2]}))
+    )
+
+    first = pipeline(_raw_chunk(0))
+    second = pipeline(_raw_chunk(2560))
+    assert not np.shares_memory(first.array, second.array)
+    assert np.array_equal(first.array, _raw_chunk(0).to_physical().array[:, :2])
+
+
+def test_transform_config_rejects_unknown_kwargs():
+    with pytest.raises(ValidationError):
+        _configs(("ArraySelector", {"chanels": CHANNEL_NAMES[:2]}))
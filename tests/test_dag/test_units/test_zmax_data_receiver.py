@@ -0,0 +1,120 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from slumber.dag.units import zmax as zmax_unit
+from slumber.dag.units.zmax import (
+    Settings,
+    State,
+    ZMaxDataReceiver,
+    _interpolate_timestamps,
+)
+from slumber.sources.zmax import SAMPLE_RATE
+
+
+class FakeZMax:
+    def __init__(self, arrays: list[np.ndarray]) -> None:
+        self._arrays = iter(arrays)
+
+    def read_many(self, data_types, raw=False) -> np.ndarray:
+        return next(self._arrays)
+
+
+def _receiver(arrays: list[np.ndarray], **settings) -> ZMaxDataReceiver:
+    receiver = ZMaxDataReceiver(
+        Settings.model_validate(
+            {
+                "zmax": {},
+                "data_collection_enabled": True,
+                "data_collection_enabled_check_interval": 1.0,
+                "data_types": ["EEG_LEFT"],
+                **settings,
+            }
+        )
+    )
+    receiver.STATE = State()
+    receiver._set_name("ZMAX")
+    receiver._set_location([])
+    receiver.STATE.zmax = FakeZMax(arrays)
+    receiver.STATE.data_collection_enabled = True
+    receiver.STATE.block_arrays = []
+    receiver.STATE.block_timestamps = []
+    return receiver
+
+
+def _publish_blocks(receiver: ZMaxDataReceiver, n_blocks: int) -> list:
+    async def collect() -> list:
+        blocks = []
+        generator = receiver.publish_sample()
+        async for stream, block in generator:
+            assert stream is receiver.OUTPUT_BLOCK
+            blocks.append(block)
+            if len(blocks) == n_blocks:
+                break
+        await generator.aclose()
+        return blocks
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Reads of 3, 7, 5 and 10 samples arriving every 20 ms."""
+    lengths = [3, 7, 5, 10]
+    arrays = np.split(
+        np.arange(sum(lengths), dtype=float).reshape(-1, 1), np.cumsum(lengths)[:-1]
+    )
+    arrival_times = iter(100.0 + 0.02 * np.arange(1, len(lengths) + 1))
+    monkeypatch.setattr(zmax_unit.time, "time", lambda: next(arrival_times))
+    return arrays
+
+
+def test_interpolate_timestamps():
+    sample_period = 1 / SAMPLE_RATE
+
+    # The first samples end at their arrival time
+    timestamps = _interpolate_timestamps(4, 10.0, None)
+    np.testing.assert_allclose(timestamps, 10.0 - sample_period * np.arange(3, -1, -1))
+
+    # Samples arriving after a gap are not stretched over it
+    timestamps = _interpolate_timestamps(4, 11.0, 10.0)
+    np.testing.assert_allclose(np.diff(timestamps), sample_period)
+    assert timestamps[-1] == 11.0
+
+    # Samples arriving in a burst are spread since the last timestamp
+    timestamps = _interpolate_timestamps(4, 10.01, 10.0)
+    np.testing.assert_allclose(timestamps, [10.0025, 10.005, 10.0075, 10.01])
+
+
+def test_publish_blocks_by_size(reads):
+    receiver = _receiver(reads, block_size=8)
+
+    blocks = _publish_blocks(receiver, 3)
+
+    assert [block.length for block in blocks] == [8, 8, 8]
+    np.testing.assert_array_equal(
+        np.concatenate([block.array for block in blocks]),
+        np.concatenate(reads)[:24],
+    )
+    timestamps = np.concatenate([block.timestamps for block in blocks])
+    assert np.all(np.diff(timestamps) > 0)
+    assert timestamps[-1] <= 100.08
+
+    # The sample left over is carried to the next block
+    assert receiver.STATE.block_length == 1
+    np.testing.assert_array_equal(receiver.STATE.block_arrays[0], [[24.0]])
+
+
+def test_publish_blocks_by_duration(reads):
+    receiver = _receiver(reads, block_duration=0.04)
+
+    blocks = _publish_blocks(receiver, 2)
+
+    # 0.04 s at 256 Hz
+    assert [block.length for block in blocks] == [10, 10]
+    np.testing.assert_array_equal(
+        np.concatenate([block.array for block in blocks]),
+        np.concatenate(reads)[:20],
+    )
+    assert receiver.STATE.block_length == 5
@@ -2,13 +2,13 @@ import numpy as np
 import pytest
 
 from slumber.processing.eye_movement import (
-    MovementEvent,
+    EyeMovementDetector,
     _build_sequences,
     _detect_movement_events,
     _peaks_to_events,
     detect_lr_eye_movements,
 )
-from slumber.utils.data import Data
+from slumber.utils.data import Data, Event
 
 
 @pytest.fixture
@@ -27,7 +27,7 @@ def sample_data():
 
 
 def test_movement_event_creation():
-    event = MovementEvent(label="L", start_time=1.0, end_time=2.0)
+    event = Event(label="L", start_time=1.0, end_time=2.0)
     assert event.label == "L"
     assert event.start_time == 1.0
     assert event.end_time == 2.0
@@ -42,7 +42,7 @@ def test_detect_lr_eye_movements_basic(sample_data):
     )
     assert isinstance(movements, list)
     if movements:
-        assert isinstance(movements[0], MovementEvent)
+        assert isinstance(movements[0], Event)
 
 
 def test_detect_lr_eye_movements_empty(sample_data):
@@ -55,7 +55,7 @@ def test_detect_lr_eye_movements_empty(sample_data):
 
 def test_peaks_to_events():
     peaks = [100, 200, 300]
-    events = _peaks_to_events(peaks, 100, "L")
+    events = _peaks_to_events(peaks, np.arange(400) / 100, "L")
     assert len(events) == 3
     assert events[0].label == "L"
     assert events[0].start_time == 1.0
@@ -63,8 +63,8 @@ def test_peaks_to_events():
 
 def test_build_sequences_single():
     events = [
-        MovementEvent("L", 1.0, 1.0),
-        MovementEvent("R", 1.2, 1.2),
+        Event("L", 1.0, 1.0),
+        Event("R", 1.2, 1.2),
     ]
     sequences = _build_sequences(events, max_sequence_gap=0.5)
     assert len(sequences) == 1
@@ -73,10 +73,10 @@ def test_build_sequences_single():
 
 def test_build_sequences_multiple():
     events = [
-        MovementEvent("L", 1.0, 1.0),
-        MovementEvent("R", 1.2, 1.2),
-        MovementEvent("L", 3.0, 3.0),
-        MovementEvent("R", 3.2, 3.2),
+        Event("L", 1.0, 1.0),
+        Event("R", 1.2, 1.2),
+        Event("L", 3.0, 3.0),
+        Event("R", 3.2, 3.2),
     ]
     sequences = _build_sequences(events, max_sequence_gap=0.5)
     assert len(sequences) == 2
@@ -95,16 +95,76 @@ def test_detect_movement_events(sample_data):
     )
     assert isinstance(events, list)
     if events:
-        assert all(isinstance(event, MovementEvent) for event in events)
+        assert all(isinstance(event, Event) for event in events)
         assert all(event.label in ["L", "R"] for event in events)
 
 
 def test_sequence_with_same_direction():
     events = [
-        MovementEvent("L", 1.0, 1.0),
-        MovementEvent("L", 1.1, 1.1),
-        MovementEvent("R", 1.3, 1.3),
+        Event("L", 1.0, 1.0),
+        Event("L", 1.1, 1.1),
+        Event("R", 1.3, 1.3),
     ]
     sequences = _build_sequences(events, max_sequence_gap=0.5)
     assert len(sequences) == 1
     assert sequences[0].label == "LR"
+
+
+def _lrlr_data(starts: list[float], duration: float = 120.0) -> Data:
+    sample_rate = 128
+    time = np.arange(round(duration * sample_rate)) / sample_rate
+    difference = np.zeros_like(time)
+    for start in starts:
+        for i, sign in enumerate([1, -1, 1, -1]):
+            center = start + 0.8 * i
+            difference += sign * 400 * np.exp(-(((time - center) / 0.15) ** 2))
+
+    noise = np.random.default_rng(0).normal(0, 5, (len(time), 2))
+    return Data(
+        np.column_stack([difference / 2, -difference / 2]) + noise,
+        sample_rate=sample_rate,
+        channel_names=["left_eeg", "right_eeg"],
+    )
+
+
+@pytest.mark.parametrize("window_length", [10, 30])
+def test_eye_movement_detector_reports_sequences_once(window_length):
+    # The second sequence spans two chunks
+    data = _lrlr_data([20.0, 57.5, 95.0])
+    expected = detect_lr_eye_movements(
+        data, "left_eeg", "right_eeg", difference_threshold=280
+    )
+    assert [sequence.label for sequence in expected] == ["LRLR"] * 3
+
+    detector = EyeMovementDetector("left_eeg", "right_eeg", difference_threshold=280)
+    sequences = []
+    chunk_length = 10 * data.sample_rate
+    for end in range(chunk_length, data.length + 1, chunk_length):
+        start = max(end - window_length * data.sample_rate, 0)
+        for sequence in detector.update(data[start:end]):
+            # Reported by the chunk in which max_sequence_gap has passed
+            latency = data.timestamps[end - 1] - sequence.end_time
+            assert 1.5 < latency < 10 + 1.5 + 0.5
+            sequences.append(sequence)
+
+    assert [sequence.label for sequence in sequences] == ["LRLR"] * 3
+    for sequence, expected_sequence in zip(sequences, expected, strict=True):
+        assert sequence.start_time == pytest.approx(expected_sequence.start_time)
+        assert sequence.end_time == pytest.approx(expected_sequence.end_time)
+
+
+def test_eye_movement_detector_restarts_after_gap():
+    data = _lrlr_data([20.0], duration=23.5)
+    detector = EyeMovementDetector("left_eeg", "right_eeg", difference_threshold=280)
+
+    # The movements are final, but not max_sequence_gap after the last one
+    assert detector.update(data) == []
+    sequences = detector.update(
+        Data(
+            data.array,
+            sample_rate=data.sample_rate,
+            channel_names=data.channel_names,
+            timestamp_offset=100.0,
+        )
+    )
+    assert [sequence.label for sequence in sequences] == ["LRLR"]
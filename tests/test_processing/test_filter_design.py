@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from mne.filter import filter_data
+
+from slumber.processing.filter_design import (
+    FilterDesignCache,
+    design_butter,
+    filter_design_cache,
+)
+from slumber.processing.transforms import FIRFilter
+from slumber.utils.data import Data
+
+
+def test_filter_design_cache_evicts_least_recently_used():
+    cache = FilterDesignCache(max_size=2)
+
+    cache.get("a", lambda: np.zeros(1))
+    cache.get("b", lambda: np.ones(1))
+    cache.get("a", lambda: pytest.fail("a is cached"))
+    cache.get("c", lambda: np.ones(2))
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.get("a", lambda: pytest.fail("a is cached"))
+    assert cache.get("b", lambda: np.full(1, 2.0))[0] == 2.0
+
+    with pytest.raises(ValueError):
+        cache.get("a", lambda: np.zeros(1))[0] = 1.0
+
+
+def test_design_butter_is_cached():
+    filter_design_cache.clear()
+
+    b, a = design_butter(4, (0.5, 30), "band", 256)
+    assert design_butter(4, [0.5, 30], "band", 256)[0] is b
+    assert (filter_design_cache.hits, filter_design_cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("cutoffs", [(0.3, 30.0), (None, 30.0), (0.3, None)])
+def test_fir_filter_matches_filter_data(cutoffs):
+    rng = np.random.default_rng(0)
+    data = Data(rng.standard_normal((2000, 2)), sample_rate=128)
+
+    for _ in range(2):
+        filtered = FIRFilter()(data, *cutoffs)
+
+    expected = filter_data(data.array.T, 128, *cutoffs, verbose=False).T
+    assert np.allclose(filtered.array, expected)
+
+
+@pytest.mark.parametrize("phase", ["zero", "zero-double", "minimum"])
+@pytest.mark.parametrize("pad", ["reflect_limited", "reflect", "edge"])
+@pytest.mark.parametrize("n_samples", [2000, 50])
+def test_fir_filter_matches_filter_data_padding(phase, pad, n_samples):
+    rng = np.random.default_rng(0)
+    data = Data(rng.standard_normal((n_samples, 2)), sample_rate=128)
+
+    filtered = FIRFilter()(data, 0.3, 30.0, phase=phase, pad=pad)
+
+    expected = filter_data(
+        data.array.T, 128, 0.3, 30.0, phase=phase, pad=pad, verbose=False
+    ).T
+    assert np.allclose(filtered.array, expected)
+
+
+def test_fir_filter_accepts_filter_data_arguments():
+    rng = np.random.default_rng(0)
+    data = Data(rng.standard_normal((2000, 2)), sample_rate=128)
+
+    filtered = FIRFilter()(
+        data, 0.3, 30.0, n_jobs=1, copy=True, verbose=False, filter_length="15s"
+    )
+    expected = filter_data(data.array.T, 128, 0.3, 30.0, filter_length="15s").T
+    assert np.allclose(filtered.array, expected)
+
+    filtered = FIRFilter()(data, 0.3, 30.0, method="iir", picks=[0, 1])
+    expected = filter_data(data.array.T, 128, 0.3, 30.0, method="iir").T
+    assert np.allclose(filtered.array, expected)
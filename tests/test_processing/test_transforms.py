@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from slumber.processing.transforms import (
+    FIRFilter,
+    StreamingFilter,
+    StreamingResample,
+)
+from slumber.utils.data import Data
+
+SAMPLE_RATE = 128
+WINDOW_LENGTH = 40 * SAMPLE_RATE
+CHUNK_LENGTH = 5 * SAMPLE_RATE
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((WINDOW_LENGTH + 10 * CHUNK_LENGTH, 2))
+
+
+def _windows(signal: np.ndarray):
+    """Yields the windows of a rolling buffer over signal."""
+    for end in range(WINDOW_LENGTH, len(signal) + 1, CHUNK_LENGTH):
+        yield Data(
+            signal[end - WINDOW_LENGTH : end],
+            sample_rate=SAMPLE_RATE,
+            timestamp_offset=(end - WINDOW_LENGTH) / SAMPLE_RATE,
+        )
+
+
+def test_streaming_filter_fir_matches_fir_filter(signal):
+    streaming_filter = StreamingFilter()
+
+    for window in _windows(signal):
+        filtered = streaming_filter(window, low_cutoff=0.3, high_cutoff=30.0)
+
+    # The output is delayed by half the filter length
+    delay = filtered.timestamps[-1] - window.timestamps[-1]
+    assert delay < 0
+    assert filtered.length == window.length
+    assert np.allclose(np.diff(filtered.timestamps), 1 / SAMPLE_RATE)
+
+    expected = FIRFilter()(
+        Data(signal, sample_rate=SAMPLE_RATE), low_cutoff=0.3, high_cutoff=30.0
+    )
+    start = round(filtered.timestamps[0] * SAMPLE_RATE)
+    # Far from the edges, where FIRFilter pads the signal
+    interior = slice(WINDOW_LENGTH // 2, None)
+    assert np.allclose(
+        filtered.array[interior],
+        expected.array[start : start + filtered.length][interior],
+    )
+
+
+def test_streaming_filter_iir_matches_whole_signal(signal):
+    streaming_filter = StreamingFilter()
+
+    for window in _windows(signal):
+        filtered = streaming_filter(
+            window, low_cutoff=0.3, high_cutoff=30.0, method="iir"
+        )
+
+    expected = StreamingFilter()(
+        Data(signal, sample_rate=SAMPLE_RATE),
+        low_cutoff=0.3,
+        high_cutoff=30.0,
+        method="iir",
+    )
+    assert np.array_equal(filtered.timestamps, window.timestamps)
+    assert np.allclose(filtered.array, expected.array[-WINDOW_LENGTH:])
+
+
+def test_streaming_filter_restarts_after_gap(signal):
+    streaming_filter = StreamingFilter()
+    windows = list(_windows(signal))
+
+    streaming_filter(windows[0], low_cutoff=0.3, high_cutoff=30.0)
+    restarted = streaming_filter(windows[-1], low_cutoff=0.3, high_cutoff=30.0)
+    expected = StreamingFilter()(windows[-1], low_cutoff=0.3, high_cutoff=30.0)
+
+    assert np.array_equal(restarted.array, expected.array)
+    assert np.array_equal(restarted.timestamps, expected.timestamps)
+
+
+@pytest.mark.parametrize(
+    "sample_rate, new_sample_rate, chunk_lengths",
+    [
+        (256, 128, [2560] * 4),
+        (256, 100, [2560] * 4),
+        (256, 128, [100, 37, 513, 2560, 3]),
+        (100, 256, [1000, 999, 1]),
+    ],
+)
+def test_streaming_resample_matches_resample_poly(
+    sample_rate, new_sample_rate, chunk_lengths
+):
+    signal = np.random.default_rng(0).standard_normal((sum(chunk_lengths), 2))
+    streaming_resample = StreamingResample()
+
+    resampled = []
+    start = 0
+    for length in chunk_lengths:
+        chunk = Data(
+            signal[start : start + length],
+            sample_rate=sample_rate,
+            timestamp_offset=start / sample_rate,
+        )
+        resampled.append(streaming_resample(chunk, new_sample_rate))
+        start += length
+
+    if all(length == chunk_lengths[0] for length in chunk_lengths):
+        n_samples = chunk_lengths[0] * new_sample_rate // sample_rate
+        assert all(chunk.length == n_samples for chunk in resampled)
+
+    array = np.concatenate([chunk.array for chunk in resampled])
+    timestamps = np.concatenate([chunk.timestamps for chunk in resampled])
+    assert np.allclose(np.diff(timestamps), 1 / new_sample_rate)
+
+    # The first call returns outputs before the signal, the last call does
+    # not return those that need later samples
+    start = np.searchsorted(timestamps, 0.0)
+    assert timestamps[start] == 0.0
+    expected = resample_poly(signal, new_sample_rate, sample_rate, axis=0)
+    assert np.array_equal(array[start:], expected[: len(array) - start])
+
+
+def test_streaming_resample_restarts_after_gap():
+    signal = np.random.default_rng(0).standard_normal((2560, 2))
+    streaming_resample = StreamingResample()
+
+    streaming_resample(Data(signal, sample_rate=256), 128)
+    restarted = streaming_resample(
+        Data(signal, sample_rate=256, timestamp_offset=20.0), 128
+    )
+    expected = StreamingResample()(
+        Data(signal, sample_rate=256, timestamp_offset=20.0), 128
+    )
+
+    assert np.array_equal(restarted.array, expected.array)
+    assert np.array_equal(restarted.timestamps, expected.timestamps)
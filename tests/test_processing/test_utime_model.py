@@ -6,8 +6,8 @@ import pytest
 from tensorflow.keras.models import Model
 from utime.hyperparameters import YAMLHParams
 
-from slumber.processing.sleep_scoring import UTimeModel, score
-from slumber.utils.data import Data
+from slumber.processing.sleep_scoring import IncrementalScorer, UTimeModel, score
+from slumber.utils.data import Data, get_all_periods
 
 
 @pytest.fixture
@@ -80,6 +80,16 @@ def test_prepare_data_with_resampling(utime_model, sample_data):
     assert prepared_data.shape == (2, 3, 1280, 2)
 
 
+def test_prepare_data_reuses_working_buffer(utime_model, sample_data):
+    prepared_data = utime_model.prepare_data(sample_data).copy()
+
+    # Data changed in place is preprocessed again
+    sample_data.array[:] = np.random.rand(*sample_data.shape)
+    other_prepared_data = utime_model.prepare_data(sample_data)
+    assert not np.array_equal(other_prepared_data, prepared_data)
+    assert np.shares_memory(utime_model.prepare_data(sample_data), other_prepared_data)
+
+
 @pytest.mark.parametrize(
     "channel_groups, expection",
     [
@@ -119,6 +129,46 @@ def test_predict_with_single_channel_group(utime_model, sample_data):
     )  # 5 classes
 
 
+def test_predict_with_max_batch_size(
+    utime_model, sample_model_dir, utime_params, sample_data
+):
+    channel_groups = [[0], [1]]
+    predictions = utime_model.predict(
+        utime_model.prepare_data(sample_data), channel_groups
+    )
+
+    batched_model = UTimeModel(
+        model_dir=sample_model_dir, max_batch_size=1, **utime_params
+    )
+    batched_predictions = batched_model.predict(
+        batched_model.prepare_data(sample_data), channel_groups
+    )
+
+    np.testing.assert_allclose(batched_predictions, predictions, rtol=1e-5)
+
+
+def test_predict_with_compiled_inference(
+    utime_model, sample_model_dir, utime_params, sample_data
+):
+    channel_groups = [[0], [1]]
+    predictions = utime_model.predict(
+        utime_model.prepare_data(sample_data), channel_groups
+    )
+
+    compiled_model = UTimeModel(
+        model_dir=sample_model_dir, compile_inference=True, **utime_params
+    )
+    compiled_model.warm_up(batch_size=len(channel_groups))
+    assert compiled_model.first_call_latency is not None
+    assert compiled_model.steady_state_latency is not None
+
+    compiled_predictions = compiled_model.predict(
+        compiled_model.prepare_data(sample_data), channel_groups
+    )
+
+    np.testing.assert_allclose(compiled_predictions, predictions, rtol=1e-5)
+
+
 def test_predict_with_invalid_group(utime_model, sample_data):
     prepared_data = utime_model.prepare_data(sample_data)
     channel_groups = [[0, 1]]
@@ -148,3 +198,82 @@ def test_score_without_argmax(sample_data, utime_model):
     assert isinstance(result, Data)
     assert result.shape == (3, 5)  # 3 periods, 5 sleep stages
     assert result.channel_names == ["W", "N1", "N2", "N3", "REM"]
+
+
+class PointwiseModel:
+    """
+    Stand-in for UTimeModel whose scores only depend on the scored samples,
+    so incremental scoring must match scoring the whole window.
+    """
+
+    input_sample_rate = 4
+    n_samples_per_prediction = 4
+    n_periods = 3
+    n_samples_per_period = 8
+    period_duration = 2.0
+    sleep_stage_annotations = ["W", "REM"]
+
+    def __init__(self):
+        self.n_scored_periods = []
+
+    def prepare_data(self, data: Data) -> np.ndarray:
+        periods = get_all_periods(data, self.n_samples_per_period)
+        self.n_scored_periods.append(len(periods))
+        return periods[np.newaxis]
+
+    def predict(self, data: np.ndarray, channel_groups: list[list[int]]) -> np.ndarray:
+        values = data[..., channel_groups[0]].reshape(-1, 4).mean(axis=-1)
+        return np.column_stack([values, 1 - values])
+
+
+def test_incremental_scorer_matches_full_scoring():
+    model = PointwiseModel()
+    scorer = IncrementalScorer(model, channel_groups=[[0]], margin_periods=1)
+    signal = np.random.default_rng(0).random((200, 1))
+    window_length = 80
+
+    for end in range(window_length, 160, 8):
+        window = Data(
+            signal[end - window_length : end],
+            sample_rate=4,
+            timestamp_offset=(end - window_length) / 4,
+        )
+
+        result = scorer.score(window, arg_max=False)
+        expected = score(window, PointwiseModel(), channel_groups=[[0]], arg_max=False)
+
+        np.testing.assert_allclose(result.array, expected.array)
+        np.testing.assert_allclose(result.timestamps, expected.timestamps)
+
+    # Only the first call scores the whole (padded) window
+    assert model.n_scored_periods[0] == 12
+    assert all(n == model.n_periods for n in model.n_scored_periods[1:])
+
+
+def test_incremental_scorer_rescoring_after_gap():
+    model = PointwiseModel()
+    scorer = IncrementalScorer(model, channel_groups=[[0]])
+    signal = np.random.default_rng(0).random((80, 1))
+
+    scorer.score(Data(signal, sample_rate=4))
+    scorer.score(Data(signal, sample_rate=4, timestamp_offset=100))
+
+    assert model.n_scored_periods == [12, 12]
+
+
+def test_incremental_scorer_invalid_margin():
+    with pytest.raises(ValueError):
+        IncrementalScorer(PointwiseModel(), margin_periods=3)
+
+
+def test_score_propagates_mask():
+    mask = np.ones(48, dtype=bool)
+    mask[10] = False
+    data = Data(np.random.rand(48, 1), sample_rate=4, mask=mask)
+
+    scores = score(data, PointwiseModel(), channel_groups=[[0]], arg_max=True)
+
+    np.testing.assert_array_equal(
+        scores.mask,
+        [True, True, False, True, True, True, True, True, True, True, True, True],
+    )
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import mne
+import numpy as np
+import pytest
+
+from slumber.scripts import score_zmax
+from slumber.sources.zmax import SAMPLE_RATE
+from slumber.utils.data import Data
+
+PERIOD_DURATION = 30
+N_SAMPLES_PER_PREDICTION = 3 * SAMPLE_RATE
+
+
+def _score(data: Data, model, channel_groups, arg_max) -> Data:
+    """Predicts the mean and the energy of every three seconds of each sample."""
+    windows = data.array.reshape(-1, N_SAMPLES_PER_PREDICTION, data.n_channels)
+    return Data(
+        np.concatenate([windows.mean(axis=1), (windows**2).mean(axis=1)], axis=1),
+        sample_rate=SAMPLE_RATE / N_SAMPLES_PER_PREDICTION,
+    )
+
+
+@pytest.fixture
+def recording():
+    n_samples = 40 * PERIOD_DURATION * SAMPLE_RATE
+    time = np.arange(n_samples) / SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    return np.column_stack(
+        [
+            np.sin(2 * np.pi * 0.5 * time) + 0.1 * rng.standard_normal(n_samples)
+            for _ in score_zmax.EEG_CHANNELS
+        ]
+    )
+
+
+@pytest.mark.parametrize("apply_filter", [True, False])
+def test_score_in_chunks_matches_whole_recording(
+    recording, apply_filter, tmp_path, monkeypatch
+):
+    raws = [
+        mne.io.RawArray(
+            channel[np.newaxis], mne.create_info(1, SAMPLE_RATE), verbose=False
+        )
+        for channel in recording.T
+    ]
+    monkeypatch.setattr(score_zmax, "_open_raw_data", lambda data_dir: raws)
+    monkeypatch.setattr(score_zmax, "score", _score)
+    model = SimpleNamespace(
+        n_periods=8,
+        period_duration=PERIOD_DURATION,
+        input_sample_rate=SAMPLE_RATE,
+        n_samples_per_prediction=N_SAMPLES_PER_PREDICTION,
+        sleep_stage_annotations=["A", "B", "C", "D"],
+    )
+
+    output_path = tmp_path / "predictions.csv"
+    score_zmax.score_in_chunks(
+        tmp_path,
+        model,
+        output_path,
+        overlap_periods=2,
+        epoch_duration=PERIOD_DURATION,
+        apply_filter=apply_filter,
+    )
+
+    data = Data(
+        recording, sample_rate=SAMPLE_RATE, channel_names=score_zmax.EEG_CHANNELS
+    )
+    if apply_filter:
+        data = score_zmax._filter(data)
+    expected = score_zmax._resample_predictions(
+        _score(data, model, None, False), PERIOD_DURATION
+    )
+    predictions = np.loadtxt(output_path, delimiter=",", skiprows=1)
+    np.testing.assert_allclose(predictions, expected.array)
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from slumber.scripts import score_zmax_batch
+from slumber.scripts.score_zmax import EEG_CHANNELS, FILE_EXTENSION
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data_dir = tmp_path / "night"
+    data_dir.mkdir()
+    for channel in EEG_CHANNELS:
+        path = data_dir / f"{channel}.{FILE_EXTENSION}"
+        path.touch()
+        os.utime(path, (100, 100))
+    return data_dir
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    model_dir = tmp_path / "model"
+    (model_dir / "model").mkdir(parents=True)
+    path = model_dir / "model" / "weights.h5"
+    path.touch()
+    os.utime(path, (200, 200))
+    return model_dir
+
+
+def test_is_up_to_date(data_dir, model_dir):
+    output_path = data_dir / "predictions.csv"
+    model_modification_time = score_zmax_batch._get_model_modification_time(model_dir)
+    assert model_modification_time == 200
+
+    assert not score_zmax_batch._is_up_to_date(
+        data_dir, output_path, model_modification_time
+    )
+
+    output_path.touch()
+    os.utime(output_path, (300, 300))
+    assert score_zmax_batch._is_up_to_date(
+        data_dir, output_path, model_modification_time
+    )
+
+    # Older than the model
+    assert not score_zmax_batch._is_up_to_date(data_dir, output_path, 400)
+
+    # Older than the recording
+    os.utime(data_dir / f"{EEG_CHANNELS[0]}.{FILE_EXTENSION}", (400, 400))
+    assert not score_zmax_batch._is_up_to_date(
+        data_dir, output_path, model_modification_time
+    )
+
+
+def test_score_night_replaces_output_when_complete(data_dir, monkeypatch):
+    output_path = data_dir / "predictions.csv"
+    output_path.write_text("old")
+
+    def score_in_chunks(data_dir, model, output_path, **kwargs):
+        assert output_path.name.endswith(score_zmax_batch.PARTIAL_FILE_SUFFIX)
+        output_path.write_text("new")
+        return 3600.0
+
+    monkeypatch.setattr(score_zmax_batch, "score_in_chunks", score_in_chunks)
+    recording_duration, _ = score_zmax_batch._score_night(
+        data_dir, output_path, 10, 30, True
+    )
+
+    assert recording_duration == 3600.0
+    assert output_path.read_text() == "new"
+    assert list(data_dir.glob(f"*{score_zmax_batch.PARTIAL_FILE_SUFFIX}")) == []
+
+
+def test_score_night_keeps_output_on_failure(data_dir, monkeypatch):
+    output_path = data_dir / "predictions.csv"
+    output_path.write_text("old")
+
+    def score_in_chunks(data_dir, model, output_path, **kwargs):
+        output_path.write_text("incomplete")
+        raise OSError("Truncated recording")
+
+    monkeypatch.setattr(score_zmax_batch, "score_in_chunks", score_in_chunks)
+    with pytest.raises(OSError):
+        score_zmax_batch._score_night(data_dir, output_path, 10, 30, True)
+
+    assert output_path.read_text() == "old"
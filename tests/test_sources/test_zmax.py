@@ -4,7 +4,13 @@ from unittest.mock import patch
 import numpy as np
 import pytest
 
-from slumber.sources.zmax import _EXPECTED_DATA_LENGTH, DataType, ZMax
+from slumber.sources.zmax import (
+    _EXPECTED_DATA_LENGTH,
+    DataType,
+    ZMax,
+    decode_packets,
+    get_scale_table,
+)
 
 
 @pytest.fixture
@@ -102,6 +108,110 @@ def test_zmax_read(zmax_device, caplog):
     assert result.shape == (len(DataType),)
 
 
+def _create_packet(rng: np.random.Generator) -> str:
+    buffer = rng.integers(0, 256, (_EXPECTED_DATA_LENGTH + 1) // 3)
+    buffer[0] = rng.integers(1, 12)  # Valid packet type
+    return "-".join(f"{byte:02X}" for byte in buffer)
+
+
+def test_decode_packets():
+    rng = np.random.default_rng(0)
+    packets = [_create_packet(rng) for _ in range(10)]
+
+    result = decode_packets(packets)
+
+    expected = np.array(
+        [
+            [data_type.value.get_value(packet) for data_type in DataType]
+            for packet in packets
+        ]
+    )
+    assert result.shape == (10, len(DataType))
+    np.testing.assert_allclose(result, expected)
+
+
+def test_decode_packets_raw():
+    rng = np.random.default_rng(0)
+    packets = [_create_packet(rng) for _ in range(10)]
+    data_types = [DataType.EEG_LEFT, DataType.ACCELEROMETER_X, DataType.BATTERY]
+
+    counts = decode_packets(packets, data_types, raw=True)
+    scales, offsets = get_scale_table(data_types)
+
+    assert counts.dtype == np.uint16
+    np.testing.assert_allclose(
+        counts * scales + offsets, decode_packets(packets, data_types)
+    )
+
+
+def test_decode_packets_drops_invalid_packets():
+    rng = np.random.default_rng(0)
+    valid_packet = _create_packet(rng)
+    invalid_type_packet = "00" + valid_packet[2:]
+    invalid_hex_packet = "ZZ" + valid_packet[2:]
+    non_ascii_packet = valid_packet[:-1] + "\N{REPLACEMENT CHARACTER}"
+
+    result = decode_packets(
+        [
+            valid_packet,
+            invalid_type_packet,
+            invalid_hex_packet,
+            non_ascii_packet,
+            "01-02",
+        ],
+        [DataType.EEG_LEFT],
+    )
+
+    assert result.shape == (1, 1)
+
+
+def test_zmax_read_drops_corrupted_packets(zmax_device):
+    rng = np.random.default_rng(0)
+    packet = _create_packet(rng)
+    non_hex_packet = packet[:10] + "zz" + packet[12:]
+    stream = f"D.{non_hex_packet}\r\nD.\xff{packet[1:]}\r\nD.{packet}\r\n".encode(
+        "latin-1"
+    )
+    zmax_device._socket.recv.side_effect = [stream]
+
+    result = zmax_device.read([DataType.EEG_LEFT])
+
+    np.testing.assert_allclose(result, decode_packets([packet], [DataType.EEG_LEFT])[0])
+
+
+def test_zmax_read_many_keeps_packets_around_invalid_bytes(zmax_device):
+    rng = np.random.default_rng(0)
+    packets = [_create_packet(rng) for _ in range(3)]
+    stream = (f"D.{packets[0]}\r\nD.\xff{packets[1][1:]}\r\nD.{packets[2]}\r\n").encode(
+        "latin-1"
+    )
+    zmax_device._socket.recv.side_effect = [stream]
+
+    result = zmax_device.read_many([DataType.EEG_LEFT])
+
+    np.testing.assert_allclose(
+        result, decode_packets([packets[0], packets[2]], [DataType.EEG_LEFT])
+    )
+
+
+def test_zmax_read_many(zmax_device):
+    rng = np.random.default_rng(0)
+    packets = [_create_packet(rng) for _ in range(5)]
+    stream = (
+        "DEBUG test message\r\n" + "".join(f"D.{p}\r\n" for p in packets)
+    ).encode()
+    zmax_device._socket.recv.side_effect = [stream[:50], stream[50:300], stream[300:]]
+
+    first = zmax_device.read_many([DataType.EEG_LEFT, DataType.EEG_RIGHT])
+    second = zmax_device.read_many([DataType.EEG_LEFT, DataType.EEG_RIGHT])
+
+    result = np.concatenate([first, second])
+    assert result.shape == (5, 2)
+    np.testing.assert_allclose(
+        result, decode_packets(packets, [DataType.EEG_LEFT, DataType.EEG_RIGHT])
+    )
+
+
 def test_zmax_connection_lost(zmax_device):
     zmax_device._socket.recv.return_value = b""
     with pytest.raises(ConnectionError, match="Lost connection to ZMax"):
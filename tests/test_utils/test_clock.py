@@ -0,0 +1,57 @@
+import asyncio
+
+from slumber.utils.clock import Rate, VirtualClock
+
+
+async def _run_woken_tasks() -> None:
+    # Waking takes one iteration of the loop and resuming another
+    for _ in range(2):
+        await asyncio.sleep(0)
+
+
+def test_virtual_clock_sleep():
+    clock = VirtualClock(100.0)
+    woken = []
+
+    async def sleep(seconds: float) -> None:
+        await clock.sleep(seconds)
+        woken.append(seconds)
+
+    async def main() -> None:
+        tasks = [asyncio.create_task(sleep(seconds)) for seconds in [5, 1, 10]]
+        await asyncio.sleep(0)
+
+        clock.advance(103)
+        await _run_woken_tasks()
+        assert woken == [1]
+
+        # Time does not go backwards
+        clock.advance(50)
+        assert clock.time() == 103
+
+        clock.advance(110)
+        await asyncio.gather(*tasks)
+        assert woken == [1, 5, 10]
+
+    asyncio.run(main())
+
+
+def test_rate_with_virtual_clock():
+    clock = VirtualClock(0.0)
+    rate = Rate(0.1, clock=clock)
+    publish_times = []
+
+    async def publish() -> None:
+        while True:
+            await rate.sleep()
+            publish_times.append(rate.last_time)
+
+    async def main() -> None:
+        task = asyncio.create_task(publish())
+        for time in range(1, 36):
+            clock.advance(time)
+            await _run_woken_tasks()
+        task.cancel()
+
+    asyncio.run(main())
+    assert publish_times == [10, 20, 30]
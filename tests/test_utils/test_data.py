@@ -7,10 +7,14 @@ import pytest
 from slumber.utils.data import (
     Data,
     Sample,
+    TimestampedArray,
     get_all_periods,
     get_all_periods_by_period_length,
     get_periods_by_index,
+    get_sliding_periods,
+    propagate_mask,
     samples_to_timestamped_array,
+    to_timestamped_array,
 )
 
 
@@ -167,6 +171,110 @@ def test_get_periods_by_index_raises_error(
         )
 
 
+def test_get_periods_by_index_returns_view(sample_data):
+    periods = get_periods_by_index(sample_data, 1, 1280, 2)
+    assert np.shares_memory(periods, sample_data.array)
+    np.testing.assert_array_equal(periods[0], sample_data.array[1280:2560])
+
+    copied_periods = get_periods_by_index(sample_data, 1, 1280, 2, copy=True)
+    assert not np.shares_memory(copied_periods, sample_data.array)
+    np.testing.assert_array_equal(copied_periods, periods)
+
+
+@pytest.mark.parametrize(
+    "n_samples_per_period, hop, expected_shape",
+    [
+        (1280, 1280, (3, 1280, 2)),
+        (1280, 640, (5, 1280, 2)),
+        (1000, 1280, (3, 1000, 2)),
+    ],
+)
+def test_get_sliding_periods(sample_data, n_samples_per_period, hop, expected_shape):
+    periods = get_sliding_periods(sample_data, n_samples_per_period, hop)
+    assert periods.shape == expected_shape
+    assert np.shares_memory(periods, sample_data.array)
+
+    for i, period in enumerate(periods):
+        np.testing.assert_array_equal(
+            period, sample_data.array[i * hop : i * hop + n_samples_per_period]
+        )
+
+    copied_periods = get_sliding_periods(
+        sample_data, n_samples_per_period, hop, copy=True
+    )
+    assert not np.shares_memory(copied_periods, sample_data.array)
+    np.testing.assert_array_equal(copied_periods, periods)
+
+
+@pytest.mark.parametrize(
+    "n_samples_per_period, hop",
+    [
+        (0, 1280),
+        (4000, 1280),
+        (1280, 0),
+    ],
+)
+def test_get_sliding_periods_raises_error(sample_data, n_samples_per_period, hop):
+    with pytest.raises(ValueError):
+        get_sliding_periods(sample_data, n_samples_per_period, hop)
+
+
+def test_data_mask_slicing_and_concatenation():
+    mask = np.arange(10) % 3 != 0
+    data = Data(np.random.rand(10, 2), sample_rate=10, mask=mask)
+
+    np.testing.assert_array_equal(data[2:6].mask, mask[2:6])
+    np.testing.assert_array_equal(data[::2, [0]].mask, mask[::2])
+
+    other_data = Data(np.random.rand(5, 2), sample_rate=10)
+    assert other_data.mask is None
+    np.testing.assert_array_equal(
+        Data.concatenate([data, other_data]).mask, np.concatenate([mask, [True] * 5])
+    )
+
+    with pytest.raises(ValueError):
+        Data(np.random.rand(10, 2), sample_rate=10, mask=mask[:5])
+
+
+def test_scaled_array():
+    counts = np.arange(20, dtype=np.uint16).reshape(10, 2)
+    data = Data(counts, sample_rate=10, scale=[0.5, 2.0], offset=[1.0, 0.0])
+
+    expected = counts * [0.5, 2.0] + [1.0, 0.0]
+    np.testing.assert_allclose(data.physical_array, expected)
+    assert data.dataset_attributes["data"]["scale"].tolist() == [0.5, 2.0]
+
+    physical = data.to_physical()
+    assert physical.scale is None
+    assert physical.dataset_attributes == {}
+    np.testing.assert_allclose(physical.array, expected)
+
+    np.testing.assert_allclose(data[2:4, [1]].physical_array, expected[2:4, [1]])
+    np.testing.assert_allclose(
+        Data.concatenate([data[:5], data[5:]]).physical_array, expected
+    )
+
+    with pytest.raises(ValueError):
+        Data.concatenate([data, physical])
+
+    with pytest.raises(ValueError):
+        Data(counts, sample_rate=10, offset=1.0)
+
+
+def test_propagate_mask():
+    mask = np.ones(20, dtype=bool)
+    mask[8:10] = False
+    source = Data(np.random.rand(20, 1), sample_rate=10, mask=mask)
+
+    same_length = propagate_mask(source, Data(np.random.rand(20, 1), sample_rate=10))
+    np.testing.assert_array_equal(same_length.mask, mask)
+
+    downsampled = propagate_mask(source, Data(np.random.rand(10, 1), sample_rate=5))
+    np.testing.assert_array_equal(downsampled.mask, np.arange(10) != 4)
+
+    assert propagate_mask(Data(np.random.rand(20, 1), 10), downsampled) is downsampled
+
+
 def test_data_slice_assignment(sample_data):
     data = copy.deepcopy(sample_data)
 
@@ -258,3 +366,22 @@ def test_samples_to_timestamped_array_different_channels():
         ValueError, match="All objects must have identical channel names"
     ):
         samples_to_timestamped_array(samples)
+
+
+def test_to_timestamped_array_mixed_messages():
+    messages = [
+        Sample(array=np.array([1, 2]), channel_names=["ch1", "ch2"], timestamp=0.0),
+        TimestampedArray(
+            array=np.array([[3, 4], [5, 6]]),
+            channel_names=["ch1", "ch2"],
+            timestamps=np.array([1.0, 2.0]),
+        ),
+        Sample(array=np.array([7, 8]), channel_names=["ch1", "ch2"], timestamp=3.0),
+    ]
+
+    result = to_timestamped_array(messages)
+
+    assert result.shape == (4, 2)
+    assert result.channel_names == ["ch1", "ch2"]
+    np.testing.assert_array_equal(result.array[:, 0], np.array([1, 3, 5, 7]))
+    np.testing.assert_array_equal(result.timestamps, np.array([0.0, 1.0, 2.0, 3.0]))
@@ -1,7 +1,14 @@
 import numpy as np
 import pytest
 
-from slumber.utils.hdf5 import HDF5Manager
+from slumber.utils.hdf5 import (
+    DatasetOptions,
+    HDF5Manager,
+    SessionReader,
+    WriteBehindWriter,
+    decode_data,
+    get_dataset_options,
+)
 
 
 @pytest.fixture
@@ -92,3 +99,281 @@ def test_get_dataset(hdf5_manager):
         manager.create_dataset("test_group", "test_dataset", data=data)
         dataset = manager.get_dataset("test_group", "test_dataset")
         assert np.array_equal(dataset[:], data)
+
+
+def test_append_data_with_growth_factor(hdf5_manager):
+    with hdf5_manager as manager:
+        manager.create_group("test_group")
+        data = np.random.rand(100, 2)
+        dataset = manager.create_dataset(
+            "test_group", "test_dataset", data=data[:10], chunks=(16, 2)
+        )
+
+        for start in range(10, 100, 10):
+            manager.append(
+                "test_group", "test_dataset", data[start : start + 10], growth_factor=2
+            )
+
+        assert dataset.shape == (128, 2)  # Doubled, in whole chunks of 16 rows
+        assert manager.get_length("test_group", "test_dataset") == 100
+        np.testing.assert_array_equal(dataset[:100], data)
+
+    with HDF5Manager(hdf5_manager.file_path) as manager:
+        dataset = manager.get_dataset("test_group", "test_dataset")
+        assert dataset.shape == (100, 2)
+        assert "length" not in dataset.attrs
+
+
+def test_flush_trims_over_allocated_datasets(hdf5_manager):
+    with hdf5_manager as manager:
+        manager.create_group("test_group")
+        data = np.random.rand(40, 2)
+        dataset = manager.create_dataset(
+            "test_group", "test_dataset", data=data[:10], chunks=(16, 2)
+        )
+        manager.append("test_group", "test_dataset", data[10:20], growth_factor=2)
+        assert dataset.shape == (32, 2)
+
+        manager.flush()
+        assert dataset.shape == (20, 2)
+        assert "length" not in dataset.attrs
+
+        manager.append("test_group", "test_dataset", data[20:], growth_factor=2)
+        assert manager.get_length("test_group", "test_dataset") == 40
+        np.testing.assert_array_equal(dataset[:40], data)
+
+
+def test_write_behind_writer_flush_trims_datasets(hdf5_manager):
+    with hdf5_manager as manager:
+        writer = WriteBehindWriter(manager, chunk_size=16)
+        writer.append("test_group", "data", np.random.rand(100, 2))
+        writer.flush()
+        writer.close()
+
+        dataset = manager.get_dataset("test_group", "data")
+        assert dataset.shape == (100, 2)
+        assert "length" not in dataset.attrs
+
+
+def test_write_behind_writer(hdf5_manager):
+    data = np.random.rand(100, 2)
+    timestamps = np.arange(100.0)
+
+    with hdf5_manager as manager:
+        manager.create_group("test_group")
+        writer = WriteBehindWriter(manager, chunk_size=16)
+        writer.set_attributes("test_group", sample_rate=10)
+
+        for start in range(0, 100, 7):
+            writer.append("test_group", "data", data[start : start + 7])
+            writer.append("test_group", "timestamp", timestamps[start : start + 7])
+
+        writer.close()
+
+        assert manager.file["test_group"].attrs["sample_rate"] == 10
+        assert writer.statistics["test_group"].bytes_written == (
+            data.nbytes + timestamps.nbytes
+        )
+        assert manager.get_dataset("test_group", "data").chunks == (16, 2)
+        assert manager.get_length("test_group", "data") == 100
+        np.testing.assert_array_equal(
+            manager.get_dataset("test_group", "data")[:100], data
+        )
+        np.testing.assert_array_equal(
+            manager.get_dataset("test_group", "timestamp")[:100], timestamps
+        )
+
+
+def test_write_behind_writer_dataset_attributes(hdf5_manager):
+    counts = np.arange(20, dtype=np.uint16).reshape(10, 2)
+
+    with hdf5_manager as manager:
+        writer = WriteBehindWriter(manager, chunk_size=4)
+        writer.set_dataset_attributes("test_group", "data", scale=[0.5, 2.0])
+        writer.append("test_group", "data", counts)
+        writer.close()
+
+        dataset = manager.get_dataset("test_group", "data")
+        assert dataset.dtype == np.uint16
+        np.testing.assert_array_equal(
+            decode_data(dataset[:10], dataset.attrs["scale"]), counts * [0.5, 2.0]
+        )
+
+
+def test_write_behind_writer_raises_error(hdf5_manager):
+    with hdf5_manager as manager:
+        writer = WriteBehindWriter(manager, chunk_size=4)
+        writer.append("test_group", "data", np.random.rand(4, 2, 2))
+
+        with pytest.raises(RuntimeError):
+            writer.close()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        DatasetOptions(compression="lzf", shuffle=True),
+        DatasetOptions(compression="gzip", compression_level=1),
+        DatasetOptions(compression=None, dtype="float32"),
+        DatasetOptions(compression="gzip", scale=0.5, offset=[0.0, 1.0]),
+    ],
+)
+def test_write_behind_writer_dataset_options(hdf5_manager, options):
+    data = np.random.default_rng(0).integers(-100, 100, (100, 2)) * 0.5
+
+    with hdf5_manager as manager:
+        writer = WriteBehindWriter(
+            manager, chunk_size=16, dataset_options={"test_group/data": options}
+        )
+        writer.append("test_group", "data", data)
+        writer.close()
+
+        dataset = manager.get_dataset("test_group", "data")
+        assert dataset.compression == options.compression
+        assert dataset.shuffle == options.shuffle
+        np.testing.assert_array_equal(
+            decode_data(
+                dataset[:100], dataset.attrs.get("scale"), dataset.attrs.get("offset")
+            ),
+            data,
+        )
+
+
+def test_dataset_options_encode():
+    data = np.array([[-1.5, 0.0], [2.0, 1.25]])
+    options = DatasetOptions(scale=[0.5, 0.25], offset=0.5)
+
+    counts = options.encode(data)
+
+    assert counts.dtype == np.int16
+    np.testing.assert_array_equal(counts, [[-4, -2], [3, 3]])
+    np.testing.assert_array_equal(decode_data(counts, [0.5, 0.25], 0.5), data)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"compression": "lzf", "compression_level": 1},
+        {"scale": 0.5, "dtype": "float32"},
+    ],
+)
+def test_dataset_options_raises_error(options):
+    with pytest.raises(ValueError):
+        DatasetOptions(**options)
+
+
+def test_get_dataset_options():
+    default = DatasetOptions()
+    dataset_options = {
+        "data": DatasetOptions(compression="lzf"),
+        "raw/data": DatasetOptions(compression=None),
+    }
+
+    assert (
+        get_dataset_options(dataset_options, "raw", "data", default).compression is None
+    )
+    assert (
+        get_dataset_options(dataset_options, "other", "data", default).compression
+        == "lzf"
+    )
+    assert get_dataset_options(dataset_options, "raw", "timestamp", default) is default
+
+
+def test_time_index(hdf5_manager):
+    timestamps = np.random.default_rng(0).random(300).cumsum()
+
+    with hdf5_manager as manager:
+        manager.create_group("test_group")
+        manager.create_dataset(
+            "test_group", "timestamp", data=timestamps[:50], chunks=(16,)
+        )
+        for start in range(50, 300, 25):
+            manager.append(
+                "test_group",
+                "timestamp",
+                timestamps[start : start + 25],
+                growth_factor=2,
+            )
+
+        expected = [
+            [timestamps[start : start + 16].min(), timestamps[start : start + 16].max()]
+            for start in range(0, 300, 16)
+        ]
+        index = manager.get_dataset("test_group", "timestamp_index")
+        assert index.attrs["block_size"] == 16
+        np.testing.assert_array_equal(index[:], expected)
+
+        manager.index_timestamps("test_group")
+        np.testing.assert_array_equal(
+            manager.get_dataset("test_group", "timestamp_index")[:], expected
+        )
+
+
+@pytest.fixture
+def session_file(hdf5_manager):
+    data = np.arange(2000.0).reshape(1000, 2)
+    timestamps = 100 + np.arange(1000) / 10
+
+    with hdf5_manager as manager:
+        writer = WriteBehindWriter(
+            manager,
+            chunk_size=64,
+            dataset_options={"scaled/data": DatasetOptions(scale=0.5)},
+        )
+        for group_name in ["chunked", "scaled"]:
+            writer.set_attributes(group_name, channel_names=["a", "b"], sample_rate=10)
+            for start in range(0, 1000, 70):
+                writer.append(group_name, "data", data[start : start + 70])
+                writer.append(group_name, "timestamp", timestamps[start : start + 70])
+        writer.close()
+
+        # Contiguous and without a sample rate
+        group = manager.create_group("contiguous", channel_names=["a", "b"])
+        group.create_dataset("data", data=data)
+        group.create_dataset("timestamp", data=timestamps)
+
+    return hdf5_manager.file_path, data, timestamps
+
+
+@pytest.mark.parametrize("group_name", ["chunked", "scaled", "contiguous"])
+def test_session_reader_read(session_file, group_name):
+    file_path, data, timestamps = session_file
+
+    with SessionReader(file_path) as reader:
+        result = reader.read(group_name, 110, 120.05)
+
+        assert reader.get_length(group_name) == 1000
+        assert result.sample_rate == 10
+        assert result.channel_names == ["a", "b"]
+        np.testing.assert_array_equal(result.physical_array, data[100:201])
+        np.testing.assert_array_equal(result.timestamps, timestamps[100:201])
+
+        assert reader.read(group_name).length == 1000
+        assert reader.read(group_name, 1e9).length == 0
+
+        for timestamp in np.linspace(90, 210, 101):
+            assert reader.get_index(group_name, timestamp) == np.searchsorted(
+                timestamps, timestamp
+            )
+
+
+def test_session_reader_memory_maps_contiguous_datasets(session_file):
+    file_path, _, _ = session_file
+
+    with SessionReader(file_path) as reader:
+        assert isinstance(reader.read("contiguous").array, np.memmap)
+        assert not isinstance(reader.read("chunked").array, np.memmap)
+
+
+def test_session_reader_iter_windows(session_file):
+    file_path, data, _ = session_file
+
+    with SessionReader(file_path) as reader:
+        windows = list(reader.iter_windows("chunked", 30, hop_duration=10))
+
+        assert len(windows) == 8
+        assert all(window.length == 300 for window in windows)
+        np.testing.assert_array_equal(windows[-1].array, data[700:])
+
+        with pytest.raises(ValueError):
+            next(reader.iter_windows("chunked", 0.01))
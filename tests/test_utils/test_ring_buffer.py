@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from slumber.utils.ring_buffer import RingBuffer
+
+
+@pytest.fixture
+def ring_buffer():
+    return RingBuffer(capacity=6, n_channels=2)
+
+
+def _chunk(start: int, length: int) -> tuple[np.ndarray, np.ndarray]:
+    timestamps = np.arange(start, start + length, dtype=np.float64)
+    return np.column_stack([timestamps, -timestamps]), timestamps
+
+
+def test_ring_buffer_initialization(ring_buffer):
+    assert ring_buffer.capacity == 6
+    assert ring_buffer.n_channels == 2
+    assert ring_buffer.array.shape == (6, 2)
+    assert ring_buffer.timestamps.shape == (6,)
+    assert np.all(ring_buffer.array == 0)
+
+
+def test_ring_buffer_append_matches_roll(ring_buffer):
+    expected_array = np.zeros((6, 2))
+    expected_timestamps = np.zeros(6)
+
+    for start, length in [(0, 2), (2, 2), (4, 3), (7, 1), (8, 5), (13, 2)]:
+        array, timestamps = _chunk(start, length)
+        ring_buffer.append(array, timestamps)
+
+        expected_array = np.roll(expected_array, -length, axis=0)
+        expected_array[-length:] = array
+        expected_timestamps = np.roll(expected_timestamps, -length)
+        expected_timestamps[-length:] = timestamps
+
+        np.testing.assert_array_equal(ring_buffer.array, expected_array)
+        np.testing.assert_array_equal(ring_buffer.timestamps, expected_timestamps)
+
+
+def test_ring_buffer_append_larger_than_capacity(ring_buffer):
+    array, timestamps = _chunk(0, 10)
+    ring_buffer.append(array, timestamps)
+
+    np.testing.assert_array_equal(ring_buffer.array, array[-6:])
+    np.testing.assert_array_equal(ring_buffer.timestamps, timestamps[-6:])
+
+
+def test_ring_buffer_views_are_read_only(ring_buffer):
+    array, timestamps = _chunk(0, 3)
+    ring_buffer.append(array, timestamps)
+
+    view = ring_buffer.array
+    assert np.shares_memory(view, ring_buffer.array)
+    with pytest.raises(ValueError):
+        view[0, 0] = 1.0
+
+
+def test_ring_buffer_fill(ring_buffer):
+    array, timestamps = _chunk(0, 6)
+    ring_buffer.append(*_chunk(100, 4))
+    ring_buffer.fill(array, timestamps)
+
+    np.testing.assert_array_equal(ring_buffer.array, array)
+    np.testing.assert_array_equal(ring_buffer.timestamps, timestamps)
+
+
+@pytest.mark.parametrize(
+    "array, timestamps",
+    [
+        (np.zeros((3, 3)), np.zeros(3)),
+        (np.zeros(3), np.zeros(3)),
+        (np.zeros((3, 2)), np.zeros(2)),
+    ],
+)
+def test_ring_buffer_append_invalid_shapes(ring_buffer, array, timestamps):
+    with pytest.raises(ValueError):
+        ring_buffer.append(array, timestamps)
+
+
+def test_ring_buffer_mask():
+    ring_buffer = RingBuffer(capacity=6, n_channels=2, with_mask=True)
+    ring_buffer.fill(*_chunk(0, 6), np.zeros(6, dtype=bool))
+    assert not ring_buffer.mask.any()
+
+    ring_buffer.append(*_chunk(6, 4), np.array([True, False, True, True]))
+    ring_buffer.append(*_chunk(10, 1))
+
+    np.testing.assert_array_equal(
+        ring_buffer.mask, [False, True, False, True, True, True]
+    )
+
+
+def test_ring_buffer_without_mask(ring_buffer):
+    ring_buffer.append(*_chunk(0, 3), np.zeros(3, dtype=bool))
+    assert ring_buffer.mask is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from slumber.utils.sample_ring import SampleRing
+
+
+def _get_samples(start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+    timestamps = np.arange(start, stop, dtype=float)
+    return np.column_stack([timestamps, -timestamps]), timestamps
+
+
+def test_sample_ring_push_and_drain():
+    ring = SampleRing(capacity=8, n_channels=2)
+    ring.push(*_get_samples(0, 5))
+    assert len(ring) == 5
+    assert ring.free == 3
+
+    array, timestamps = ring.drain(3)
+    np.testing.assert_array_equal(timestamps, [0, 1, 2])
+    np.testing.assert_array_equal(array, _get_samples(0, 3)[0])
+
+    # Wraps around the end of the arrays
+    ring.push(*_get_samples(5, 11))
+    array, timestamps = ring.drain()
+    np.testing.assert_array_equal(timestamps, np.arange(3, 11))
+    np.testing.assert_array_equal(array, _get_samples(3, 11)[0])
+    assert len(ring) == 0
+    assert ring.n_dropped == 0
+
+
+def test_sample_ring_overflow():
+    ring = SampleRing(capacity=4, n_channels=2)
+    assert ring.push(*_get_samples(0, 3)) == 0
+    assert ring.push(*_get_samples(3, 6)) == 2
+    assert ring.push(*_get_samples(6, 12)) == 6
+    assert ring.n_dropped == 8
+
+    _, timestamps = ring.drain()
+    np.testing.assert_array_equal(timestamps, [8, 9, 10, 11])
+
+
+@pytest.mark.parametrize("timestamp, expected_length", [(-1, 0), (4.5, 3), (20, 6)])
+def test_sample_ring_drain_until(timestamp, expected_length):
+    ring = SampleRing(capacity=6, n_channels=2)
+    ring.push(*_get_samples(0, 4))
+    ring.drain(2)
+    ring.push(*_get_samples(4, 8))  # Timestamps 2 to 7, wrapping around
+
+    _, timestamps = ring.drain_until(timestamp)
+
+    np.testing.assert_array_equal(timestamps, np.arange(2, 2 + expected_length))
+    assert len(ring) == 6 - expected_length
+
+
+def test_sample_ring_raises_error():
+    ring = SampleRing(capacity=4, n_channels=2)
+
+    with pytest.raises(ValueError):
+        ring.push(np.zeros((2, 3)), np.zeros(2))
+
+    with pytest.raises(ValueError):
+        ring.push(np.zeros((2, 2)), np.zeros(3))
+
+    with pytest.raises(ValueError):
+        ring.drain(1)